@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This benchmark measures how fast the historical data parsers of the
+IntegrateData class and `integrate.history.parse_bars` go through a
+synthetic response of minute bars. No network access or login is needed.
+
+Run it from the root of the repository:
+
+.. code-block:: bash
+
+    python -m benchmarks.history_parsing --rows 1000000
+"""
+
+from argparse import ArgumentParser, Namespace
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Any, Callable
+
+from integrate import ConnectToIntegrate, IntegrateData
+
+
+class OfflineConnection(ConnectToIntegrate):
+    """
+    Connection answering every request with the same CSV body.
+
+    :param `body`: The CSV body of the historical data response.
+    :type `body`: `bytes`
+    """
+
+    def __init__(self, body: bytes) -> None:
+        super().__init__()
+        self._body: bytes = body
+
+    def get_symbol(self, exchange: str, trading_symbol: str) -> Any:
+        return {"token": "22"}
+
+    def send_request(self, *args: Any, **kwargs: Any) -> dict[str, Any]:
+        if kwargs.get("raw"):
+            return {"data": self._body}
+        return {"data": (line.decode() for line in self._body.splitlines())}
+
+
+def synthetic_bars(rows: int) -> bytes:
+    """
+    Build a response body of minute bars with open interest.
+
+    :param `rows`: Number of bars
+    :type `rows`: `int`
+    :return: The CSV body
+    :rtype: `bytes`
+    """
+    start: datetime = datetime(2015, 1, 1, 9, 15)
+    lines: list[str] = []
+    for i in range(rows):
+        # 375 bars per session, one session per day
+        stamp: datetime = start + timedelta(days=i // 375, minutes=i % 375)
+        price: float = 1800 + (i % 997) / 20
+        lines.append(
+            f"{stamp:%d%m%Y%H%M},{price:.2f},{price + 1.5:.2f},"
+            f"{price - 1.25:.2f},{price + 0.5:.2f},{i % 9973},{i % 733}"
+        )
+    return "\n".join(lines).encode()
+
+
+def strptime_rows(body: bytes) -> list[dict[str, Any]]:
+    """
+    Parse the bars the way historical_data did before the fixed-width
+    timestamp parser.
+
+    :param `body`: The CSV body
+    :type `body`: `bytes`
+    :return: The bars
+    :rtype: `list[dict[str, Any]]`
+    """
+    bars: list[dict[str, Any]] = []
+    for line in body.splitlines():
+        data: list[str] = line.decode().split(",")
+        bars.append(
+            {
+                "datetime": datetime.strptime(data[0], "%d%m%Y%H%M"),
+                "open": float(data[1]),
+                "high": float(data[2]),
+                "low": float(data[3]),
+                "close": float(data[4]),
+                "volume": int(data[5]),
+                "oi": int(data[6]),
+            }
+        )
+    return bars
+
+
+def measure(name: str, rows: int, parse: Callable[[], Any]) -> float:
+    """
+    Time one parser and print its throughput.
+
+    :param `name`: Name of the parser
+    :param `rows`: Number of bars parsed
+    :param `parse`: Function parsing all the bars
+    :type `name`: `str`
+    :type `rows`: `int`
+    :type `parse`: `Callable[[], Any]`
+    :return: Elapsed seconds
+    :rtype: `float`
+    """
+    started: float = perf_counter()
+    parse()
+    elapsed: float = perf_counter() - started
+    print(f"{name:<24}{elapsed:>8.3f}s{rows / elapsed:>14,.0f} rows/s")
+    return elapsed
+
+
+def main() -> None:
+    """
+    Main function
+    """
+    parser: ArgumentParser = ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args: Namespace = parser.parse_args()
+
+    body: bytes = synthetic_bars(args.rows)
+    ic: IntegrateData = IntegrateData(OfflineConnection(body))
+    query: dict[str, Any] = {
+        "exchange": ConnectToIntegrate.EXCHANGE_TYPE_NSE,
+        "trading_symbol": "ACC-EQ",
+        "timeframe": ConnectToIntegrate.TIMEFRAME_TYPE_MIN,
+        "start": datetime(2015, 1, 1),
+        "end": datetime(2026, 1, 1),
+    }
+
+    before: float = measure("strptime", args.rows, lambda: strptime_rows(body))
+    after: float = measure(
+        "historical_data",
+        args.rows,
+        lambda: list(ic.historical_data(**query)),
+    )
+    print(f"{'speed-up':<24}{before / after:>8.1f}x")
+
+    try:
+        from integrate.history import parse_bars
+    except ImportError:
+        print("parse_bars skipped, NumPy is not installed")
+        return
+
+    # The CSV body alone, then with the requests and the cache around it
+    measure("parse_bars", args.rows, lambda: parse_bars(body))
+    measure(
+        "historical_data_arrays",
+        args.rows,
+        lambda: ic.historical_data_arrays(**query),
+    )
+
+
+if __name__ == "__main__":
+    main()
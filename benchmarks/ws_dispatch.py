@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This benchmark measures how many streamed messages per second the
+IntegrateWebSocket class decodes and hands to its callbacks. No network
+access or login is needed. Messages are decoded with orjson when it is
+installed.
+
+Run it from the root of the repository:
+
+.. code-block:: bash
+
+    python -m benchmarks.ws_dispatch --messages 1000000
+"""
+
+from argparse import ArgumentParser, Namespace
+from json import dumps, loads
+from time import perf_counter
+from typing import Any, Callable
+
+from integrate import ConnectToIntegrate, IntegrateWebSocket
+from integrate.ws import _decode
+
+
+def synthetic_ticks(messages: int) -> list[bytes]:
+    """
+    Build tick messages like those streamed for a watchlist.
+
+    :param `messages`: Number of messages
+    :type `messages`: `int`
+    :return: The payloads
+    :rtype: `list[bytes]`
+    """
+    payloads: list[bytes] = []
+    for i in range(messages):
+        price: float = 1800 + (i % 997) / 20
+        payloads.append(
+            dumps(
+                {
+                    "t": "tf",
+                    "e": "NSE",
+                    "tk": str(22 + i % 50),
+                    "lp": f"{price:.2f}",
+                    "pc": "0.25",
+                    "v": str(i % 9973),
+                    "ltq": str(i % 100),
+                    "ltt": "15:29:59",
+                    "bp1": f"{price - 0.05:.2f}",
+                    "sp1": f"{price + 0.05:.2f}",
+                    "bq1": "120",
+                    "sq1": "75",
+                },
+                ensure_ascii=False,
+            ).encode("utf-8")
+        )
+    return payloads
+
+
+def if_chain(iws: IntegrateWebSocket, payload: bytes) -> None:
+    """
+    Handle a message the way _on_message did before the dispatch table.
+
+    :param `iws`: The IntegrateWebSocket object
+    :param `payload`: The message payload
+    :type `iws`: `IntegrateWebSocket`
+    :type `payload`: `bytes`
+    :return: None
+    """
+    data: dict[str, Any] = loads(payload.decode("utf-8"))
+    if data["t"] == "ck":
+        iws.on_login(iws)
+    elif (
+        data["t"] == "tk"
+        or data["t"] == "ok"
+        or data["t"] == "dk"
+        or data["t"] == "uk"
+        or data["t"] == "uok"
+        or data["t"] == "udk"
+    ):
+        iws.on_acknowledgement(iws, data)
+    elif data["t"] == "tf":
+        iws.on_tick_update(iws, data)
+    elif data["t"] == "om":
+        iws.on_order_update(iws, data)
+    elif data["t"] == "df":
+        iws.on_depth_update(iws, data)
+
+
+def measure(
+    name: str, payloads: list[bytes], handle: Callable[[bytes], None]
+) -> float:
+    """
+    Time one message handler and print its throughput.
+
+    :param `name`: Name of the handler
+    :param `payloads`: The message payloads
+    :param `handle`: Function handling one message
+    :type `name`: `str`
+    :type `payloads`: `list[bytes]`
+    :type `handle`: `Callable[[bytes], None]`
+    :return: Elapsed seconds
+    :rtype: `float`
+    """
+    started: float = perf_counter()
+    for payload in payloads:
+        handle(payload)
+    elapsed: float = perf_counter() - started
+    print(
+        f"{name:<24}{elapsed:>8.3f}s"
+        f"{len(payloads) / elapsed:>14,.0f} messages/s"
+    )
+    return elapsed
+
+
+def main() -> None:
+    """
+    Main function
+    """
+    parser: ArgumentParser = ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    args: Namespace = parser.parse_args()
+
+    payloads: list[bytes] = synthetic_ticks(args.messages)
+    iws: IntegrateWebSocket = IntegrateWebSocket(ConnectToIntegrate())
+    ticks: list[int] = [0]
+
+    def on_tick_update(iws: IntegrateWebSocket, tick: dict[str, Any]) -> None:
+        ticks[0] += 1
+
+    iws.on_tick_update = on_tick_update  # type: ignore
+
+    before: float = measure(
+        "if/elif and json", payloads, lambda p: if_chain(iws, p)
+    )
+    after: float = measure(
+        "_on_message", payloads, lambda p: iws._on_message(p, False)
+    )
+    print(f"{'speed-up':<24}{before / after:>8.1f}x")
+    print(
+        "decoder: orjson"
+        if _decode.__module__ == "orjson"
+        else "decoder: json"
+    )
+    assert ticks[0] == 2 * args.messages
+
+
+if __name__ == "__main__":
+    main()
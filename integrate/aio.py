@@ -0,0 +1,856 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains asyncio counterparts of the ConnectToIntegrate,
+IntegrateOrders and IntegrateData classes. They send requests over a pooled
+aiohttp session, which is installed with the `aio` extra
+(`pip install pyintegrate[aio]`).
+
+Example:
+
+.. code-block:: python
+
+    from asyncio import gather, run
+
+    from integrate.aio import (
+        AsyncConnectToIntegrate,
+        AsyncIntegrateData,
+        AsyncIntegrateOrders,
+    )
+
+
+    async def main() -> None:
+        async with AsyncConnectToIntegrate() as c2i:
+            await c2i.login(
+                api_token="YOUR_API_TOKEN",
+                api_secret="YOUR_API_SECRET",
+                totp="123456",
+            )
+            io = AsyncIntegrateOrders(c2i)
+            ic = AsyncIntegrateData(c2i)
+
+            # Fetch quotes and the order book concurrently
+            acc, sbin, orders = await gather(
+                ic.quotes(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ"),
+                ic.quotes(c2i.EXCHANGE_TYPE_NSE, "SBIN-EQ"),
+                io.orders(),
+            )
+
+
+    run(main())
+"""
+
+from asyncio import (
+    Future,
+    Semaphore,
+    Task,
+    as_completed,
+    create_task,
+    gather,
+    get_running_loop,
+    run_coroutine_threadsafe,
+    shield,
+    sleep,
+    to_thread,
+)
+from collections.abc import AsyncIterator, Awaitable, Iterable
+from datetime import datetime, timedelta
+from hashlib import sha256
+from json import loads
+from logging import DEBUG, Logger, getLogger
+from types import ModuleType, TracebackType
+from typing import TYPE_CHECKING, Any, Union
+from urllib.parse import urljoin, urlsplit
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from integrate.connect import ConnectToIntegrate
+from integrate.data import IntegrateData, RateLimiter, _import_history
+from integrate.orders import IntegrateOrders
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger: Logger = getLogger(__name__)
+logger.setLevel(DEBUG)
+
+
+class AsyncConnectToIntegrate(ConnectToIntegrate):
+    """
+    asyncio counterpart of :py:class:`ConnectToIntegrate`.
+
+    :py:meth:`login` and :py:meth:`send_request` are coroutines sending
+    requests over one aiohttp session, which is created on first use and
+    closed by :py:meth:`close` or when leaving `async with`. The symbols'
+    master is handled like in :py:class:`ConnectToIntegrate`.
+
+    The arguments are the same as for :py:class:`ConnectToIntegrate`.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._aio_session: Union[ClientSession, None] = None
+
+    async def __aenter__(self) -> "AsyncConnectToIntegrate":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Union[type[BaseException], None],
+        exc: Union[BaseException, None],
+        traceback: Union[TracebackType, None],
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Close the aiohttp session and its connections.
+
+        :return: None
+        """
+        if self._aio_session is not None:
+            await self._aio_session.close()
+            self._aio_session = None
+
+    async def login(  # type: ignore[override]
+        self,
+        api_token: str,
+        api_secret: str,
+        totp: Union[str, None] = None,
+    ) -> None:
+        """
+        Login to Definedge Securities Integrate
+
+        :param `api_token`: Your Definedge Securities API Token. Available at https://myaccount.definedgesecurities.com/mydetails -> Show My API Secret
+        :param `api_secret`: Your Definedge Securities API Secret. Available at https://myaccount.definedgesecurities.com/mydetails -> Show My API Secret
+        :param `totp`: Your 6-digit External TOTP for two-factor authentication. Enable at https://myaccount.definedgesecurities.com/security
+        :type `api_token`: `str`
+        :type `api_secret`: `str`
+        :type `totp`: `str | None`
+        """
+        if api_token and api_secret:
+            try:
+                # Get OTP token
+                r: dict[str, Any] = await self.send_request(
+                    route_prefix=self.login_url,
+                    route=f"login/{api_token}",
+                    method="GET",
+                    extra_headers={"api_secret": api_secret},
+                )
+                otp_token: str = r["otp_token"]
+                try:
+                    # Get OTP/TOTP for 2FA without blocking the event loop
+                    otp: str = (
+                        await to_thread(input, "Enter OTP/External TOTP: ")
+                        if not totp
+                        else totp
+                    )
+                except KeyboardInterrupt:
+                    raise ValueError("No OTP/TOTP provided")
+                ac: str = sha256(
+                    f"{otp_token}{otp}{api_secret}".encode("utf-8")
+                ).hexdigest()
+                # Get session keys
+                r = await self.send_request(
+                    route_prefix=self.login_url,
+                    route="token",
+                    method="POST",
+                    json_params={
+                        "otp_token": otp_token,
+                        "otp": otp,
+                        "ac": ac,
+                    },
+                )
+                self.set_session_keys(
+                    r["uid"], r["actid"], r["api_session_key"], r["susertoken"]
+                )
+                # Get symbols
+                await to_thread(self.refresh_symbols)
+                await to_thread(self.build_symbols_index)
+                # Open connections for the first requests
+                if self._prewarm_connections:
+                    await self.prewarm(self._prewarm_connections)
+            except Exception as e:
+                raise Exception(e)
+        else:
+            raise ValueError("Invalid api_token or api_secret")
+
+    async def prewarm(  # type: ignore[override]
+        self, connections: int = 1
+    ) -> None:
+        """
+        Open connections to `base_url` and keep them in the pool, so that as
+        many concurrent requests skip the TCP and TLS handshakes. Failures
+        are ignored, the connections are then opened on demand.
+
+        :param `connections`: Number of connections to open. At most `pool_size` are kept.
+        :type `connections`: `int`
+        :return: None
+        """
+        if not self._keep_alive or connections < 1:
+            return
+
+        async def connect() -> None:
+            # Any response will do, the connection stays in the pool
+            async with self._session().get(
+                self.base_url,
+                proxy=self._proxies.get(urlsplit(self.base_url).scheme),
+                ssl=None if self._verify else False,
+            ) as r:
+                # Reading the body returns the connection to the pool
+                await r.read()
+
+        try:
+            # Overlapping requests check out different connections
+            await gather(
+                *(connect() for _ in range(min(connections, self._pool_size)))
+            )
+        except Exception as e:
+            logger.debug(
+                f"Couldn't prewarm connections: {e}"
+            ) if self._logging else None
+
+    async def send_request(  # type: ignore[override]
+        self,
+        route_prefix: str,
+        route: str,
+        method: str,
+        url_params: Union[dict[str, str], None] = None,
+        json_params: Union[dict[str, Any], None] = None,
+        data_params: Union[dict[str, Any], None] = None,
+        query_params: Union[dict[str, str], None] = None,
+        extra_headers: Union[dict[str, str], None] = None,
+        raw: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Make an HTTP request.
+
+        :param `route_prefix`: The prefix of the route
+        :param `route`: The route
+        :param `method`: The HTTP method
+        :param `url_params`: The URL parameters
+        :param `json_params`: The JSON parameters
+        :param `data_params`: The data parameters
+        :param `query_params`: The query parameters
+        :param `extra_headers`: The extra headers
+        :param `raw`: Return a CSV response as `bytes` instead of lines
+        :type `route_prefix`: `str`
+        :type `route`: `str`
+        :type `method`: `str`
+        :type `url_params`: `dict`
+        :type `json_params`: `dict`
+        :type `data_params`: `dict`
+        :type `query_params`: `dict`
+        :type `extra_headers`: `dict`
+        :type `raw`: `bool`
+        :return: The response
+        :rtype: `dict`
+        """
+        # Form URL
+        url: str = urljoin(
+            route_prefix,
+            route.format(**url_params) if url_params else route,
+        )
+
+        # Headers
+        headers: dict[str, str] = dict(extra_headers) if extra_headers else {}
+        if self.api_session_key:
+            # Set authorization header
+            headers["Authorization"] = f"{self.api_session_key}"
+
+        logger.debug(
+            f"Request: {method} {url} {query_params} {json_params} {data_params} {headers}"
+        ) if self._logging else None
+
+        async with self._session().request(
+            method=method,
+            url=url,
+            json=json_params,
+            data=data_params,
+            params=query_params,
+            headers=headers,
+            allow_redirects=True,
+            proxy=self._proxies.get(urlsplit(url).scheme),
+            ssl=None if self._verify else False,
+        ) as r:
+            content: bytes = await r.read()
+            content_type: str = r.headers.get("content-type", "")
+            final_url: str = str(r.url)
+
+        logger.debug(
+            f"Response: {r.status} {content!r}"
+        ) if self._logging else None
+
+        # Take action based on content type
+        if "application/json" in content_type:
+            try:
+                data: dict[str, Any] = loads(content)
+            except Exception:
+                raise Exception(f"Couldn't parse JSON response: {content!r}")
+        elif "text/csv" in content_type:
+            try:
+                data = {
+                    "data": content
+                    if raw
+                    else [
+                        line.decode("utf-8") for line in content.splitlines()
+                    ]
+                }
+            except Exception:
+                raise Exception(f"Couldn't parse CSV response: {content!r}")
+        else:
+            raise Exception(
+                f"Unknown Content-Type ({content_type}): ({content!r})"
+            )
+
+        return self._check_response(data, final_url)
+
+    def _session(self) -> ClientSession:
+        """
+        Get the aiohttp session, creating it on first use.
+
+        :return: The session
+        :rtype: `ClientSession`
+        """
+        if self._aio_session is None or self._aio_session.closed:
+            self._aio_session = ClientSession(
+                connector=TCPConnector(
+                    limit_per_host=self._pool_size,
+                    force_close=not self._keep_alive,
+                ),
+                timeout=ClientTimeout(total=self._timeout),
+            )
+        return self._aio_session
+
+
+class AsyncIntegrateOrders(IntegrateOrders):
+    """
+    asyncio counterpart of :py:class:`IntegrateOrders`.
+
+    It has the same methods, which validate their arguments right away and
+    return an awaitable response from :py:meth:`AsyncConnectToIntegrate.send_request`.
+
+    :param `connect_to_integrate`: The connection object.
+    :param `logging`: Enable or disable logging. Defaults to `False`. If set to True, will print all requests and responses to logger.
+    :type `connect_to_integrate`: `AsyncConnectToIntegrate`
+    :type `logging`: `bool`
+    """
+
+    def __init__(
+        self,
+        connect_to_integrate: AsyncConnectToIntegrate,
+        logging: bool = False,
+    ) -> None:
+        super().__init__(connect_to_integrate, logging)
+
+
+class AsyncIntegrateData(IntegrateData):
+    """
+    asyncio counterpart of :py:class:`IntegrateData`.
+
+    It has the same methods as coroutines, or asynchronous iterators for
+    :py:meth:`historical_data` and :py:meth:`bulk_historical_data`.
+    Concurrent downloads run as tasks on the event loop instead of threads.
+
+    :param `connect_to_integrate`: The connection object.
+    :type `connect_to_integrate`: `AsyncConnectToIntegrate`
+
+    All other arguments are the same as for :py:class:`IntegrateData`.
+    """
+
+    def __init__(
+        self,
+        connect_to_integrate: AsyncConnectToIntegrate,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(connect_to_integrate, *args, **kwargs)
+        self.c2i: AsyncConnectToIntegrate = connect_to_integrate
+        self._quotes_in_flight: dict[
+            tuple[str, str], Task[dict[str, Any]]
+        ] = {}
+
+    async def historical_data(  # type: ignore[override]
+        self,
+        exchange: str,
+        trading_symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        window: Union[timedelta, None] = None,
+        max_workers: int = 4,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Retrieve historical data for an security.
+
+        See :py:meth:`IntegrateData.historical_data`.
+
+        :returns: Historical data for the security.
+        :rtype: `AsyncIterator[dict[str, Any]]`
+        """
+        if timeframe not in self.c2i.timeframe_types:
+            raise ValueError("Invalid timeframe")
+
+        token: str = self._token(exchange, trading_symbol)
+        async for bar in self._history_rows(
+            exchange, token, timeframe, start, end, window, max_workers
+        ):
+            yield bar
+
+    async def historical_data_arrays(  # type: ignore[override]
+        self,
+        exchange: str,
+        trading_symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        window: Union[timedelta, None] = None,
+        max_workers: int = 4,
+    ) -> dict[str, "np.ndarray"]:
+        """
+        Retrieve historical data for an security as columnar NumPy arrays.
+
+        See :py:meth:`IntegrateData.historical_data_arrays`.
+
+        :returns: Columns datetime, open, high, low, close, volume and oi, if available, of the bars.
+        :rtype: `dict[str, np.ndarray]`
+        """
+        _import_history("historical_data_arrays")
+
+        if timeframe not in self.c2i.timeframe_types:
+            raise ValueError("Invalid timeframe")
+        if timeframe == self.c2i.TIMEFRAME_TYPE_TICK:
+            raise ValueError(
+                "Tick data can't be parsed into bars, use historical_ticks"
+            )
+
+        token: str = self._token(exchange, trading_symbol)
+        return await self._history_arrays(
+            exchange, token, timeframe, start, end, window, max_workers
+        )
+
+    async def historical_ticks(  # type: ignore[override]
+        self,
+        exchange: str,
+        trading_symbol: str,
+        start: datetime,
+        end: datetime,
+    ) -> "np.ndarray":
+        """
+        Retrieve tick data for an security as a structured NumPy array.
+
+        See :py:meth:`IntegrateData.historical_ticks`.
+
+        :returns: The ticks.
+        :rtype: `np.ndarray`
+        """
+        history: ModuleType = _import_history("historical_ticks")
+
+        token: str = self._token(exchange, trading_symbol)
+        bodies: list[Any] = await self._fetch_history(
+            exchange,
+            token,
+            self.c2i.TIMEFRAME_TYPE_TICK,
+            start,
+            end,
+            None,
+            1,
+            raw=True,
+        )
+        return await to_thread(history.parse_ticks, bodies[0])
+
+    async def bulk_historical_data(  # type: ignore[override]
+        self,
+        symbols: Iterable[tuple[str, str]],
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        arrays: bool = False,
+        max_workers: int = 8,
+        rate_limit: Union[float, None] = None,
+    ) -> AsyncIterator[tuple[str, str, Any]]:
+        """
+        Retrieve historical data for many securities concurrently.
+
+        See :py:meth:`IntegrateData.bulk_historical_data`.
+
+        :returns: Exchange, trading symbol and historical data of each security.
+        :rtype: `AsyncIterator[tuple[str, str, Any]]`
+        """
+        if arrays:
+            _import_history("bulk_historical_data(arrays=True)")
+
+        if timeframe not in self.c2i.timeframe_types:
+            raise ValueError("Invalid timeframe")
+
+        tokens: dict[tuple[str, str], str] = {
+            (exchange, trading_symbol): self._token(exchange, trading_symbol)
+            for exchange, trading_symbol in symbols
+        }
+        limiter: Union[RateLimiter, None] = (
+            RateLimiter(rate_limit) if rate_limit else None
+        )
+        semaphore: Semaphore = Semaphore(max_workers)
+
+        async def download(
+            exchange: str, trading_symbol: str, token: str
+        ) -> tuple[str, str, Any]:
+            async with semaphore:
+                if arrays:
+                    data: Any = await self._history_arrays(
+                        exchange, token, timeframe, start, end, limiter=limiter
+                    )
+                else:
+                    data = [
+                        bar
+                        async for bar in self._history_rows(
+                            exchange,
+                            token,
+                            timeframe,
+                            start,
+                            end,
+                            limiter=limiter,
+                        )
+                    ]
+            return exchange, trading_symbol, data
+
+        tasks: list[Future[tuple[str, str, Any]]] = [
+            get_running_loop().create_task(download(*key, token))
+            for key, token in tokens.items()
+        ]
+        try:
+            for task in as_completed(tasks):
+                yield await task
+        finally:
+            for pending in tasks:
+                pending.cancel()
+
+    async def quotes(  # type: ignore[override]
+        self, exchange: str, trading_symbol: str
+    ) -> dict[str, Any]:
+        """
+        Retrieve quotes for an security.
+
+        See :py:meth:`IntegrateData.quotes`.
+
+        :returns: Quote for the security.
+        :rtype: `dict[str, Any]`
+        """
+        return await self._quotes(
+            exchange, self._token(exchange, trading_symbol)
+        )
+
+    async def bulk_quotes(  # type: ignore[override]
+        self, symbols: Iterable[tuple[str, str]], max_workers: int = 10
+    ) -> dict[tuple[str, str], dict[str, Any]]:
+        """
+        Retrieve quotes for many securities concurrently.
+
+        See :py:meth:`IntegrateData.bulk_quotes`.
+
+        :returns: Quote of each security keyed by exchange and trading symbol.
+        :rtype: `dict[tuple[str, str], dict[str, Any]]`
+        """
+        tokens: dict[tuple[str, str], str] = {
+            (exchange, trading_symbol): self._token(exchange, trading_symbol)
+            for exchange, trading_symbol in symbols
+        }
+        semaphore: Semaphore = Semaphore(max_workers)
+
+        async def fetch(exchange: str, token: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self._quotes(exchange, token)
+
+        quotes: list[dict[str, Any]] = await gather(
+            *(fetch(key[0], token) for key, token in tokens.items())
+        )
+        return dict(zip(tokens, quotes))
+
+    async def security_information(  # type: ignore[override]
+        self, exchange: str, trading_symbol: str
+    ) -> dict[str, Any]:
+        """
+        Retrieve details about an security.
+
+        See :py:meth:`IntegrateData.security_information`.
+
+        :returns: Details about the security.
+        :rtype: `dict[str, Any]`
+        """
+        token: str = self._token(exchange, trading_symbol)
+        key: tuple[str, str] = (exchange, token)
+        if self.security_information_cache is not None:
+            cached: Union[
+                dict[str, Any], None
+            ] = self.security_information_cache.get(key)
+            if cached is not None:
+                return dict(cached)
+        security_information: dict[str, Any] = await self.c2i.send_request(
+            route_prefix=self.c2i.base_url,
+            route=f"securityinfo/{exchange}/{token}",
+            method="GET",
+        )
+        # Errors passed on to the session expired callback aren't cached
+        if (
+            self.security_information_cache is not None
+            and security_information.get("status") != "ERROR"
+        ):
+            self.security_information_cache.set(
+                key, dict(security_information)
+            )
+        return security_information
+
+    async def _quotes(  # type: ignore[override]
+        self, exchange: str, token: str
+    ) -> dict[str, Any]:
+        """
+        Retrieve the quote for a token, sharing the response with every
+        concurrent task asking for the same token.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :return: Quote for the security
+        :rtype: `dict[str, Any]`
+        """
+        key: tuple[str, str] = (exchange, token)
+        if self.quotes_cache is not None:
+            cached: Union[dict[str, Any], None] = self.quotes_cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+        task: Union[Task[dict[str, Any]], None] = self._quotes_in_flight.get(
+            key
+        )
+        if task is None:
+            task = self._quotes_in_flight[key] = create_task(
+                self._fetch_quote(exchange, token)
+            )
+            task.add_done_callback(lambda task: self._quote_fetched(key, task))
+        else:
+            logger.debug(
+                f"Waiting for the quote of {exchange}/{token} in flight"
+            ) if self._logging else None
+        # A cancelled caller leaves the request running for the others, and
+        # every caller gets its own copy of the shared response
+        return dict(await shield(task))
+
+    async def _fetch_quote(self, exchange: str, token: str) -> dict[str, Any]:
+        """
+        Request the quote for a token and cache it.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :return: Quote for the security
+        :rtype: `dict[str, Any]`
+        """
+        quote: dict[str, Any] = await self.c2i.send_request(
+            route_prefix=self.c2i.base_url,
+            route=f"quotes/{exchange}/{token}",
+            method="GET",
+        )
+        # Errors passed on to the session expired callback aren't cached
+        if self.quotes_cache is not None and quote.get("status") != "ERROR":
+            self.quotes_cache.set((exchange, token), quote)
+        return quote
+
+    def _quote_fetched(
+        self, key: tuple[str, str], task: "Task[dict[str, Any]]"
+    ) -> None:
+        """
+        Forget a finished request for a quote.
+
+        :param `key`: Exchange and token of the quote
+        :param `task`: The finished request
+        :type `key`: `tuple[str, str]`
+        :type `task`: `Task[dict[str, Any]]`
+        :return: None
+        """
+        del self._quotes_in_flight[key]
+        # Mark the error as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _history_rows(  # type: ignore[override]
+        self,
+        exchange: str,
+        token: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        window: Union[timedelta, None] = None,
+        max_workers: int = 4,
+        limiter: Union[RateLimiter, None] = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Retrieve historical data for a token as one dictionary per bar.
+
+        See :py:meth:`IntegrateData._history_rows`.
+
+        :return: Historical data for the security
+        :rtype: `AsyncIterator[dict[str, Any]]`
+        """
+        if (
+            self._history_cache is not None
+            and timeframe != self.c2i.TIMEFRAME_TYPE_TICK
+        ):
+            bars: dict[str, Any] = await self._history_arrays(
+                exchange,
+                token,
+                timeframe,
+                start,
+                end,
+                window,
+                max_workers,
+                limiter,
+            )
+            for bar in _import_history("history_cache_dir").bar_rows(bars):
+                yield bar
+            return
+
+        for lines in await self._fetch_history(
+            exchange,
+            token,
+            timeframe,
+            start,
+            end,
+            window,
+            max_workers,
+            limiter=limiter,
+        ):
+            for line in lines:
+                if len(line):
+                    yield self._history_row(line)
+
+    async def _history_arrays(  # type: ignore[override]
+        self,
+        exchange: str,
+        token: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        window: Union[timedelta, None] = None,
+        max_workers: int = 4,
+        limiter: Union[RateLimiter, None] = None,
+    ) -> dict[str, "np.ndarray"]:
+        """
+        Retrieve historical data for a token as columnar NumPy arrays,
+        through the history cache if there is one. Parsing and the cache
+        run in a thread to keep the event loop responsive.
+
+        See :py:meth:`IntegrateData._history_arrays`.
+
+        :return: Columns of the bars
+        :rtype: `dict[str, np.ndarray]`
+        """
+        history: ModuleType = _import_history("historical_data_arrays")
+
+        async def fetch(start: datetime, end: datetime) -> dict[str, Any]:
+            bodies: list[Any] = await self._fetch_history(
+                exchange,
+                token,
+                timeframe,
+                start,
+                end,
+                window,
+                max_workers,
+                raw=True,
+                limiter=limiter,
+            )
+            return await to_thread(history.parse_bars, b"\n".join(bodies))
+
+        if (
+            self._history_cache is not None
+            and timeframe != self.c2i.TIMEFRAME_TYPE_TICK
+        ):
+            loop = get_running_loop()
+            return await to_thread(
+                self._history_cache.bars,
+                exchange,
+                token,
+                timeframe,
+                start,
+                end,
+                lambda start, end: run_coroutine_threadsafe(
+                    fetch(start, end), loop
+                ).result(),
+            )
+        return await fetch(start, end)
+
+    async def _fetch_history(  # type: ignore[override]
+        self,
+        exchange: str,
+        token: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        window: Union[timedelta, None],
+        max_workers: int,
+        raw: bool = False,
+        limiter: Union[RateLimiter, None] = None,
+    ) -> list[Any]:
+        """
+        Download the historical data of a security, either in a single
+        request or split into windows downloaded concurrently.
+
+        See :py:meth:`IntegrateData._fetch_history`.
+
+        :return: The body, or lines of the body, of each window in order
+        :rtype: `list[Any]`
+        """
+        semaphore: Semaphore = Semaphore(max_workers)
+
+        async def fetch(start: datetime, end: datetime) -> Any:
+            async with semaphore:
+                if limiter is not None:
+                    await sleep(limiter.reserve())
+                historical_data: dict[str, Any] = await self.c2i.send_request(
+                    route_prefix=self.HISTORY_URL,
+                    route=self._history_route(
+                        exchange, token, timeframe, start, end
+                    ),
+                    method="GET",
+                    raw=raw,
+                )
+            return historical_data["data"]
+
+        if window is None:
+            return [await fetch(start, end)]
+
+        if timeframe == self.c2i.TIMEFRAME_TYPE_TICK:
+            raise ValueError("Tick data can't be split into windows")
+
+        windows: list[Awaitable[Any]] = [
+            fetch(*w) for w in self._history_windows(start, end, window)
+        ]
+        logger.debug(
+            f"Downloading {len(windows)} windows of {token}"
+        ) if self._logging else None
+        # Results come back in the order of the windows
+        return list(await gather(*windows))
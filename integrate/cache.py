@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains the TTLCache class, a small thread-safe cache whose
+entries expire after a fixed time and which evicts the least recently used
+entries once full.
+
+Example:
+
+.. code-block:: python
+
+    from integrate import ConnectToIntegrate, IntegrateData
+
+    c2i = ConnectToIntegrate()
+    c2i.login(api_token="YOUR_API_TOKEN", api_secret="YOUR_API_SECRET")
+
+    # Cache security information for an hour and quotes for a second
+    ic = IntegrateData(
+        connect_to_integrate=c2i,
+        security_information_ttl=3600,
+        quotes_ttl=1,
+    )
+
+    ic.security_information(
+        exchange=c2i.EXCHANGE_TYPE_NSE, trading_symbol="ACC-EQ"
+    )
+    print(ic.security_information_cache.hits)
+"""
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from threading import Lock
+from time import monotonic
+from typing import Any
+
+
+class TTLCache:
+    """
+    Thread-safe cache with a time to live and least recently used eviction.
+
+    :param `ttl`: Seconds after which an entry expires.
+    :param `maxsize`: Maximum number of entries. Defaults to `1024`.
+    :type `ttl`: `float`
+    :type `maxsize`: `int`
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024) -> None:
+        if ttl <= 0:
+            raise ValueError("TTL must be positive")
+        if maxsize <= 0:
+            raise ValueError("Maximum size must be positive")
+
+        self.ttl: float = ttl
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get the value of a key which has not expired yet.
+
+        :param `key`: The key
+        :param `default`: Value returned on a miss
+        :type `key`: `Hashable`
+        :type `default`: `Any`
+        :return: The value or the default
+        :rtype: `Any`
+        """
+        with self._lock:
+            entry: Any = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Set the value of a key, evicting the least recently used entry if
+        the cache is full.
+
+        :param `key`: The key
+        :param `value`: The value
+        :type `key`: `Hashable`
+        :type `value`: `Any`
+        :return: None
+        """
+        with self._lock:
+            self._entries[key] = (monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove all the entries and reset the counters.
+
+        :return: None
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
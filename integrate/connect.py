@@ -44,21 +44,50 @@ Example:
         print(symbol)
 """
 
+import sys
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from csv import reader
 from hashlib import sha256
-from io import BytesIO
+from json import dumps, load
 from logging import DEBUG, Logger, getLogger
-from os import remove
-from os.path import abspath, dirname, join
+from os import O_CREAT, O_RDWR, close, makedirs
+from os import open as os_open
+from os import stat
+from os.path import abspath, dirname, isfile, join, splitext
+from shutil import copyfileobj
+from tempfile import TemporaryFile
+from threading import Barrier, BrokenBarrierError, Lock
+from time import sleep, time
 from typing import Any, Callable, Generator, Union
 from urllib.parse import urljoin
 from zipfile import ZipFile
 
 from requests import Response, Session
+from requests.adapters import HTTPAdapter
+
+from integrate.files import write_atomically
+from integrate.symbols import (
+    COLUMNS,
+    SymbolMaster,
+    SymbolRow,
+    parse_symbol_line,
+)
+
+if sys.platform == "win32":
+    from msvcrt import LK_LOCK, LK_UNLCK, locking
+else:
+    from fcntl import LOCK_EX, LOCK_UN, flock
 
 logger: Logger = getLogger(__name__)
 logger.setLevel(DEBUG)
 
+# Attempts to attach to a shared symbols' master that another process is
+# still publishing, and the seconds waited between them
+_ATTACH_ATTEMPTS: int = 5
+_ATTACH_WAIT: float = 0.05
+
 
 class ConnectToIntegrate:
     """
@@ -74,6 +103,20 @@ class ConnectToIntegrate:
     :type `timeout`: `int | None`
     :type `logging`: `bool`
     :type `proxies`: `dict[str, str] | None`
+    :param `symbols_cache_dir`: Directory in which the symbols' master file is cached. Defaults to the package directory.
+    :param `symbols_max_age`: Time (seconds) for which a downloaded symbols' master file is used without checking the server for a newer one. Defaults to 0, i.e. it is revalidated with a conditional request on every login.
+    :type `symbols_cache_dir`: `str | None`
+    :type `symbols_max_age`: `int`
+    :param `symbols_snapshot`: Persist the parsed symbols' master file into a binary snapshot next to it, so that other processes load it without parsing the file again. Defaults to `True`.
+    :type `symbols_snapshot`: `bool`
+    :param `symbols_shared_memory`: Name of a shared memory segment through which processes share one parsed symbols' master. The first process publishes it and the others attach to it read-only. Defaults to `None`, i.e. not shared.
+    :type `symbols_shared_memory`: `str | None`
+    :param `pool_size`: Maximum number of connections kept open to each host, e.g. for threads placing orders concurrently. Defaults to `10`.
+    :type `pool_size`: `int`
+    :param `keep_alive`: Reuse connections between requests. Defaults to `True`. If set to False, every request opens a new connection.
+    :type `keep_alive`: `bool`
+    :param `prewarm_connections`: Number of connections to `base_url` opened right after login, so that the first requests don't wait for TCP and TLS handshakes. Defaults to `0`, i.e. connections are opened on demand.
+    :type `prewarm_connections`: `int`
     """
 
     EXCHANGE_TYPE_NSE = "NSE"
@@ -125,15 +168,30 @@ class ConnectToIntegrate:
         logging: bool = False,
         proxies: Union[dict[str, str], None] = None,
         ssl_verify: bool = True,
+        symbols_cache_dir: Union[str, None] = None,
+        symbols_max_age: int = 0,
+        symbols_snapshot: bool = True,
+        symbols_shared_memory: Union[str, None] = None,
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        prewarm_connections: int = 0,
     ) -> None:
         # Set default values for the connection.
         self._logging: bool = logging
         self._timeout: int = timeout or 10  # in seconds
         self._proxies: dict[str, str] = proxies if proxies else {}
         self._verify: bool = ssl_verify
+        self._pool_size: int = pool_size
+        self._keep_alive: bool = keep_alive
+        self._prewarm_connections: int = min(prewarm_connections, pool_size)
 
-        # Start a requests session.
+        # Start a requests session keeping pool_size connections per host.
         self._req_sess: Session = Session()
+        adapter: HTTPAdapter = HTTPAdapter(pool_maxsize=pool_size)
+        self._req_sess.mount("https://", adapter)
+        self._req_sess.mount("http://", adapter)
+        if not keep_alive:
+            self._req_sess.headers["Connection"] = "close"
 
         # Initialize the session variables.
         self.uid: str = ""
@@ -155,6 +213,24 @@ class ConnectToIntegrate:
 
         self.session_expired_callback: Union[Callable[[], None], None] = None
 
+        # Initialize the symbols' master file and its columnar form.
+        self._symbols_filename: str = abspath(
+            join(symbols_cache_dir or dirname(__file__), "allmaster.csv")
+        )
+        self._symbols_metadata_filename: str = (
+            f"{splitext(self._symbols_filename)[0]}.json"
+        )
+        self._symbols_max_age: int = symbols_max_age
+        self._chunk_size: int = 1 << 16
+        self._symbols_snapshot_filename: Union[str, None] = (
+            f"{splitext(self._symbols_filename)[0]}.bin"
+            if symbols_snapshot
+            else None
+        )
+        self._symbols_shared_memory: Union[str, None] = symbols_shared_memory
+        self._symbols_lock: Lock = Lock()
+        self._symbol_master: Union[SymbolMaster, None] = None
+
         # Initialize the exchange, order, price, product and subscription types.
         self.exchange_types: list[str] = [
             self.EXCHANGE_TYPE_NSE,
@@ -246,20 +322,67 @@ class ConnectToIntegrate:
                 self.set_session_keys(
                     r["uid"], r["actid"], r["api_session_key"], r["susertoken"]
                 )
-                try:
-                    # Get symbols
-                    symbols_filename: str = abspath(
-                        join(dirname(__file__), "allmaster.csv")
-                    )
-                    remove(symbols_filename)
-                except FileNotFoundError:
-                    pass
-                next(self.symbols)
+                # Get symbols
+                self.refresh_symbols()
+                self.build_symbols_index()
+                # Open connections for the first requests
+                if self._prewarm_connections:
+                    self.prewarm(self._prewarm_connections)
             except Exception as e:
                 raise Exception(e)
         else:
             raise ValueError("Invalid api_token or api_secret")
 
+    def prewarm(self, connections: int = 1) -> None:
+        """
+        Open connections to `base_url` and keep them in the pool, so that as
+        many concurrent requests skip the TCP and TLS handshakes. Failures
+        are ignored, the connections are then opened on demand.
+
+        :param `connections`: Number of connections to open. At most `pool_size` are kept.
+        :type `connections`: `int`
+        :return: None
+        """
+        if not self._keep_alive or connections < 1:
+            return
+
+        connections = min(connections, self._pool_size)
+        barrier: Barrier = Barrier(connections)
+
+        def connect() -> None:
+            # Any response will do, holding it until every request got one
+            # makes them check out different connections
+            try:
+                r: Response = self._req_sess.get(
+                    self.base_url,
+                    verify=self._verify,
+                    timeout=self._timeout,
+                    proxies=self._proxies,
+                    stream=True,
+                )
+            except Exception:
+                # Release the others instead of waiting for this one
+                barrier.abort()
+                raise
+            try:
+                barrier.wait(self._timeout)
+            except BrokenBarrierError:
+                pass
+            finally:
+                # Reading the body returns the connection to the pool
+                r.content
+
+        with ThreadPoolExecutor(connections) as executor:
+            for future in [
+                executor.submit(connect) for _ in range(connections)
+            ]:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.debug(
+                        f"Couldn't prewarm a connection: {e}"
+                    ) if self._logging else None
+
     def get_session_keys(
         self,
     ) -> tuple[str, str, str, str]:
@@ -308,45 +431,375 @@ class ConnectToIntegrate:
         :return: A generator of symbols
         :rtype: `Generator[dict[str, str], None, None]`
         """
-        # Download the master file if not present
-        symbols_filename: str = abspath(
-            join(dirname(__file__), "allmaster.csv")
-        )
+        self._download_symbols()
+
+        # Create a generator of symbols
+        with open(self._symbols_filename, "r") as fp:
+            for line in reader(fp):
+                yield dict(zip(COLUMNS, parse_symbol_line(line)))
+
+    @property
+    def symbol_master(self) -> SymbolMaster:
+        """
+        Columnar in-memory form of the symbols' master file. It is built once
+        per master file and rebuilt only when the file changes.
+
+        :return: The symbols' master
+        :rtype: `SymbolMaster`
+        """
+        self.build_symbols_index()
+        return self._symbol_master  # type: ignore
+
+    def get_symbol(
+        self, exchange: str, trading_symbol: str
+    ) -> Union[SymbolRow, None]:
+        """
+        Find a symbol by its trading symbol
+
+        :param `exchange`: Exchange in which security is listed
+        :param `trading_symbol`: Trading symbol of the security
+        :type `exchange`: `str`
+        :type `trading_symbol`: `str`
+        :return: The symbol if found, else `None`
+        :rtype: `SymbolRow | None`
+        """
+        return self.symbol_master.find(exchange, trading_symbol)
+
+    def get_symbol_by_token(
+        self, exchange: str, token: str
+    ) -> Union[SymbolRow, None]:
+        """
+        Find a symbol by its token
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :return: The symbol if found, else `None`
+        :rtype: `SymbolRow | None`
+        """
+        return self.symbol_master.find_by_token(exchange, token)
+
+    def search_symbols(
+        self,
+        query: str,
+        exchange: Union[str, None] = None,
+        limit: int = 10,
+    ) -> list[SymbolRow]:
+        """
+        Search symbols by a partial trading symbol. See
+        :py:meth:`SymbolMaster.search` for the ranking.
+
+        :param `query`: The partial trading symbol
+        :param `exchange`: Exchange to search in. Defaults to all exchanges.
+        :param `limit`: Maximum number of results. Defaults to 10.
+        :type `query`: `str`
+        :type `exchange`: `str | None`
+        :type `limit`: `int`
+        :return: The matching symbols, best first
+        :rtype: `list[SymbolRow]`
+        """
+        return self.symbol_master.search(query, exchange, limit)
+
+    def expiries(self, exchange: str, symbol: str) -> list[str]:
+        """
+        Get the expiries of the options on an underlying, nearest first
+
+        :param `exchange`: Exchange in which the options are listed
+        :param `symbol`: Symbol of the underlying, e.g. NIFTY
+        :type `exchange`: `str`
+        :type `symbol`: `str`
+        :return: The expiries
+        :rtype: `list[str]`
+        """
+        return self.symbol_master.expiries(exchange, symbol)
+
+    def option_chain(
+        self, exchange: str, symbol: str, expiry: str
+    ) -> list[dict[str, str]]:
+        """
+        Get the option chain of an underlying for an expiry. See
+        :py:meth:`SymbolMaster.option_chain` for the format.
+
+        :param `exchange`: Exchange in which the options are listed
+        :param `symbol`: Symbol of the underlying, e.g. NIFTY
+        :param `expiry`: Expiry of the options
+        :type `exchange`: `str`
+        :type `symbol`: `str`
+        :type `expiry`: `str`
+        :return: The strikes in ascending order
+        :rtype: `list[dict[str, str]]`
+        """
+        return self.symbol_master.option_chain(exchange, symbol, expiry)
+
+    def build_symbols_index(self) -> None:
+        """
+        Load the symbols' master file into a :py:class:`SymbolMaster` and
+        build its lookup indexes. This is done once per master file and
+        repeated only when the file changes.
+
+        :return: None
+        """
+        if self._symbol_master_is_current():
+            return
+
+        with self._symbols_lock:
+            # Another thread may have built the master while we waited
+            if self._symbol_master_is_current():
+                return
+            self._download_symbols()
+            key: Union[tuple[int, int], None] = self._symbols_file_key()
+            master: Union[SymbolMaster, None] = self._attach_shared_symbols(
+                key
+            )
+            if master is None:
+                master = self._load_symbols_snapshot(key)
+                if master is None:
+                    master = SymbolMaster.from_csv(self._symbols_filename)
+                    master.source = key
+                    self._save_symbols_snapshot(master)
+                self._publish_shared_symbols(master)
+            master.build_indexes()
+            self._symbol_master = master
+
+    def _attach_shared_symbols(
+        self, key: Union[tuple[int, int], None]
+    ) -> Union[SymbolMaster, None]:
+        """
+        Attach to the symbols' master published in shared memory if it was
+        built from the current symbols' master file.
+
+        A segment that is not a valid snapshot yet is being written by the
+        process publishing it, so attaching is retried a few times before
+        the master is built here and published over it.
+
+        :param `key`: Key of the current symbols' master file
+        :type `key`: `tuple[int, int] | None`
+        :return: The symbols' master, or `None` if there is no usable segment
+        :rtype: `SymbolMaster | None`
+        """
+        if not self._symbols_shared_memory or key is None:
+            return None
+        for _ in range(_ATTACH_ATTEMPTS):
+            try:
+                master: SymbolMaster = SymbolMaster.attach(
+                    self._symbols_shared_memory
+                )
+            except ValueError:
+                logger.debug(
+                    "Shared symbols' master not published yet"
+                ) if self._logging else None
+                sleep(_ATTACH_WAIT)
+                continue
+            except OSError:
+                return None
+            return master if master.source == key else None
+        return None
+
+    def _publish_shared_symbols(self, master: SymbolMaster) -> None:
+        """
+        Publish the symbols' master in shared memory for other processes.
+        Failures are only logged as sharing is an optimisation.
+
+        :param `master`: The symbols' master
+        :type `master`: `SymbolMaster`
+        :return: None
+        """
+        if not self._symbols_shared_memory:
+            return
         try:
-            open(symbols_filename, "r")
-        except FileNotFoundError:
-            r: Response = self._req_sess.request(
+            master.publish(self._symbols_shared_memory)
+        except OSError as e:
+            logger.debug(
+                f"Couldn't publish symbols' master to shared memory: {e}"
+            ) if self._logging else None
+
+    def _load_symbols_snapshot(
+        self, key: Union[tuple[int, int], None]
+    ) -> Union[SymbolMaster, None]:
+        """
+        Load the binary snapshot of the symbols' master if it was built from
+        the current symbols' master file.
+
+        :param `key`: Key of the current symbols' master file
+        :type `key`: `tuple[int, int] | None`
+        :return: The symbols' master, or `None` if there is no usable snapshot
+        :rtype: `SymbolMaster | None`
+        """
+        if not self._symbols_snapshot_filename or key is None:
+            return None
+        try:
+            master: SymbolMaster = SymbolMaster.load(
+                self._symbols_snapshot_filename
+            )
+        except (OSError, ValueError):
+            return None
+        return master if master.source == key else None
+
+    def _save_symbols_snapshot(self, master: SymbolMaster) -> None:
+        """
+        Save the binary snapshot of the symbols' master. Failures are only
+        logged as the snapshot is an optimisation.
+
+        :param `master`: The symbols' master
+        :type `master`: `SymbolMaster`
+        :return: None
+        """
+        if not self._symbols_snapshot_filename:
+            return
+        try:
+            master.save(self._symbols_snapshot_filename)
+        except OSError as e:
+            logger.debug(
+                f"Couldn't save symbols' master snapshot: {e}"
+            ) if self._logging else None
+
+    def refresh_symbols(self, force: bool = False) -> None:
+        """
+        Download the symbols' master file if the cached one is stale.
+
+        A cached file younger than `symbols_max_age` is used as is. Otherwise
+        it is revalidated with its ETag and Last-Modified validators and only
+        downloaded again if it changed on the server. Concurrent refreshes of
+        the same cache directory, even from other processes, share a single
+        download.
+
+        :param `force`: Download the file even if the cached one is fresh
+        :type `force`: `bool`
+        :return: None
+        """
+        requested_at: float = time()
+        makedirs(dirname(self._symbols_filename), exist_ok=True)
+        with _file_lock(f"{self._symbols_filename}.lock"):
+            metadata: dict[str, Any] = self._read_symbols_metadata()
+            cached: bool = isfile(self._symbols_filename)
+            if cached and not force:
+                checked: float = metadata.get("checked", 0)
+                # Skip if fresh or refreshed by someone else while we waited
+                if (
+                    checked >= requested_at
+                    or time() - checked < self._symbols_max_age
+                ):
+                    return
+
+            headers: dict[str, str] = {}
+            if cached and not force:
+                if metadata.get("etag"):
+                    headers["If-None-Match"] = metadata["etag"]
+                if metadata.get("last_modified"):
+                    headers["If-Modified-Since"] = metadata["last_modified"]
+
+            with self._req_sess.request(
                 method="GET",
                 url="https://app.definedgesecurities.com/public/allmaster.zip",
+                headers=headers,
                 verify=True,
                 allow_redirects=True,
                 timeout=self._timeout,
                 proxies=self._proxies,
-            )
-            with ZipFile(BytesIO(r.content), "r") as z:
-                z.extract("allmaster.csv", abspath(dirname(__file__)))
+                stream=True,
+            ) as r:
+                if r.status_code == 304:
+                    logger.debug(
+                        "Symbols' master file not modified"
+                    ) if self._logging else None
+                else:
+                    r.raise_for_status()
+                    self._extract_symbols(r)
+                    metadata = {
+                        "etag": r.headers.get("ETag"),
+                        "last_modified": r.headers.get("Last-Modified"),
+                    }
+            metadata["checked"] = time()
+            self._write_symbols_metadata(metadata)
+
+    def _extract_symbols(self, r: Response) -> None:
+        """
+        Stream the symbols' master archive to a temporary file in chunks,
+        extract the master file from it and atomically move it into place,
+        so that a partially written file is never visible to readers.
 
-        # Create a generator of symbols
-        with open(symbols_filename, "r") as fp:
-            for line in reader(fp):
-                yield {
-                    "segment": line[0],
-                    "token": line[1],
-                    "symbol": line[2],
-                    "trading_symbol": line[3],
-                    "instrument_type": line[4],
-                    "expiry": line[5],
-                    "tick_size": line[6],
-                    "lot_size": line[7],
-                    "option_type": line[8],
-                    "strike": str(
-                        int(
-                            int(line[9]) / (int(line[11]) * 10 ** int(line[10]))
-                        )
-                    ),
-                    "isin": line[12],
-                    "price_mult": line[13],
-                }
+        :param `r`: The streamed response of the archive
+        :type `r`: `Response`
+        :return: None
+        """
+        directory: str = dirname(self._symbols_filename)
+        with TemporaryFile(dir=directory) as archive:
+            for chunk in r.iter_content(chunk_size=self._chunk_size):
+                archive.write(chunk)
+            archive.seek(0)
+            with ZipFile(archive, "r") as z, z.open("allmaster.csv") as src:
+                write_atomically(
+                    self._symbols_filename,
+                    lambda fp: copyfileobj(src, fp, self._chunk_size),
+                )
+
+    def _download_symbols(self) -> None:
+        """
+        Download the symbols' master file if not present.
+
+        :return: None
+        """
+        if not isfile(self._symbols_filename):
+            self.refresh_symbols(force=True)
+
+    def _read_symbols_metadata(self) -> dict[str, Any]:
+        """
+        Read the HTTP validators and the last check time of the cached
+        symbols' master file.
+
+        :return: The metadata, or an empty dict if there is none
+        :rtype: `dict[str, Any]`
+        """
+        try:
+            with open(self._symbols_metadata_filename, "r") as fp:
+                metadata: dict[str, Any] = load(fp)
+        except (OSError, ValueError):
+            return {}
+        return metadata if isinstance(metadata, dict) else {}
+
+    def _write_symbols_metadata(self, metadata: dict[str, Any]) -> None:
+        """
+        Write the HTTP validators and the last check time of the cached
+        symbols' master file.
+
+        :param `metadata`: The metadata
+        :type `metadata`: `dict[str, Any]`
+        :return: None
+        """
+        write_atomically(
+            self._symbols_metadata_filename,
+            lambda fp: fp.write(dumps(metadata).encode("utf-8")),
+        )
+
+    def _symbol_master_is_current(self) -> bool:
+        """
+        Check if the symbols' master was built from the current symbols'
+        master file.
+
+        :return: `True` if the symbols' master is current, else `False`
+        :rtype: `bool`
+        """
+        key: Union[tuple[int, int], None] = self._symbols_file_key()
+        return (
+            key is not None
+            and self._symbol_master is not None
+            and key == self._symbol_master.source
+        )
+
+    def _symbols_file_key(self) -> Union[tuple[int, int], None]:
+        """
+        Identify the current symbols' master file by its modification time
+        and size.
+
+        :return: The file key, or `None` if the file is not present
+        :rtype: `tuple[int, int] | None`
+        """
+        try:
+            st = stat(self._symbols_filename)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
 
     def send_request(  # noqa: C901
         self,
@@ -358,6 +811,7 @@ class ConnectToIntegrate:
         data_params: Union[dict[str, Any], None] = None,
         query_params: Union[dict[str, str], None] = None,
         extra_headers: Union[dict[str, str], None] = None,
+        raw: bool = False,
     ) -> dict[str, Any]:
         """
         Make an HTTP request.
@@ -370,6 +824,7 @@ class ConnectToIntegrate:
         :param `data_params`: The data parameters
         :param `query_params`: The query parameters
         :param `extra_headers`: The extra headers
+        :param `raw`: Return a CSV response as `bytes` instead of lines
         :type `route_prefix`: `str`
         :type `route`: `str`
         :type `method`: `str`
@@ -378,6 +833,7 @@ class ConnectToIntegrate:
         :type `data_params`: `dict`
         :type `query_params`: `dict`
         :type `extra_headers`: `dict`
+        :type `raw`: `bool`
         :return: The response
         :rtype: `dict`
         """
@@ -428,7 +884,9 @@ class ConnectToIntegrate:
         elif "text/csv" in r.headers["content-type"]:
             try:
                 data = {
-                    "data": (line.decode('utf-8') for line in r.iter_lines())
+                    "data": r.content
+                    if raw
+                    else (line.decode('utf-8') for line in r.iter_lines())
                 }
             except Exception:
                 raise Exception(f"Couldn't parse CSV response: {r.content}")
@@ -437,6 +895,21 @@ class ConnectToIntegrate:
                 f"Unknown Content-Type ({r.headers['content-type']}): ({r.content})"
             )
 
+        return self._check_response(data, r.request.url)
+
+    def _check_response(
+        self, data: dict[str, Any], url: str
+    ) -> dict[str, Any]:
+        """
+        Raise the errors reported in a response.
+
+        :param `data`: The response
+        :param `url`: The URL of the request
+        :type `data`: `dict`
+        :type `url`: `str`
+        :return: The response
+        :rtype: `dict`
+        """
         if "status" in data:
             if data["status"] == "ERROR":
                 if (
@@ -451,10 +924,45 @@ class ConnectToIntegrate:
                     raise Exception(f"Error: {data}")
             elif (
                 data["status"] == "SUCCESS"
-                and r.request.url == f"{self.base_url}/sliceorder"
+                and url == f"{self.base_url}/sliceorder"
             ):
                 for order in data["orders"]:
                     if order["status"] == "ERROR":
                         raise Exception(f"Error: {data}")
 
         return data
+
+
+@contextmanager
+def _file_lock(filename: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock shared between threads and processes on a lock
+    file. The lock is released by the operating system when its holder
+    exits, so that a crashed holder never leaves a stale lock behind.
+
+    :param `filename`: Path of the lock file
+    :type `filename`: `str`
+    :return: A context manager holding the lock
+    :rtype: `Iterator[None]`
+    """
+    fd: int = os_open(filename, O_CREAT | O_RDWR)
+    try:
+        if sys.platform == "win32":
+            while True:
+                try:
+                    # Gives up with an OSError after retrying for 10 seconds
+                    locking(fd, LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        else:
+            flock(fd, LOCK_EX)
+        try:
+            yield
+        finally:
+            if sys.platform == "win32":
+                locking(fd, LK_UNLCK, 1)
+            else:
+                flock(fd, LOCK_UN)
+    finally:
+        close(fd)
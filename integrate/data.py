@@ -50,6 +50,17 @@ Example:
         end=datetime.strptime("300620231530", "%d%m%Y%H%M"),
     )
 
+    # Fetch daily bars for many symbols, 8 at a time
+    for exchange, trading_symbol, bars in ic.bulk_historical_data(
+        [(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ"), (c2i.EXCHANGE_TYPE_NSE, "SBIN-EQ")],
+        timeframe=c2i.TIMEFRAME_TYPE_DAY,
+        start=datetime.strptime("010120230915", "%d%m%Y%H%M"),
+        end=datetime.strptime("300620231530", "%d%m%Y%H%M"),
+        max_workers=8,
+        rate_limit=10,
+    ):
+        print(trading_symbol, len(bars))
+
     # Fetch quotes for a symbol
     quotes = ic.quotes(
         exchange=c2i.EXCHANGE_TYPE_NSE,
@@ -63,15 +74,97 @@ Example:
     )
 """
 
-from datetime import datetime
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import chain
 from logging import DEBUG, Logger, getLogger
-from typing import Any, Generator, Union
+from threading import Lock
+from time import monotonic, sleep
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Generator, Union
 
 from integrate import ConnectToIntegrate
+from integrate.cache import TTLCache
+from integrate.symbols import SymbolRow
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from integrate.history import HistoryCache
 
 logger: Logger = getLogger(__name__)
 logger.setLevel(DEBUG)
 
+_MINUTES: tuple[timedelta, ...] = tuple(
+    timedelta(minutes=minute) for minute in range(24 * 60)
+)
+
+
+def parse_timestamp(value: str, cache: bool = True) -> datetime:
+    """
+    Parse a timestamp written as DDMMYYYYHHMM.
+
+    This is a faster equivalent of
+    `datetime.strptime(value, "%d%m%Y%H%M")` for the fixed format used by
+    the historical data API. Bars share few distinct dates, so by default
+    the dates are cached and only the time of the day is added per call.
+
+    :param `value`: The timestamp
+    :param `cache`: Whether to cache the parsed dates. Defaults to `True`.
+    :type `value`: `str`
+    :type `cache`: `bool`
+    :return: The parsed timestamp
+    :rtype: `datetime`
+    :raises ValueError: If the timestamp is not valid
+    """
+    if len(value) != 12:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    hours: int = int(value[8:10])
+    minutes: int = int(value[10:12])
+    if hours > 23 or minutes > 59:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+
+    if cache:
+        return _parse_date(value[:8]) + _MINUTES[hours * 60 + minutes]
+    return datetime(
+        int(value[4:8]), int(value[2:4]), int(value[:2]), hours, minutes
+    )
+
+
+def _import_history(feature: str) -> ModuleType:
+    """
+    Import the NumPy based history module.
+
+    :param `feature`: Name of the feature needing it, for the error message
+    :type `feature`: `str`
+    :return: The `integrate.history` module
+    :rtype: `ModuleType`
+    :raises ImportError: If NumPy is not installed
+    """
+    try:
+        import integrate.history
+    except ImportError as e:
+        raise ImportError(
+            f"NumPy is required for {feature}. "
+            "Install it with `pip install pyintegrate[numpy]`."
+        ) from e
+    return integrate.history
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: str) -> datetime:
+    """
+    Parse a date written as DDMMYYYY.
+
+    :param `value`: The date
+    :type `value`: `str`
+    :return: The parsed date at midnight
+    :rtype: `datetime`
+    """
+    return datetime(int(value[4:8]), int(value[2:4]), int(value[:2]))
+
 
 class IntegrateData:
     """
@@ -79,19 +172,53 @@ class IntegrateData:
 
     :param `connect_to_integrate`: The connection object.
     :param `logging`: Enable or disable logging. Defaults to `False`. If set to True, will print all requests and responses to logger.
+    :param `history_cache_dir`: Directory in which to cache historical bars. Defaults to `None`, no cache. Needs NumPy to be installed.
     :type `connect_to_integrate`: `ConnectToIntegrate`
     :type `logging`: `bool`
+    :param `security_information_ttl`: Seconds for which to cache security information. Defaults to `None`, no cache.
+    :param `quotes_ttl`: Seconds for which to cache quotes. Defaults to `None`, no cache.
+    :param `cache_size`: Maximum number of securities in each cache. Defaults to `1024`.
+    :type `history_cache_dir`: `str | None`
+    :type `security_information_ttl`: `float | None`
+    :type `quotes_ttl`: `float | None`
+    :type `cache_size`: `int`
     """
 
+    HISTORY_URL = "https://data.definedgesecurities.com/sds/history/"
+
     def __init__(
         self,
         connect_to_integrate: ConnectToIntegrate,
         logging: bool = False,
+        history_cache_dir: Union[str, None] = None,
+        security_information_ttl: Union[float, None] = None,
+        quotes_ttl: Union[float, None] = None,
+        cache_size: int = 1024,
     ) -> None:
         self._logging: bool = logging
 
         self.c2i: ConnectToIntegrate = connect_to_integrate
 
+        self.security_information_cache: Union[TTLCache, None] = (
+            TTLCache(security_information_ttl, cache_size)
+            if security_information_ttl
+            else None
+        )
+        self.quotes_cache: Union[TTLCache, None] = (
+            TTLCache(quotes_ttl, cache_size) if quotes_ttl else None
+        )
+
+        self._in_flight: dict[tuple[str, str], Future[dict[str, Any]]] = {}
+        self._in_flight_lock: Lock = Lock()
+
+        self._history_cache: Union[HistoryCache, None] = (
+            _import_history("history_cache_dir").HistoryCache(
+                history_cache_dir
+            )
+            if history_cache_dir
+            else None
+        )
+
     def historical_data(
         self,
         exchange: str,
@@ -99,85 +226,254 @@ class IntegrateData:
         timeframe: str,
         start: datetime,
         end: datetime,
+        window: Union[timedelta, None] = None,
+        max_workers: int = 4,
     ) -> Generator[dict[str, Any], None, None]:
         """
         Retrieve historical data for an security.
 
+        Bars are served from the history cache if the connection was created
+        with a `history_cache_dir`.
+
         :param `exchange`: Exchange in which security is listed. Currently NSE, BSE, NFO, CDS, MCX are supported.
         :param `trading_symbol`: Trading symbol of the security.
         :param `timeframe`: Timeframe of the data. day or minute are supported.
         :param `start`: Start date of the data.
         :param `end`: End date of the data.
+        :param `window`: Split the range into windows of this length which are downloaded concurrently. Defaults to `None`, a single request.
+        :param `max_workers`: Maximum number of windows downloaded at once. Defaults to `4`.
         :type `exchange`: `str`
         :type `trading_symbol`: `str`
         :type `timeframe`: `str`
         :type `start`: `datetime`
         :type `end`: `datetime`
+        :type `window`: `timedelta | None`
+        :type `max_workers`: `int`
         :returns: Historical data for the security.
         :rtype: `Generator[dict[str, Any], None, None]`
         """
+        if timeframe not in self.c2i.timeframe_types:
+            raise ValueError("Invalid timeframe")
+
+        yield from self._history_rows(
+            exchange,
+            self._token(exchange, trading_symbol),
+            timeframe,
+            start,
+            end,
+            window,
+            max_workers,
+        )
+
+    def historical_data_arrays(
+        self,
+        exchange: str,
+        trading_symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        window: Union[timedelta, None] = None,
+        max_workers: int = 4,
+    ) -> dict[str, "np.ndarray"]:
+        """
+        Retrieve historical data for an security as columnar NumPy arrays.
+
+        The whole response is parsed at once instead of line by line, which
+        is much faster and lighter than :py:meth:`historical_data` for long
+        ranges of minute data. Bars are served from the history cache if the
+        connection was created with a `history_cache_dir`. Needs NumPy to be
+        installed.
+
+        :param `exchange`: Exchange in which security is listed. Currently NSE, BSE, NFO, CDS, MCX are supported.
+        :param `trading_symbol`: Trading symbol of the security.
+        :param `timeframe`: Timeframe of the data. day or minute are supported.
+        :param `start`: Start date of the data.
+        :param `end`: End date of the data.
+        :param `window`: Split the range into windows of this length which are downloaded concurrently. Defaults to `None`, a single request.
+        :param `max_workers`: Maximum number of windows downloaded at once. Defaults to `4`.
+        :type `exchange`: `str`
+        :type `trading_symbol`: `str`
+        :type `timeframe`: `str`
+        :type `start`: `datetime`
+        :type `end`: `datetime`
+        :type `window`: `timedelta | None`
+        :type `max_workers`: `int`
+        :returns: Columns datetime, open, high, low, close, volume and oi, if available, of the bars.
+        :rtype: `dict[str, np.ndarray]`
+        """
+        _import_history("historical_data_arrays")
+
+        if timeframe not in self.c2i.timeframe_types:
+            raise ValueError("Invalid timeframe")
+        if timeframe == self.c2i.TIMEFRAME_TYPE_TICK:
+            raise ValueError(
+                "Tick data can't be parsed into bars, use historical_ticks"
+            )
+
+        return self._history_arrays(
+            exchange,
+            self._token(exchange, trading_symbol),
+            timeframe,
+            start,
+            end,
+            window,
+            max_workers,
+        )
+
+    def historical_ticks(
+        self,
+        exchange: str,
+        trading_symbol: str,
+        start: datetime,
+        end: datetime,
+    ) -> "np.ndarray":
+        """
+        Retrieve tick data for an security as a structured NumPy array.
+
+        The whole response is parsed at once into a compact array of
+        :py:data:`integrate.history.TICK_DTYPE` with fields utc, the epoch
+        time in seconds, ltp, ltq and oi. Needs NumPy to be installed.
+
+        :param `exchange`: Exchange in which security is listed. Currently NSE, BSE, NFO, CDS, MCX are supported.
+        :param `trading_symbol`: Trading symbol of the security.
+        :param `start`: Start date of the data.
+        :param `end`: End date of the data.
+        :type `exchange`: `str`
+        :type `trading_symbol`: `str`
+        :type `start`: `datetime`
+        :type `end`: `datetime`
+        :returns: The ticks.
+        :rtype: `np.ndarray`
+        """
+        history: ModuleType = _import_history("historical_ticks")
+
+        return history.parse_ticks(
+            next(
+                self._fetch_history(
+                    exchange,
+                    self._token(exchange, trading_symbol),
+                    self.c2i.TIMEFRAME_TYPE_TICK,
+                    start,
+                    end,
+                    None,
+                    1,
+                    raw=True,
+                )
+            )
+        )
+
+    def resample(
+        self,
+        data: Union[dict[str, "np.ndarray"], "np.ndarray"],
+        interval: timedelta,
+        exchange: str,
+    ) -> dict[str, "np.ndarray"]:
+        """
+        Resample bars from :py:meth:`historical_data_arrays` or ticks from
+        :py:meth:`historical_ticks` into bars of any interval.
+
+        Intraday bars are aligned to the opening of the session of the
+        exchange, 09:15 for NSE and 09:00 for MCX, bars of whole days to
+        midnight and bars of whole weeks to Monday. Needs NumPy to be
+        installed.
+
+        :param `data`: Bars or ticks in time order.
+        :param `interval`: Length of the resampled bars, e.g. `timedelta(minutes=75)` or `timedelta(weeks=1)`.
+        :param `exchange`: Exchange in which security is listed. Currently NSE, BSE, NFO, CDS, MCX are supported.
+        :type `data`: `dict[str, np.ndarray] | np.ndarray`
+        :type `interval`: `timedelta`
+        :type `exchange`: `str`
+        :returns: Columns datetime, open, high, low, close, volume and oi, if available, of the bars.
+        :rtype: `dict[str, np.ndarray]`
+        """
+        history: ModuleType = _import_history("resample")
+
         if exchange not in self.c2i.exchange_types:
             raise ValueError("Invalid exchange type")
 
+        if isinstance(data, dict):
+            return history.resample_bars(
+                data, interval, history.SESSION_OPEN[exchange]
+            )
+        return history.resample_ticks(
+            data, interval, history.SESSION_OPEN[exchange]
+        )
+
+    def bulk_historical_data(
+        self,
+        symbols: Iterable[tuple[str, str]],
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        arrays: bool = False,
+        max_workers: int = 8,
+        rate_limit: Union[float, None] = None,
+    ) -> Iterator[tuple[str, str, Any]]:
+        """
+        Retrieve historical data for many securities concurrently.
+
+        Tokens of all the securities are resolved before anything is
+        downloaded. The data of each security is yielded as soon as its
+        download completes, so not in the order of `symbols`.
+
+        :param `symbols`: Exchange and trading symbol of each security.
+        :param `timeframe`: Timeframe of the data. day or minute are supported.
+        :param `start`: Start date of the data.
+        :param `end`: End date of the data.
+        :param `arrays`: Return columnar NumPy arrays, as :py:meth:`historical_data_arrays` does, instead of lists of bars. Defaults to `False`.
+        :param `max_workers`: Maximum number of securities downloaded at once. Defaults to `8`.
+        :param `rate_limit`: Maximum number of requests started per second. Defaults to `None`, no limit.
+        :type `symbols`: `Iterable[tuple[str, str]]`
+        :type `timeframe`: `str`
+        :type `start`: `datetime`
+        :type `end`: `datetime`
+        :type `arrays`: `bool`
+        :type `max_workers`: `int`
+        :type `rate_limit`: `float | None`
+        :returns: Exchange, trading symbol and historical data of each security.
+        :rtype: `Iterator[tuple[str, str, Any]]`
+        """
+        if arrays:
+            _import_history("bulk_historical_data(arrays=True)")
+
         if timeframe not in self.c2i.timeframe_types:
             raise ValueError("Invalid timeframe")
 
-        token: Union[str, None] = next(
-            (
-                i["token"]
-                for i in self.c2i.symbols
-                if i["segment"] == exchange
-                and i["trading_symbol"] == trading_symbol
-            ),
-            None,
+        tokens: dict[tuple[str, str], str] = {
+            (exchange, trading_symbol): self._token(exchange, trading_symbol)
+            for exchange, trading_symbol in symbols
+        }
+
+        limiter: Union[RateLimiter, None] = (
+            RateLimiter(rate_limit) if rate_limit else None
         )
-        if token:
-            try:
-                historical_data: dict[str, Any] = self.c2i.send_request(
-                    route_prefix="https://data.definedgesecurities.com/sds/history/",
-                    route=f"{exchange}/{token}/{timeframe}/{start.strftime('%d%m%Y%H%M')}/{end.strftime('%d%m%Y%H%M')}",
-                    method="GET",
+
+        def download(exchange: str, token: str) -> Any:
+            if arrays:
+                return self._history_arrays(
+                    exchange, token, timeframe, start, end, limiter=limiter
+                )
+            return list(
+                self._history_rows(
+                    exchange, token, timeframe, start, end, limiter=limiter
                 )
-                for line in historical_data["data"]:
-                    if len(line):
-                        data: list[str] = line.split(",")
-                        if len(data) == 7:
-                            yield {
-                                "datetime": datetime.strptime(
-                                    data[0], "%d%m%Y%H%M"
-                                ),
-                                "open": float(data[1]),
-                                "high": float(data[2]),
-                                "low": float(data[3]),
-                                "close": float(data[4]),
-                                "volume": int(data[5]),
-                                "oi": int(data[6]),
-                            }
-                        elif len(data) == 4:
-                            yield {
-                                "utc": data[0],
-                                "ltp": float(data[1]),
-                                "ltq": float(data[2]),
-                                "oi": float(data[3]),                             
-                            }
-                        else:
-                            yield {
-                                "datetime": datetime.strptime(
-                                    data[0], "%d%m%Y%H%M"
-                                ),
-                                "open": float(data[1]),
-                                "high": float(data[2]),
-                                "low": float(data[3]),
-                                "close": float(data[4]),
-                                "volume": int(data[5]),
-                            }
-            except Exception as e:
-                raise e
-        else:
-            raise Exception(
-                f"Token not found for {trading_symbol} in symbols file"
             )
 
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers)
+        try:
+            futures: dict[Future[Any], tuple[str, str]] = {
+                executor.submit(download, exchange, token): (
+                    exchange,
+                    trading_symbol,
+                )
+                for (exchange, trading_symbol), token in tokens.items()
+            }
+            for future in as_completed(futures):
+                exchange, trading_symbol = futures[future]
+                yield exchange, trading_symbol, future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
     def quotes(self, exchange: str, trading_symbol: str) -> dict[str, Any]:
         """
         Retrieve quotes for an security.
@@ -189,28 +485,40 @@ class IntegrateData:
         :returns: Quote for the security.
         :rtype: `dict[str, Any]`
         """
-        if exchange not in self.c2i.exchange_types:
-            raise ValueError("Invalid exchange type")
+        return self._quotes(exchange, self._token(exchange, trading_symbol))
 
-        token: Union[str, None] = next(
-            (
-                i["token"]
-                for i in self.c2i.symbols
-                if i["segment"] == exchange
-                and i["trading_symbol"] == trading_symbol
-            ),
-            None,
-        )
-        if token:
-            return self.c2i.send_request(
-                route_prefix=self.c2i.base_url,
-                route=f"quotes/{exchange}/{token}",
-                method="GET",
-            )
-        else:
-            raise Exception(
-                f"Token not found for {trading_symbol} in symbols file"
-            )
+    def bulk_quotes(
+        self, symbols: Iterable[tuple[str, str]], max_workers: int = 10
+    ) -> dict[tuple[str, str], dict[str, Any]]:
+        """
+        Retrieve quotes for many securities concurrently.
+
+        Tokens of all the securities are resolved before anything is
+        requested and each distinct security is requested once. A request
+        for a security whose quote is already being fetched, also by
+        another thread calling :py:meth:`quotes`, waits for that response
+        instead of sending another one.
+
+        :param `symbols`: Exchange and trading symbol of each security.
+        :param `max_workers`: Maximum number of requests sent at once. Defaults to `10`, the size of the connection pool of the session.
+        :type `symbols`: `Iterable[tuple[str, str]]`
+        :type `max_workers`: `int`
+        :returns: Quote of each security keyed by exchange and trading symbol.
+        :rtype: `dict[tuple[str, str], dict[str, Any]]`
+        """
+        tokens: dict[tuple[str, str], str] = {
+            (exchange, trading_symbol): self._token(exchange, trading_symbol)
+            for exchange, trading_symbol in symbols
+        }
+
+        if not tokens:
+            return {}
+        with ThreadPoolExecutor(min(max_workers, len(tokens))) as executor:
+            futures: dict[tuple[str, str], Future[dict[str, Any]]] = {
+                key: executor.submit(self._quotes, key[0], token)
+                for key, token in tokens.items()
+            }
+            return {key: future.result() for key, future in futures.items()}
 
     def security_information(
         self, exchange: str, trading_symbol: str
@@ -225,25 +533,435 @@ class IntegrateData:
         :returns: Details about the security.
         :rtype: `dict[str, Any]`
         """
+        token: str = self._token(exchange, trading_symbol)
+        cache: Union[TTLCache, None] = self.security_information_cache
+        if cache is not None:
+            cached: Union[dict[str, Any], None] = cache.get((exchange, token))
+            if cached is not None:
+                return dict(cached)
+        security_information: dict[str, Any] = self.c2i.send_request(
+            route_prefix=self.c2i.base_url,
+            route=f"securityinfo/{exchange}/{token}",
+            method="GET",
+        )
+        # Errors passed on to the session expired callback aren't cached
+        if cache is not None and security_information.get("status") != "ERROR":
+            cache.set((exchange, token), dict(security_information))
+        return security_information
+
+    def _token(self, exchange: str, trading_symbol: str) -> str:
+        """
+        Find the token of a security.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `trading_symbol`: Trading symbol of the security
+        :type `exchange`: `str`
+        :type `trading_symbol`: `str`
+        :return: The token
+        :rtype: `str`
+        :raises ValueError: If the exchange is invalid
+        :raises Exception: If the token isn't found in the symbols file
+        """
         if exchange not in self.c2i.exchange_types:
             raise ValueError("Invalid exchange type")
 
-        token: Union[str, None] = next(
-            (
-                i["token"]
-                for i in self.c2i.symbols
-                if i["segment"] == exchange
-                and i["trading_symbol"] == trading_symbol
-            ),
-            None,
+        symbol: Union[SymbolRow, None] = self.c2i.get_symbol(
+            exchange, trading_symbol
         )
-        if token:
-            return self.c2i.send_request(
-                route_prefix=self.c2i.base_url,
-                route=f"securityinfo/{exchange}/{token}",
-                method="GET",
-            )
-        else:
+        if not symbol:
             raise Exception(
                 f"Token not found for {trading_symbol} in symbols file"
             )
+        return symbol["token"]
+
+    def _quotes(self, exchange: str, token: str) -> dict[str, Any]:
+        """
+        Retrieve the quote for a token, sharing the response with every
+        concurrent caller asking for the same token.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :return: Quote for the security
+        :rtype: `dict[str, Any]`
+        """
+        key: tuple[str, str] = (exchange, token)
+        if self.quotes_cache is not None:
+            cached: Union[dict[str, Any], None] = self.quotes_cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+        with self._in_flight_lock:
+            future: Union[Future[dict[str, Any]], None] = self._in_flight.get(
+                key
+            )
+            leader: bool = future is None
+            if future is None:
+                future = self._in_flight[key] = Future()
+
+        if leader:
+            try:
+                quote: dict[str, Any] = self.c2i.send_request(
+                    route_prefix=self.c2i.base_url,
+                    route=f"quotes/{exchange}/{token}",
+                    method="GET",
+                )
+                # Errors passed on to the session expired callback aren't
+                # cached
+                if (
+                    self.quotes_cache is not None
+                    and quote.get("status") != "ERROR"
+                ):
+                    self.quotes_cache.set(key, quote)
+                future.set_result(quote)
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._in_flight_lock:
+                    del self._in_flight[key]
+        else:
+            logger.debug(
+                f"Waiting for the quote of {exchange}/{token} in flight"
+            ) if self._logging else None
+        # Every caller gets its own copy of the shared response
+        return dict(future.result())
+
+    def _history_rows(
+        self,
+        exchange: str,
+        token: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        window: Union[timedelta, None] = None,
+        max_workers: int = 4,
+        limiter: Union["RateLimiter", None] = None,
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Retrieve historical data for a token as one dictionary per bar.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :param `timeframe`: Timeframe of the data
+        :param `start`: Start date of the data
+        :param `end`: End date of the data
+        :param `window`: Length of the windows or `None`
+        :param `max_workers`: Maximum number of concurrent downloads
+        :param `limiter`: Rate limiter for the requests or `None`
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :type `timeframe`: `str`
+        :type `start`: `datetime`
+        :type `end`: `datetime`
+        :type `window`: `timedelta | None`
+        :type `max_workers`: `int`
+        :type `limiter`: `RateLimiter | None`
+        :returns: Historical data for the security.
+        :rtype: `Generator[dict[str, Any], None, None]`
+        """
+        if (
+            self._history_cache is not None
+            and timeframe != self.c2i.TIMEFRAME_TYPE_TICK
+        ):
+            yield from _import_history("history_cache_dir").bar_rows(
+                self._history_arrays(
+                    exchange,
+                    token,
+                    timeframe,
+                    start,
+                    end,
+                    window,
+                    max_workers,
+                    limiter,
+                )
+            )
+            return
+
+        for line in chain.from_iterable(
+            self._fetch_history(
+                exchange,
+                token,
+                timeframe,
+                start,
+                end,
+                window,
+                max_workers,
+                limiter=limiter,
+            )
+        ):
+            if len(line):
+                yield self._history_row(line)
+
+    @staticmethod
+    def _history_row(line: str) -> dict[str, Any]:
+        """
+        Parse a line of historical data.
+
+        :param `line`: The line
+        :type `line`: `str`
+        :return: The bar or tick
+        :rtype: `dict[str, Any]`
+        """
+        data: list[str] = line.split(",")
+        if len(data) == 7:
+            return {
+                "datetime": parse_timestamp(data[0]),
+                "open": float(data[1]),
+                "high": float(data[2]),
+                "low": float(data[3]),
+                "close": float(data[4]),
+                "volume": int(data[5]),
+                "oi": int(data[6]),
+            }
+        elif len(data) == 4:
+            return {
+                "utc": data[0],
+                "ltp": float(data[1]),
+                "ltq": float(data[2]),
+                "oi": float(data[3]),
+            }
+        else:
+            return {
+                "datetime": parse_timestamp(data[0]),
+                "open": float(data[1]),
+                "high": float(data[2]),
+                "low": float(data[3]),
+                "close": float(data[4]),
+                "volume": int(data[5]),
+            }
+
+    def _history_arrays(
+        self,
+        exchange: str,
+        token: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        window: Union[timedelta, None] = None,
+        max_workers: int = 4,
+        limiter: Union["RateLimiter", None] = None,
+    ) -> dict[str, "np.ndarray"]:
+        """
+        Retrieve historical data for a token as columnar NumPy arrays,
+        through the history cache if there is one.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :param `timeframe`: Timeframe of the data
+        :param `start`: Start date of the data
+        :param `end`: End date of the data
+        :param `window`: Length of the windows or `None`
+        :param `max_workers`: Maximum number of concurrent downloads
+        :param `limiter`: Rate limiter for the requests or `None`
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :type `timeframe`: `str`
+        :type `start`: `datetime`
+        :type `end`: `datetime`
+        :type `window`: `timedelta | None`
+        :type `max_workers`: `int`
+        :type `limiter`: `RateLimiter | None`
+        :returns: Columns of the bars.
+        :rtype: `dict[str, np.ndarray]`
+        """
+        history: ModuleType = _import_history("historical_data_arrays")
+
+        def fetch(start: datetime, end: datetime) -> dict[str, Any]:
+            return history.parse_bars(
+                b"\n".join(
+                    self._fetch_history(
+                        exchange,
+                        token,
+                        timeframe,
+                        start,
+                        end,
+                        window,
+                        max_workers,
+                        raw=True,
+                        limiter=limiter,
+                    )
+                )
+            )
+
+        if (
+            self._history_cache is not None
+            and timeframe != self.c2i.TIMEFRAME_TYPE_TICK
+        ):
+            return self._history_cache.bars(
+                exchange, token, timeframe, start, end, fetch
+            )
+        return fetch(start, end)
+
+    def _fetch_history(
+        self,
+        exchange: str,
+        token: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        window: Union[timedelta, None],
+        max_workers: int,
+        raw: bool = False,
+        limiter: Union["RateLimiter", None] = None,
+    ) -> Iterator[Any]:
+        """
+        Download the historical data of a security, either in a single
+        request or split into windows downloaded over a thread pool.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :param `timeframe`: Timeframe of the data
+        :param `start`: Start date of the data
+        :param `end`: End date of the data
+        :param `window`: Length of the windows or `None`
+        :param `max_workers`: Maximum number of concurrent downloads
+        :param `raw`: Whether to return the bodies as `bytes`
+        :param `limiter`: Rate limiter for the requests or `None`
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :type `timeframe`: `str`
+        :type `start`: `datetime`
+        :type `end`: `datetime`
+        :type `window`: `timedelta | None`
+        :type `max_workers`: `int`
+        :type `raw`: `bool`
+        :type `limiter`: `RateLimiter | None`
+        :return: The body, or lines of the body, of each window in order
+        :rtype: `Iterator[Any]`
+        """
+
+        def fetch(start: datetime, end: datetime) -> Any:
+            if limiter is not None:
+                limiter.wait()
+            historical_data: dict[str, Any] = self.c2i.send_request(
+                route_prefix=self.HISTORY_URL,
+                route=self._history_route(
+                    exchange, token, timeframe, start, end
+                ),
+                method="GET",
+                raw=raw,
+            )
+            # Read the whole body while still in the worker thread
+            return (
+                historical_data["data"]
+                if raw or window is None
+                else list(historical_data["data"])
+            )
+
+        if window is None:
+            yield fetch(start, end)
+            return
+
+        if timeframe == self.c2i.TIMEFRAME_TYPE_TICK:
+            raise ValueError("Tick data can't be split into windows")
+
+        windows: list[tuple[datetime, datetime]] = self._history_windows(
+            start, end, window
+        )
+        logger.debug(
+            f"Downloading {len(windows)} windows of {token}"
+        ) if self._logging else None
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers)
+        try:
+            # Results come back in the order of the windows
+            yield from executor.map(lambda w: fetch(*w), windows)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    @staticmethod
+    def _history_windows(
+        start: datetime, end: datetime, window: timedelta
+    ) -> list[tuple[datetime, datetime]]:
+        """
+        Split a range of historical data into consecutive windows. Both
+        ends of a range are inclusive, to the minute.
+
+        :param `start`: Start date of the data
+        :param `end`: End date of the data
+        :param `window`: Length of the windows
+        :type `start`: `datetime`
+        :type `end`: `datetime`
+        :type `window`: `timedelta`
+        :return: Start and end of each window
+        :rtype: `list[tuple[datetime, datetime]]`
+        :raises ValueError: If the windows are shorter than a minute
+        """
+        minute: timedelta = timedelta(minutes=1)
+        if window < minute:
+            raise ValueError("Windows must be at least a minute long")
+
+        windows: list[tuple[datetime, datetime]] = []
+        while start + window - minute < end:
+            windows.append((start, start + window - minute))
+            start += window
+        windows.append((start, end))
+        return windows
+
+    @staticmethod
+    def _history_route(
+        exchange: str,
+        token: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+    ) -> str:
+        """
+        Form the route of the historical data of a security.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :param `timeframe`: Timeframe of the data
+        :param `start`: Start date of the data
+        :param `end`: End date of the data
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :type `timeframe`: `str`
+        :type `start`: `datetime`
+        :type `end`: `datetime`
+        :return: The route
+        :rtype: `str`
+        """
+        return (
+            f"{exchange}/{token}/{timeframe}/"
+            f"{start.strftime('%d%m%Y%H%M')}/{end.strftime('%d%m%Y%H%M')}"
+        )
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing out calls evenly to stay under a rate.
+
+    :param `rate`: Maximum number of calls per second.
+    :type `rate`: `float`
+    """
+
+    def __init__(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self._interval: float = 1 / rate
+        self._next: float = monotonic()
+        self._lock: Lock = Lock()
+
+    def wait(self) -> None:
+        """
+        Block until the next call is allowed.
+
+        :return: None
+        """
+        delay: float = self.reserve()
+        if delay > 0:
+            sleep(delay)
+
+    def reserve(self) -> float:
+        """
+        Reserve the next allowed call without waiting for it.
+
+        :return: Seconds to wait before making the call
+        :rtype: `float`
+        """
+        with self._lock:
+            now: float = monotonic()
+            at: float = max(now, self._next)
+            self._next = at + self._interval
+        return at - now
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains the DepthBook and DepthBookStore classes, which merge
+the partial bid-ask depth updates streamed by the Integrate WebSocket API
+into a numeric five-level order book of each security.
+
+Example:
+
+.. code-block:: python
+
+    from integrate import ConnectToIntegrate, IntegrateWebSocket
+
+    c2i = ConnectToIntegrate()
+    c2i.login(api_token="YOUR_API_TOKEN", api_secret="YOUR_API_SECRET")
+
+    iws = IntegrateWebSocket(c2i, depth_books=True)
+    iws.connect(daemonize=True)
+    iws.subscribe(
+        c2i.SUBSCRIPTION_TYPE_DEPTH, [(c2i.EXCHANGE_TYPE_NSE, "22")]
+    )
+
+    # From any thread
+    book = iws.depth_book(c2i.EXCHANGE_TYPE_NSE, "22")
+    if book is not None:
+        print(book.bid_prices[0], book.ask_prices[0], book.weighted_mid)
+"""
+
+from collections.abc import Callable
+from threading import Lock
+from typing import Any, NamedTuple, Union
+
+# Number of price levels on each side of the book
+LEVELS: int = 5
+
+# Keys of the levels of each side in the depth messages
+_KEYS: dict[str, tuple[str, ...]] = {
+    prefix: tuple(f"{prefix}{level}" for level in range(1, LEVELS + 1))
+    for prefix in ("bp", "bq", "bo", "sp", "sq", "so")
+}
+
+
+class DepthBook(NamedTuple):
+    """
+    Immutable five-level order book of a security. The best level comes
+    first and empty levels have a price and quantity of 0.
+
+    :param `exchange`: Exchange in which security is listed
+    :param `token`: Token of the security
+    :param `bid_prices`: Bid prices
+    :param `bid_qtys`: Bid quantities
+    :param `bid_orders`: Number of bid orders
+    :param `ask_prices`: Ask prices
+    :param `ask_qtys`: Ask quantities
+    :param `ask_orders`: Number of ask orders
+    :param `total_bid_qty`: Total bid quantity over all levels
+    :param `total_ask_qty`: Total ask quantity over all levels
+    :param `spread`: Best ask price minus best bid price, `None` if a side is empty
+    :param `mid`: Average of the best bid and ask prices, `None` if a side is empty
+    :param `weighted_mid`: Best bid and ask prices weighted by the quantity on the other side, `None` if a side is empty
+    :type `exchange`: `str`
+    :type `token`: `str`
+    :type `bid_prices`: `tuple[float, ...]`
+    :type `bid_qtys`: `tuple[int, ...]`
+    :type `bid_orders`: `tuple[int, ...]`
+    :type `ask_prices`: `tuple[float, ...]`
+    :type `ask_qtys`: `tuple[int, ...]`
+    :type `ask_orders`: `tuple[int, ...]`
+    :type `total_bid_qty`: `int`
+    :type `total_ask_qty`: `int`
+    :type `spread`: `float | None`
+    :type `mid`: `float | None`
+    :type `weighted_mid`: `float | None`
+    """
+
+    exchange: str
+    token: str
+    bid_prices: tuple[float, ...] = (0.0,) * LEVELS
+    bid_qtys: tuple[int, ...] = (0,) * LEVELS
+    bid_orders: tuple[int, ...] = (0,) * LEVELS
+    ask_prices: tuple[float, ...] = (0.0,) * LEVELS
+    ask_qtys: tuple[int, ...] = (0,) * LEVELS
+    ask_orders: tuple[int, ...] = (0,) * LEVELS
+    total_bid_qty: int = 0
+    total_ask_qty: int = 0
+    spread: Union[float, None] = None
+    mid: Union[float, None] = None
+    weighted_mid: Union[float, None] = None
+
+    def merge(self, message: dict[str, Any]) -> "DepthBook":
+        """
+        Build the book updated with the fields of a depth message. The
+        spread and mids are only computed again if the best level changed.
+
+        :param `message`: The depth message
+        :type `message`: `dict[str, Any]`
+        :return: The updated book
+        :rtype: `DepthBook`
+        :raises ValueError: If a field isn't a number
+        """
+        bid_prices: tuple[float, ...] = _merge(
+            self.bid_prices, message, _KEYS["bp"], float
+        )
+        bid_qtys: tuple[int, ...] = _merge(
+            self.bid_qtys, message, _KEYS["bq"], int
+        )
+        ask_prices: tuple[float, ...] = _merge(
+            self.ask_prices, message, _KEYS["sp"], float
+        )
+        ask_qtys: tuple[int, ...] = _merge(
+            self.ask_qtys, message, _KEYS["sq"], int
+        )
+        tbq: Union[str, None] = message.get("tbq")
+        tsq: Union[str, None] = message.get("tsq")
+
+        spread: Union[float, None] = self.spread
+        mid: Union[float, None] = self.mid
+        weighted_mid: Union[float, None] = self.weighted_mid
+        if (
+            bid_prices[0] != self.bid_prices[0]
+            or ask_prices[0] != self.ask_prices[0]
+            or bid_qtys[0] != self.bid_qtys[0]
+            or ask_qtys[0] != self.ask_qtys[0]
+        ):
+            spread, mid, weighted_mid = _top(
+                bid_prices[0], bid_qtys[0], ask_prices[0], ask_qtys[0]
+            )
+
+        return DepthBook(
+            self.exchange,
+            self.token,
+            bid_prices,
+            bid_qtys,
+            _merge(self.bid_orders, message, _KEYS["bo"], int),
+            ask_prices,
+            ask_qtys,
+            _merge(self.ask_orders, message, _KEYS["so"], int),
+            self.total_bid_qty if tbq is None else int(tbq),
+            self.total_ask_qty if tsq is None else int(tsq),
+            spread,
+            mid,
+            weighted_mid,
+        )
+
+
+class DepthBookStore:
+    """
+    Latest order book of each security, merged from partial depth updates.
+
+    Every update replaces the book of the security with a new immutable
+    :py:class:`DepthBook`, so reading a book needs no lock and a book read
+    by one thread never changes while the WebSocket thread merges the next
+    updates.
+    """
+
+    def __init__(self) -> None:
+        self._books: dict[tuple[str, str], DepthBook] = {}
+        self._lock: Lock = Lock()
+
+    def update(self, message: dict[str, Any]) -> DepthBook:
+        """
+        Merge a depth message into the book of its security.
+
+        :param `message`: The depth message, with at least the `e` and `tk` fields
+        :type `message`: `dict[str, Any]`
+        :return: The merged book
+        :rtype: `DepthBook`
+        :raises KeyError: If the message has no exchange or token
+        :raises ValueError: If a field isn't a number
+        """
+        key: tuple[str, str] = (message["e"], message["tk"])
+        with self._lock:
+            previous: Union[DepthBook, None] = self._books.get(key)
+            book: DepthBook = (
+                previous if previous is not None else DepthBook(*key)
+            ).merge(message)
+            self._books[key] = book
+        return book
+
+    def latest(self, exchange: str, token: str) -> Union[DepthBook, None]:
+        """
+        Get the latest book of a security.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :return: The book, `None` if nothing was received yet
+        :rtype: `DepthBook | None`
+        """
+        # Looking up a key is atomic, no lock needed
+        return self._books.get((exchange, token))
+
+    def remove(self, exchange: str, token: str) -> None:
+        """
+        Forget the book of a security.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :return: None
+        """
+        with self._lock:
+            self._books.pop((exchange, token), None)
+
+    def clear(self) -> None:
+        """
+        Forget the books of all securities.
+
+        :return: None
+        """
+        with self._lock:
+            self._books.clear()
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+
+def _merge(
+    levels: tuple[Any, ...],
+    message: dict[str, Any],
+    keys: tuple[str, ...],
+    convert: Callable[[str], Any],
+) -> tuple[Any, ...]:
+    """
+    Update the levels of one side of the book with the fields of a message.
+
+    :param `levels`: The current levels
+    :param `message`: The depth message
+    :param `keys`: Keys of the levels in the message
+    :param `convert`: Conversion of the fields
+    :type `levels`: `tuple[Any, ...]`
+    :type `message`: `dict[str, Any]`
+    :type `keys`: `tuple[str, ...]`
+    :type `convert`: `Callable[[str], Any]`
+    :return: The same levels if none changed, else the updated levels
+    :rtype: `tuple[Any, ...]`
+    """
+    merged: Union[list[Any], None] = None
+    for level, key in enumerate(keys):
+        value: Union[str, None] = message.get(key)
+        if value is not None:
+            if merged is None:
+                merged = list(levels)
+            merged[level] = convert(value)
+    return levels if merged is None else tuple(merged)
+
+
+def _top(
+    bid_price: float, bid_qty: int, ask_price: float, ask_qty: int
+) -> tuple[Union[float, None], Union[float, None], Union[float, None]]:
+    """
+    Compute the spread, mid and weighted mid of the best level.
+
+    :param `bid_price`: Best bid price
+    :param `bid_qty`: Best bid quantity
+    :param `ask_price`: Best ask price
+    :param `ask_qty`: Best ask quantity
+    :type `bid_price`: `float`
+    :type `bid_qty`: `int`
+    :type `ask_price`: `float`
+    :type `ask_qty`: `int`
+    :return: The spread, mid and weighted mid, `None` if a side is empty
+    :rtype: `tuple[float | None, float | None, float | None]`
+    """
+    if bid_price <= 0 or ask_price <= 0 or bid_qty <= 0 or ask_qty <= 0:
+        return None, None, None
+    return (
+        ask_price - bid_price,
+        (bid_price + ask_price) / 2,
+        # The price is pulled towards the side with less quantity
+        (bid_price * ask_qty + ask_price * bid_qty) / (bid_qty + ask_qty),
+    )
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains helpers to write files atomically, so that readers in
+other threads and processes never see a partially written file, and to
+remove files left behind.
+"""
+
+from os import remove, replace
+from os.path import dirname
+from tempfile import NamedTemporaryFile
+from typing import IO, Any, Callable
+
+
+def write_atomically(filename: str, write: Callable[[IO[bytes]], Any]) -> None:
+    """
+    Write a file through a temporary file in the same directory which is
+    renamed into place once complete.
+
+    :param `filename`: Path of the file
+    :param `write`: Function writing the contents to the given file object
+    :type `filename`: `str`
+    :type `write`: `Callable[[IO[bytes]], Any]`
+    :return: None
+    """
+    with NamedTemporaryFile(
+        "wb", dir=dirname(filename) or None, delete=False
+    ) as fp:
+        try:
+            write(fp)
+        except BaseException:
+            fp.close()
+            remove_quietly(fp.name)
+            raise
+    replace(fp.name, filename)
+
+
+def remove_quietly(filename: str) -> None:
+    """
+    Remove a file, ignoring errors.
+
+    :param `filename`: Path of the file
+    :type `filename`: `str`
+    :return: None
+    """
+    try:
+        remove(filename)
+    except OSError:
+        pass
@@ -0,0 +1,847 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module parses the historical data returned by the Integrate Data API
+into columnar NumPy arrays, resamples it into bars of any interval and keeps
+it in an on-disk cache. It needs NumPy, which is installed with the `numpy`
+extra (`pip install pyintegrate[numpy]`).
+
+Example:
+
+.. code-block:: python
+
+    from datetime import timedelta
+
+    from integrate.history import SESSION_OPEN, parse_bars, resample_bars
+
+    bars = parse_bars(b"300620230915,1819.95,1822.95,1807.9,1820.2,9367\\n")
+
+    # Closing prices of all bars
+    print(bars["datetime"], bars["close"])
+
+    # 75 minute bars aligned to the session opening at 09:15
+    bars = resample_bars(bars, timedelta(minutes=75), SESSION_OPEN["NSE"])
+"""
+
+from collections.abc import Iterator, Sequence
+from datetime import datetime, time, timedelta
+from os import makedirs
+from os.path import join
+from threading import Lock
+from typing import Any, Callable, Union
+from zipfile import BadZipFile
+
+import numpy as np
+
+from integrate.files import remove_quietly, write_atomically
+
+BAR_COLUMNS: tuple[str, ...] = (
+    "datetime",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "oi",
+)
+_BAR_DTYPES: tuple[str, ...] = (
+    "datetime64[m]",
+    "float64",
+    "float64",
+    "float64",
+    "float64",
+    "int64",
+    "int64",
+)
+TICK_DTYPE: np.dtype = np.dtype(
+    [
+        ("utc", np.int64),
+        ("ltp", np.float64),
+        ("ltq", np.int64),
+        ("oi", np.int64),
+    ]
+)
+# Opening time of the sessions of each exchange
+SESSION_OPEN: dict[str, time] = {
+    "NSE": time(9, 15),
+    "BSE": time(9, 15),
+    "NFO": time(9, 15),
+    "BFO": time(9, 15),
+    "CDS": time(9, 0),
+    "MCX": time(9, 0),
+}
+IST_OFFSET: timedelta = timedelta(hours=5, minutes=30)
+_SECOND: timedelta = timedelta(seconds=1)
+_MINUTE: timedelta = timedelta(minutes=1)
+_DAY: timedelta = timedelta(days=1)
+_MONDAY: int = 4
+# Bars older than this are final and are never downloaded again
+_SETTLED: timedelta = timedelta(days=1)
+# Bytes kept in front of every field so that it ends a word of 16 bytes
+_PADDING: int = 16
+# Bytes of the body parsed at once
+_BLOCK: int = 1 << 18
+# Masks of the digit values of the numbers keyed by their length
+_LOW_MASKS: np.ndarray = np.array(
+    [0x0F0F0F0F0F0F0F0F >> 8 * k << 8 * k for k in range(8, -1, -1)]
+    + [0x0F0F0F0F0F0F0F0F] * 8,
+    np.uint64,
+)
+_HIGH_MASKS: np.ndarray = np.array(
+    [0] * 8 + [0x0F0F0F0F0F0F0F0F >> 8 * k << 8 * k for k in range(8, -1, -1)],
+    np.uint64,
+)
+# Constants of the parsing of eight bytes of ASCII digits at once
+_TWOS: np.uint64 = np.uint64(0x0202020202020202)
+_SIXTEENS: np.uint64 = np.uint64(0x1010101010101010)
+_PAIRS: np.uint64 = np.uint64(0x000000FF000000FF)
+_HUNDREDS: np.uint64 = np.uint64(100 + (1000000 << 32))
+_UNITS: np.uint64 = np.uint64(1 + (10000 << 32))
+_ONE: np.uint64 = np.uint64(1)
+_FOUR: np.uint64 = np.uint64(4)
+_TEN: np.uint64 = np.uint64(10)
+_BYTE: np.uint64 = np.uint64(8)
+_TWO_BYTES: np.uint64 = np.uint64(16)
+_HALF: np.uint64 = np.uint64(32)
+_LAST_BYTE: np.uint64 = np.uint64(56)
+# Divisors of the numbers keyed by the binary exponent of their dot mark
+_SCALES: np.ndarray = np.ones(64)
+_SCALES[5::8] = 10.0 ** np.arange(7, -1, -1)
+
+
+def parse_bars(content: bytes) -> dict[str, np.ndarray]:
+    """
+    Parse historical bars in one pass over the CSV body of the response.
+
+    Timestamps are returned as `datetime64[m]`, prices as `float64` and
+    volume and open interest as `int64`. Open interest is only present if
+    the response has it.
+
+    :param `content`: The CSV body of the historical data response
+    :type `content`: `bytes`
+    :return: The columns of the bars keyed by name
+    :rtype: `dict[str, np.ndarray]`
+    :raises ValueError: If the lines don't have the same number of fields
+    """
+    columns: list[np.ndarray] = _parse_csv(content)
+    if not columns:
+        return {
+            name: np.empty(0, dtype)
+            for name, dtype in zip(BAR_COLUMNS[:6], _BAR_DTYPES)
+        }
+    if len(columns) not in (6, 7):
+        raise ValueError(f"Unexpected number of fields ({len(columns)})")
+
+    return {
+        name: (
+            to_datetime64(column.astype(np.int64))
+            if name == "datetime"
+            else column.astype(dtype, copy=False)
+        )
+        for name, dtype, column in zip(BAR_COLUMNS, _BAR_DTYPES, columns)
+    }
+
+
+def parse_ticks(content: bytes) -> np.ndarray:
+    """
+    Parse historical ticks in one pass over the CSV body of the response.
+
+    Each tick takes 32 bytes in a structured array of `TICK_DTYPE`: the
+    epoch time in seconds, the last traded price, the last traded quantity
+    and the open interest.
+
+    :param `content`: The CSV body of the tick data response
+    :type `content`: `bytes`
+    :return: The ticks
+    :rtype: `np.ndarray`
+    :raises ValueError: If the lines don't have four fields
+    """
+    columns: list[np.ndarray] = _parse_csv(content)
+    if not columns:
+        return np.empty(0, TICK_DTYPE)
+    if len(columns) != 4:
+        raise ValueError(f"Unexpected number of fields ({len(columns)})")
+
+    # Quantities and open interest may be written with decimals
+    ticks: np.ndarray = np.empty(len(columns[0]), TICK_DTYPE)
+    for name, column in zip(TICK_DTYPE.names, columns):
+        ticks[name] = column
+    return ticks
+
+
+def _parse_csv(content: bytes) -> list[np.ndarray]:
+    """
+    Parse a CSV body of unsigned decimal numbers into its columns.
+
+    Instead of reading the numbers one byte at a time, the up to 16 bytes
+    that end each field are read as two little-endian 64 bit words and all
+    the fields of a column are converted together with a handful of
+    vectorized integer operations. The body is parsed in blocks of lines
+    that fit in the processor caches. Columns without decimals are returned
+    as `int64` and the others as `float64`.
+
+    :param `content`: The CSV body
+    :type `content`: `bytes`
+    :return: The columns, none if the body is empty
+    :rtype: `list[np.ndarray]`
+    :raises ValueError: If the lines don't have the same number of fields
+        or a field isn't a number of up to 16 characters
+    """
+    if b"\r" in content:
+        content = content.replace(b"\r", b"")
+    content = content.strip()
+    if not content:
+        return []
+
+    width: int = content[: content.find(b"\n")].count(b",") + 1
+    blocks: list[list[np.ndarray]] = []
+    start: int = 0
+    while start < len(content):
+        stop: int = content.find(b"\n", start + _BLOCK) + 1 or len(content)
+        block: tuple[bytes, int, int] = (content, start, stop)
+        if start < _PADDING or stop == len(content):
+            # Every field needs 16 bytes before it and a separator after it
+            padded: bytes = bytes(_PADDING) + content[start:stop].rstrip()
+            block = (padded + b"\n", _PADDING, len(padded) + 1)
+        blocks.append(_parse_block(*block, width))
+        start = stop
+    return [np.concatenate(column) for column in zip(*blocks)]
+
+
+def _parse_block(
+    buffer: bytes, start: int, stop: int, width: int
+) -> list[np.ndarray]:
+    """
+    Parse the columns of the lines between two offsets of a buffer.
+
+    :param `buffer`: The buffer, with at least 16 bytes before the lines
+    :type `buffer`: `bytes`
+    :param `start`: Offset of the first line
+    :type `start`: `int`
+    :param `stop`: Offset after the line feed of the last line
+    :type `stop`: `int`
+    :param `width`: Number of fields of each line
+    :type `width`: `int`
+    :return: The columns of the lines
+    :rtype: `list[np.ndarray]`
+    :raises ValueError: If the lines don't have the same number of fields
+        or a field isn't a number of up to 16 characters
+    """
+    block: np.ndarray = np.frombuffer(buffer, np.uint8, stop - start, start)
+    # Commas and line feeds are the only bytes below the dot that may occur
+    separators: np.ndarray = np.flatnonzero(block < ord("."))
+    dots: int = np.count_nonzero(block == ord("."))
+    digits: int = np.count_nonzero(block - np.uint8(ord("0")) < 10)
+    if digits + dots + len(separators) != len(block):
+        raise ValueError("Could not convert the fields to numbers")
+
+    kinds: np.ndarray = block[separators]
+    lengths: np.ndarray = np.diff(separators, prepend=-1) - 1
+    if lengths.min() < 1:
+        # Drop the blank lines left by joining bodies that end with one
+        blank: np.ndarray = (lengths == 0) & (kinds == ord("\n"))
+        blank[1:] &= kinds[:-1] == ord("\n")
+        separators = separators[~blank]
+        kinds = kinds[~blank]
+        lengths = lengths[~blank]
+    if lengths.min() < 1 or lengths.max() > 16:
+        raise ValueError("Unexpected length of a field")
+
+    lines: int = len(separators) // width
+    if (
+        len(separators) != lines * width
+        or (kinds[width - 1 :: width] != ord("\n")).any()
+        or np.count_nonzero(kinds == ord(",")) != lines * (width - 1)
+    ):
+        raise ValueError("Unexpected number of fields")
+
+    # Unaligned words starting at every byte from 16 bytes before the lines
+    words: np.ndarray = np.ndarray(
+        (len(block) + 9,), np.dtype("<u8"), buffer, start - _PADDING, (1,)
+    )
+    columns: list[np.ndarray] = []
+    for column in range(width):
+        number: np.ndarray
+        marks: int
+        number, marks = _parse_numbers(
+            words, separators[column::width] + 8, lengths[column::width]
+        )
+        columns.append(number)
+        dots -= marks
+    if dots:
+        raise ValueError("Could not convert the fields to numbers")
+    return columns
+
+
+def _parse_numbers(
+    words: np.ndarray, starts: np.ndarray, lengths: np.ndarray
+) -> tuple[np.ndarray, int]:
+    """
+    Parse the numbers that end with the words at the given offsets.
+
+    :param `words`: The unaligned words of the buffer
+    :type `words`: `np.ndarray`
+    :param `starts`: Offsets of the last word of each number
+    :type `starts`: `np.ndarray`
+    :param `lengths`: Number of characters of each number
+    :type `lengths`: `np.ndarray`
+    :return: The numbers and how many of them have a dot
+    :rtype: `tuple[np.ndarray, int]`
+    :raises ValueError: If a dot is followed by more than seven digits
+    """
+    # Keep the value of the digits of the number only, the dot becomes 14
+    low: np.ndarray = words[starts] & _LOW_MASKS[lengths]
+    high: Union[np.ndarray, None] = None
+    if lengths.max() > 8:
+        high = words[starts - 8] & _HIGH_MASKS[lengths]
+        if ((high + _TWOS) & _SIXTEENS).any():
+            raise ValueError("Too many decimals")
+
+    # The dot is the only byte that reaches 16 after adding 2
+    dot: np.ndarray = (low + _TWOS) & _SIXTEENS
+    marks: int = np.count_nonzero(dot)
+    if marks:
+        # Move the digits before the dot one byte up over it
+        before: np.ndarray = low & ((dot >> _FOUR) - _ONE)
+        moved: np.ndarray = low & ~((dot << _FOUR) - _ONE)
+        moved |= before << _BYTE
+        if high is not None:
+            moved |= high >> _LAST_BYTE
+            high = np.where(dot, high << _BYTE, high)
+        low = np.where(dot, moved, low)
+
+    number: np.ndarray = _parse_digits(low)
+    if high is not None:
+        number += _parse_digits(high) * 10**8
+    if not marks:
+        return number, marks
+    return number / _SCALES[np.frexp(dot.astype(np.float64))[1]], marks
+
+
+def _parse_digits(words: np.ndarray) -> np.ndarray:
+    """
+    Turn words of eight digit values, the first one in the lowest byte, into
+    numbers by adding up pairs of digits, then the pairs of pairs at once.
+
+    :param `words`: The words
+    :type `words`: `np.ndarray`
+    :return: The numbers
+    :rtype: `np.ndarray`
+    """
+    words = words * _TEN + (words >> _BYTE)
+    words = (
+        (words & _PAIRS) * _HUNDREDS + (words >> _TWO_BYTES & _PAIRS) * _UNITS
+    ) >> _HALF
+    return words.astype(np.int64)
+
+
+def to_datetime64(stamps: np.ndarray) -> np.ndarray:
+    """
+    Convert timestamps written as DDMMYYYYHHMM numbers to `datetime64[m]`.
+
+    :param `stamps`: The timestamps
+    :type `stamps`: `np.ndarray`
+    :return: The timestamps as `datetime64[m]`
+    :rtype: `np.ndarray`
+    """
+    day: np.ndarray = stamps // 10**10
+    month: np.ndarray = stamps // 10**8 % 100
+    year: np.ndarray = stamps // 10**4 % 10**4
+    minutes: np.ndarray = stamps // 100 % 100 * 60 + stamps % 100
+
+    months: np.ndarray = (year - 1970) * 12 + month - 1
+    days: np.ndarray = months.astype("datetime64[M]").astype(
+        "datetime64[D]"
+    ) + (day - 1).astype("timedelta64[D]")
+    return days.astype("datetime64[m]") + minutes.astype("timedelta64[m]")
+
+
+def resample_bars(
+    bars: dict[str, np.ndarray],
+    interval: timedelta,
+    session_open: time = time(9, 15),
+) -> dict[str, np.ndarray]:
+    """
+    Resample bars in timestamp order into bars of a longer interval.
+
+    Intraday bars are aligned to the opening of the session of each day, so
+    75 minute bars of NSE start at 09:15, 10:30 and so on. Bars of whole
+    days are aligned to midnight and bars of whole weeks to Monday.
+
+    :param `bars`: The bars
+    :param `interval`: Length of the resampled bars
+    :param `session_open`: Opening time of the session. Defaults to 09:15.
+    :type `bars`: `dict[str, np.ndarray]`
+    :type `interval`: `timedelta`
+    :type `session_open`: `time`
+    :return: The resampled bars, stamped with the start of their interval
+    :rtype: `dict[str, np.ndarray]`
+    """
+    minutes: np.ndarray = (
+        bars["datetime"].astype("datetime64[m]").astype(np.int64)
+    )
+    buckets: np.ndarray = _buckets(
+        minutes, _whole(interval, _MINUTE), _whole(_DAY, _MINUTE), session_open
+    )
+    return _aggregate(
+        buckets.astype("datetime64[m]"),
+        bars["open"],
+        bars["high"],
+        bars["low"],
+        bars["close"],
+        bars["volume"],
+        bars.get("oi"),
+    )
+
+
+def resample_ticks(
+    ticks: np.ndarray,
+    interval: timedelta,
+    session_open: time = time(9, 15),
+) -> dict[str, np.ndarray]:
+    """
+    Resample ticks in time order into bars, aligned like
+    :py:func:`resample_bars`. Bars are stamped in Indian Standard Time like
+    the historical bars of the API, as `datetime64[m]` or `datetime64[s]`
+    for intervals that are not whole minutes.
+
+    :param `ticks`: The ticks
+    :param `interval`: Length of the bars
+    :param `session_open`: Opening time of the session. Defaults to 09:15.
+    :type `ticks`: `np.ndarray`
+    :type `interval`: `timedelta`
+    :type `session_open`: `time`
+    :return: The bars
+    :rtype: `dict[str, np.ndarray]`
+    """
+    seconds: np.ndarray = ticks["utc"] + _whole(IST_OFFSET, _SECOND)
+    step: int = _whole(interval, _SECOND)
+    buckets: np.ndarray = _buckets(
+        seconds, step, _whole(_DAY, _SECOND), session_open, _SECOND
+    )
+    ltp: np.ndarray = ticks["ltp"]
+    return _aggregate(
+        buckets.astype("datetime64[s]").astype(
+            "datetime64[s]" if step % 60 else "datetime64[m]"
+        ),
+        ltp,
+        ltp,
+        ltp,
+        ltp,
+        ticks["ltq"],
+        ticks["oi"],
+    )
+
+
+def bar_rows(bars: dict[str, np.ndarray]) -> Iterator[dict[str, Any]]:
+    """
+    Turn columns of bars into one dictionary per bar, as yielded by
+    :py:meth:`IntegrateData.historical_data`.
+
+    :param `bars`: The bars
+    :type `bars`: `dict[str, np.ndarray]`
+    :return: The bars with Python values
+    :rtype: `Iterator[dict[str, Any]]`
+    """
+    names: list[str] = list(bars)
+    for values in zip(*(bars[name].tolist() for name in names)):
+        yield dict(zip(names, values))
+
+
+def concat_bars(
+    parts: Sequence[dict[str, np.ndarray]]
+) -> dict[str, np.ndarray]:
+    """
+    Join consecutive bars into one set of columns.
+
+    :param `parts`: The bars in order
+    :type `parts`: `Sequence[dict[str, np.ndarray]]`
+    :return: The joined bars
+    :rtype: `dict[str, np.ndarray]`
+    """
+    filled: list[dict[str, np.ndarray]] = [
+        part for part in parts if len(part["datetime"])
+    ] or list(parts[:1])
+    if len(filled) == 1:
+        return filled[0]
+    return {
+        name: np.concatenate([part[name] for part in filled])
+        for name in filled[0]
+    }
+
+
+def slice_bars(
+    bars: dict[str, np.ndarray],
+    start: Union[np.datetime64, None] = None,
+    end: Union[np.datetime64, None] = None,
+) -> dict[str, np.ndarray]:
+    """
+    Select the bars between two timestamps, both inclusive. The bars must be
+    in timestamp order.
+
+    :param `bars`: The bars
+    :param `start`: The first timestamp or `None` for no lower bound
+    :param `end`: The last timestamp or `None` for no upper bound
+    :type `bars`: `dict[str, np.ndarray]`
+    :type `start`: `np.datetime64 | None`
+    :type `end`: `np.datetime64 | None`
+    :return: Views of the selected bars
+    :rtype: `dict[str, np.ndarray]`
+    """
+    stamps: np.ndarray = bars["datetime"]
+    first: int = 0 if start is None else stamps.searchsorted(start, "left")
+    last: int = (
+        len(stamps) if end is None else stamps.searchsorted(end, "right")
+    )
+    return {name: column[first:last] for name, column in bars.items()}
+
+
+class HistoryCache:
+    """
+    On-disk cache of historical bars.
+
+    The bars of each security and timeframe are kept in one uncompressed
+    `.npz` file together with the range they cover. Requests inside that
+    range are served from disk. Otherwise only the missing head or tail is
+    downloaded and merged in. The latest bars are downloaded again until
+    they are a day old, as they may still change.
+
+    :param `directory`: Directory holding the cache files.
+    :type `directory`: `str`
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory: str = directory
+        self._locks: dict[str, Lock] = {}
+        self._locks_lock: Lock = Lock()
+
+    def bars(
+        self,
+        exchange: str,
+        token: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        fetch: Callable[[datetime, datetime], dict[str, np.ndarray]],
+    ) -> dict[str, np.ndarray]:
+        """
+        Get the bars of a security, downloading only what the cache misses.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :param `timeframe`: Timeframe of the data
+        :param `start`: Start date of the data
+        :param `end`: End date of the data
+        :param `fetch`: Function downloading the bars of a range
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :type `timeframe`: `str`
+        :type `start`: `datetime`
+        :type `end`: `datetime`
+        :type `fetch`: `Callable[[datetime, datetime], dict[str, np.ndarray]]`
+        :return: The bars between start and end
+        :rtype: `dict[str, np.ndarray]`
+        """
+        start, end = _to_minute(start), _to_minute(end)
+        filename: str = self.filename(exchange, token, timeframe)
+        with self._lock(filename):
+            cached: Union[
+                tuple[dict[str, np.ndarray], datetime, datetime], None
+            ] = self._load(filename)
+            if cached is None:
+                bars: dict[str, np.ndarray] = fetch(start, end)
+                self._save(
+                    filename, bars, start, _covered_until(start, end, bars)
+                )
+                return bars
+
+            bars, covered_start, covered_end = cached
+            parts: list[dict[str, np.ndarray]] = [bars]
+            if start < covered_start:
+                parts.insert(
+                    0,
+                    slice_bars(
+                        fetch(start, covered_start - timedelta(minutes=1)),
+                        end=np.datetime64(covered_start, "m") - 1,
+                    ),
+                )
+                covered_start = start
+            if end > covered_end:
+                # The last covered bar may have been incomplete
+                tail: dict[str, np.ndarray] = fetch(covered_end, end)
+                parts[-1] = slice_bars(
+                    bars, end=np.datetime64(covered_end, "m") - 1
+                )
+                parts.append(
+                    slice_bars(tail, start=np.datetime64(covered_end, "m"))
+                )
+                covered_end = _covered_until(covered_end, end, tail)
+            if len(parts) > 1:
+                bars = concat_bars(parts)
+                self._save(filename, bars, covered_start, covered_end)
+            return slice_bars(
+                bars, np.datetime64(start, "m"), np.datetime64(end, "m")
+            )
+
+    def filename(self, exchange: str, token: str, timeframe: str) -> str:
+        """
+        Get the path of the cache file of a security.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :param `timeframe`: Timeframe of the data
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :type `timeframe`: `str`
+        :return: Path of the cache file
+        :rtype: `str`
+        """
+        return join(self.directory, f"{exchange}-{token}-{timeframe}.npz")
+
+    def _lock(self, filename: str) -> Lock:
+        """
+        Get the lock serializing access to a cache file.
+
+        :param `filename`: Path of the cache file
+        :type `filename`: `str`
+        :return: The lock
+        :rtype: `Lock`
+        """
+        with self._locks_lock:
+            return self._locks.setdefault(filename, Lock())
+
+    @staticmethod
+    def _load(
+        filename: str,
+    ) -> Union[tuple[dict[str, np.ndarray], datetime, datetime], None]:
+        """
+        Load the bars and the range they cover from a cache file.
+
+        :param `filename`: Path of the cache file
+        :type `filename`: `str`
+        :return: The bars, start and end of the range, or `None` if the file is missing or unreadable
+        :rtype: `tuple[dict[str, np.ndarray], datetime, datetime] | None`
+        """
+        try:
+            with np.load(filename, allow_pickle=False) as npz:
+                covered: list[datetime] = npz["covered"].tolist()
+                bars: dict[str, np.ndarray] = {
+                    name: npz[name] for name in BAR_COLUMNS if name in npz
+                }
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, BadZipFile):
+            remove_quietly(filename)
+            return None
+        return bars, covered[0], covered[1]
+
+    def _save(
+        self,
+        filename: str,
+        bars: dict[str, np.ndarray],
+        start: datetime,
+        end: datetime,
+    ) -> None:
+        """
+        Write the bars and the range they cover into a cache file. The file
+        is written to a temporary file and atomically renamed into place.
+
+        :param `filename`: Path of the cache file
+        :param `bars`: The bars
+        :param `start`: Start of the covered range
+        :param `end`: End of the covered range
+        :type `filename`: `str`
+        :type `bars`: `dict[str, np.ndarray]`
+        :type `start`: `datetime`
+        :type `end`: `datetime`
+        :return: None
+        """
+        makedirs(self.directory, exist_ok=True)
+        write_atomically(
+            filename,
+            lambda fp: np.savez(
+                fp,
+                covered=np.array([start, end], dtype="datetime64[m]"),
+                **bars,
+            ),
+        )
+
+
+def _to_minute(value: datetime) -> datetime:
+    """
+    Truncate a timestamp to the minute, the resolution of the API.
+
+    :param `value`: The timestamp
+    :type `value`: `datetime`
+    :return: The truncated timestamp
+    :rtype: `datetime`
+    """
+    return value.replace(second=0, microsecond=0)
+
+
+def _covered_until(
+    start: datetime, end: datetime, bars: dict[str, np.ndarray]
+) -> datetime:
+    """
+    Find until when downloaded bars are final. Bars at least a day old are,
+    newer ones are only known up to the last bar which is downloaded again
+    the next time.
+
+    :param `start`: Start of the downloaded range
+    :param `end`: End of the downloaded range
+    :param `bars`: The downloaded bars
+    :type `start`: `datetime`
+    :type `end`: `datetime`
+    :type `bars`: `dict[str, np.ndarray]`
+    :return: End of the covered range
+    :rtype: `datetime`
+    """
+    if end <= datetime.now() - _SETTLED:
+        return end
+    if len(bars["datetime"]):
+        return max(start, min(end, bars["datetime"][-1].item()))
+    return start
+
+
+def _whole(interval: timedelta, unit: timedelta) -> int:
+    """
+    Express an interval as a whole number of units.
+
+    :param `interval`: The interval
+    :param `unit`: The unit
+    :type `interval`: `timedelta`
+    :type `unit`: `timedelta`
+    :return: Number of units
+    :rtype: `int`
+    :raises ValueError: If the interval is not a positive multiple of the unit
+    """
+    units, rest = divmod(interval, unit)
+    if units <= 0 or rest:
+        raise ValueError(f"Interval must be a positive multiple of {unit}")
+    return units
+
+
+def _buckets(
+    stamps: np.ndarray,
+    step: int,
+    day: int,
+    session_open: time,
+    unit: timedelta = _MINUTE,
+) -> np.ndarray:
+    """
+    Find the start of the interval each timestamp falls in.
+
+    :param `stamps`: Timestamps counted in units since the epoch
+    :param `step`: Length of the intervals in units
+    :param `day`: Length of a day in units
+    :param `session_open`: Opening time of the session
+    :param `unit`: The unit of the timestamps
+    :type `stamps`: `np.ndarray`
+    :type `step`: `int`
+    :type `day`: `int`
+    :type `session_open`: `time`
+    :type `unit`: `timedelta`
+    :return: Start of the interval of each timestamp in units
+    :rtype: `np.ndarray`
+    """
+    if step % day == 0:
+        # The epoch is a Thursday, weeks are aligned to the Monday after it
+        origin: int = _MONDAY * day if step % (7 * day) == 0 else 0
+    else:
+        opening: timedelta = timedelta(
+            hours=session_open.hour, minutes=session_open.minute
+        )
+        origin = stamps // day * day + opening // unit
+    return origin + (stamps - origin) // step * step
+
+
+def _aggregate(
+    stamps: np.ndarray,
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    volumes: np.ndarray,
+    ois: Union[np.ndarray, None],
+) -> dict[str, np.ndarray]:
+    """
+    Combine consecutive rows with the same interval into bars.
+
+    :param `stamps`: Start of the interval of each row
+    :param `opens`: Opening prices
+    :param `highs`: High prices
+    :param `lows`: Low prices
+    :param `closes`: Closing prices
+    :param `volumes`: Volumes
+    :param `ois`: Open interests or `None`
+    :type `stamps`: `np.ndarray`
+    :type `opens`: `np.ndarray`
+    :type `highs`: `np.ndarray`
+    :type `lows`: `np.ndarray`
+    :type `closes`: `np.ndarray`
+    :type `volumes`: `np.ndarray`
+    :type `ois`: `np.ndarray | None`
+    :return: The bars
+    :rtype: `dict[str, np.ndarray]`
+    """
+    if not len(stamps):
+        starts: np.ndarray = np.empty(0, np.intp)
+        ends: np.ndarray = starts
+    else:
+        starts = np.flatnonzero(np.r_[True, stamps[1:] != stamps[:-1]])
+        ends = np.r_[starts[1:], len(stamps)] - 1
+
+    bars: dict[str, np.ndarray] = {
+        "datetime": stamps[starts],
+        "open": opens[starts],
+        "high": _reduce(np.maximum, highs, starts),
+        "low": _reduce(np.minimum, lows, starts),
+        "close": closes[ends],
+        "volume": _reduce(np.add, volumes, starts),
+    }
+    if ois is not None:
+        bars["oi"] = ois[ends]
+    return bars
+
+
+def _reduce(
+    function: np.ufunc, values: np.ndarray, starts: np.ndarray
+) -> np.ndarray:
+    """
+    Reduce slices of values starting at the given positions.
+
+    :param `function`: The reducing function
+    :param `values`: The values
+    :param `starts`: Start of each slice
+    :type `function`: `np.ufunc`
+    :type `values`: `np.ndarray`
+    :type `starts`: `np.ndarray`
+    :return: The reduced slices
+    :rtype: `np.ndarray`
+    """
+    if not len(starts):
+        return values[:0]
+    return function.reduceat(values, starts)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains the SnapshotStore class, which merges the partial
+tick and depth updates streamed by the Integrate WebSocket API into the
+latest full record of each security.
+
+Example:
+
+.. code-block:: python
+
+    from integrate import ConnectToIntegrate, IntegrateWebSocket
+
+    c2i = ConnectToIntegrate()
+    c2i.login(api_token="YOUR_API_TOKEN", api_secret="YOUR_API_SECRET")
+
+    iws = IntegrateWebSocket(c2i, keep_snapshots=True)
+    iws.connect(daemonize=True)
+    iws.subscribe(c2i.SUBSCRIPTION_TYPE_TICK, [(c2i.EXCHANGE_TYPE_NSE, "22")])
+
+    # From any thread
+    snapshot = iws.latest(c2i.EXCHANGE_TYPE_NSE, "22")
+    if snapshot is not None:
+        print(snapshot["lp"], snapshot["v"])
+"""
+
+from collections.abc import Mapping
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Union
+
+
+class SnapshotStore:
+    """
+    Latest full record of each security, merged from partial updates.
+
+    Every update replaces the record of the security with a new read-only
+    mapping instead of changing it, so a record read by one thread never
+    changes while the WebSocket thread merges the next updates.
+    """
+
+    def __init__(self) -> None:
+        self._snapshots: dict[tuple[str, str], Mapping[str, Any]] = {}
+        self._lock: Lock = Lock()
+
+    def update(self, message: dict[str, Any]) -> Mapping[str, Any]:
+        """
+        Merge a tick or depth message into the record of its security.
+
+        :param `message`: The message, with at least the `e` and `tk` fields
+        :type `message`: `dict[str, Any]`
+        :return: The merged record
+        :rtype: `Mapping[str, Any]`
+        :raises KeyError: If the message has no exchange or token
+        """
+        key: tuple[str, str] = (message["e"], message["tk"])
+        with self._lock:
+            previous: Union[Mapping[str, Any], None] = self._snapshots.get(key)
+            merged: dict[str, Any] = dict(previous) if previous else {}
+            merged.update(message)
+            # The type of the last message isn't a field of the security
+            merged.pop("t", None)
+            snapshot: Mapping[str, Any] = MappingProxyType(merged)
+            self._snapshots[key] = snapshot
+        return snapshot
+
+    def latest(
+        self, exchange: str, token: str
+    ) -> Union[Mapping[str, Any], None]:
+        """
+        Get the latest record of a security.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :return: The read-only record, `None` if nothing was received yet
+        :rtype: `Mapping[str, Any] | None`
+        """
+        # Looking up a key is atomic, no lock needed
+        return self._snapshots.get((exchange, token))
+
+    def remove(self, exchange: str, token: str) -> None:
+        """
+        Forget the record of a security.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :return: None
+        """
+        with self._lock:
+            self._snapshots.pop((exchange, token), None)
+
+    def clear(self) -> None:
+        """
+        Forget the records of all securities.
+
+        :return: None
+        """
+        with self._lock:
+            self._snapshots.clear()
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
@@ -0,0 +1,926 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains the SymbolMaster class which holds the symbols' master
+file in a compact columnar form and provides fast lookups over it.
+
+Example:
+
+.. code-block:: python
+
+    from integrate import ConnectToIntegrate
+
+    c2i = ConnectToIntegrate()
+    c2i.login(api_token="YOUR_API_TOKEN", api_secret="YOUR_API_SECRET")
+
+    # Get the symbols' master
+    master = c2i.symbol_master
+
+    # Look up a symbol
+    acc = master.find(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ")
+
+    # Filter symbols
+    for symbol in master.rows(
+        master.where(segment="NFO", symbol="NIFTY", option_type="CE")
+    ):
+        print(symbol["trading_symbol"], symbol["strike"])
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from csv import reader
+from datetime import datetime
+from difflib import SequenceMatcher
+from heapq import nsmallest
+from io import BytesIO
+from mmap import ACCESS_READ, mmap
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from os import name as os_name
+from struct import Struct
+from sys import byteorder
+from typing import IO, Any, Callable, Union
+
+from integrate.files import write_atomically
+
+COLUMNS: tuple[str, ...] = (
+    "segment",
+    "token",
+    "symbol",
+    "trading_symbol",
+    "instrument_type",
+    "expiry",
+    "tick_size",
+    "lot_size",
+    "option_type",
+    "strike",
+    "isin",
+    "price_mult",
+)
+
+_COLUMN_INDEX: dict[str, int] = {name: i for i, name in enumerate(COLUMNS)}
+
+Criterion = Union[str, Iterable[str], Callable[[str], bool]]
+
+# Codes of a column, built in an array or used in place from a snapshot
+Codes = Union["array[int]", memoryview]
+
+# Number of candidates per result considered for fuzzy search and the
+# minimum similarity of a fuzzy match, as in difflib.get_close_matches
+_FUZZY_CANDIDATES: int = 10
+_FUZZY_CUTOFF: float = 0.6
+
+# Snapshot layout: header, one descriptor per column, then for each column
+# its NUL separated string table followed by its codes, each 8-byte aligned.
+SNAPSHOT_MAGIC: bytes = b"PYINTSYM"
+SNAPSHOT_VERSION: int = 1
+_SNAPSHOT_HEADER: Struct = Struct("<8sHcxHxxQqq")
+_SNAPSHOT_COLUMN: Struct = Struct("<cxxxxxxxQQ")
+
+# Shared memory segments published by this process keyed by name, kept open
+# as on Windows a segment is removed once no process has it open
+_SEGMENTS: dict[str, SharedMemory] = {}
+
+
+def parse_symbol_line(line: Sequence[str]) -> tuple[str, ...]:
+    """
+    Parse a line of the symbols' master file into the values of `COLUMNS`.
+
+    :param `line`: A line of the symbols' master file split into fields
+    :type `line`: `Sequence[str]`
+    :return: The values of the symbol in the order of `COLUMNS`
+    :rtype: `tuple[str, ...]`
+    """
+    return (
+        line[0],
+        line[1],
+        line[2],
+        line[3],
+        line[4],
+        line[5],
+        line[6],
+        line[7],
+        line[8],
+        str(int(int(line[9]) / (int(line[11]) * 10 ** int(line[10])))),
+        line[12],
+        line[13],
+    )
+
+
+class SymbolRow(Mapping[str, str]):
+    """
+    Lightweight read-only view of a symbol in a :py:class:`SymbolMaster`.
+
+    It behaves like the `dict[str, str]` yielded by
+    :py:attr:`ConnectToIntegrate.symbols` without holding any values itself.
+
+    :param `master`: The symbols' master the row belongs to.
+    :param `row`: Position of the row in the symbols' master.
+    :type `master`: `SymbolMaster`
+    :type `row`: `int`
+    """
+
+    __slots__ = ("_master", "_row")
+
+    def __init__(self, master: "SymbolMaster", row: int) -> None:
+        self._master: SymbolMaster = master
+        self._row: int = row
+
+    @property
+    def row(self) -> int:
+        """
+        Position of the row in the symbols' master.
+
+        :return: The row position
+        :rtype: `int`
+        """
+        return self._row
+
+    def __getitem__(self, key: str) -> str:
+        return self._master.value(key, self._row)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(COLUMNS)
+
+    def __len__(self) -> int:
+        return len(COLUMNS)
+
+    def __repr__(self) -> str:
+        return f"SymbolRow({dict(self)!r})"
+
+
+class SymbolMaster:
+    """
+    Columnar in-memory representation of the symbols' master file.
+
+    Every column is dictionary encoded: the distinct values of the column are
+    stored once in a string table and each row holds a compact integer code
+    into it. Filters are evaluated once per distinct value and then applied
+    to the integer codes, and lookups by trading symbol or token are served
+    from hash indexes built on first use.
+
+    The parsed master can be persisted with :py:meth:`save` into a versioned
+    binary snapshot, which :py:meth:`load` memory-maps without parsing the
+    symbols' master file again.
+
+    :param `tables`: Distinct values of each column in the order of `COLUMNS`.
+    :param `codes`: Codes of each column in the order of `COLUMNS`.
+    :param `source`: Key of the symbols' master file it was built from.
+    :type `tables`: `list[list[str]]`
+    :type `codes`: `list[array | memoryview]`
+    :type `source`: `tuple[int, int] | None`
+    """
+
+    def __init__(
+        self,
+        tables: list[list[str]],
+        codes: list[Codes],
+        source: Union[tuple[int, int], None] = None,
+    ) -> None:
+        if len(tables) != len(COLUMNS) or len(codes) != len(COLUMNS):
+            raise ValueError(f"Expected {len(COLUMNS)} columns")
+        if len({len(c) for c in codes}) > 1:
+            raise ValueError("Columns must have the same length")
+
+        self.source: Union[tuple[int, int], None] = source
+        self._tables: list[list[str]] = tables
+        self._codes: list[Codes] = codes
+        # Keeps the memory map of a loaded snapshot alive
+        self._buffer: Any = None
+        self._by_trading_symbol: Union[dict[str, dict[str, int]], None] = None
+        self._by_token: Union[dict[str, dict[str, int]], None] = None
+        self._option_chains: Union[
+            dict[tuple[str, str], dict[str, list[dict[str, str]]]], None
+        ] = None
+        self._search_index: Union[
+            dict[str, tuple[list[str], Sequence[int]]], None
+        ] = None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[str]]) -> "SymbolMaster":
+        """
+        Build a symbols' master from rows of values in the order of `COLUMNS`.
+
+        :param `rows`: Rows of values
+        :type `rows`: `Iterable[Sequence[str]]`
+        :return: The symbols' master
+        :rtype: `SymbolMaster`
+        """
+        columns: list[tuple[str, ...]] = list(zip(*rows)) or [
+            () for _ in COLUMNS
+        ]
+        tables: list[list[str]] = []
+        codes: list[Codes] = []
+        for column in columns:
+            lookup: dict[str, int] = {
+                value: code for code, value in enumerate(dict.fromkeys(column))
+            }
+            tables.append(list(lookup))
+            codes.append(
+                array(_typecode(len(lookup)), map(lookup.__getitem__, column))
+            )
+        return cls(tables, codes)
+
+    @classmethod
+    def from_csv(cls, filename: str) -> "SymbolMaster":
+        """
+        Build a symbols' master from the symbols' master file.
+
+        :param `filename`: Path of the symbols' master file
+        :type `filename`: `str`
+        :return: The symbols' master
+        :rtype: `SymbolMaster`
+        """
+        with open(filename, "r") as fp:
+            return cls.from_rows(
+                parse_symbol_line(line) for line in reader(fp)
+            )
+
+    @classmethod
+    def load(cls, filename: str) -> "SymbolMaster":
+        """
+        Load a symbols' master from a binary snapshot. The snapshot is
+        memory-mapped read-only and its codes are used in place.
+
+        :param `filename`: Path of the snapshot
+        :type `filename`: `str`
+        :return: The symbols' master
+        :rtype: `SymbolMaster`
+        :raises ValueError: If the file is not a valid snapshot
+        """
+        with open(filename, "rb") as fp:
+            buffer: mmap = mmap(fp.fileno(), 0, access=ACCESS_READ)
+        master: SymbolMaster = cls.from_buffer(buffer)
+        master._buffer = buffer
+        return master
+
+    @classmethod
+    def from_buffer(cls, buffer: Any) -> "SymbolMaster":
+        """
+        Build a symbols' master from the contents of a binary snapshot. The
+        codes are read in place, so the buffer must outlive the master.
+
+        :param `buffer`: Object supporting the buffer protocol
+        :type `buffer`: `Any`
+        :return: The symbols' master
+        :rtype: `SymbolMaster`
+        :raises ValueError: If the buffer is not a valid snapshot
+        """
+        view: memoryview = memoryview(buffer)
+        if len(view) < _SNAPSHOT_HEADER.size:
+            raise ValueError("Truncated symbols' master snapshot")
+        (
+            magic,
+            version,
+            order,
+            columns,
+            rows,
+            mtime,
+            size,
+        ) = _SNAPSHOT_HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Not a symbols' master snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Unsupported symbols' master snapshot version: {version}"
+            )
+        if columns != len(COLUMNS):
+            raise ValueError(f"Expected {len(COLUMNS)} columns")
+
+        swap: bool = order != byteorder[0].encode()
+        offset: int = _SNAPSHOT_HEADER.size + columns * _SNAPSHOT_COLUMN.size
+        tables: list[list[str]] = []
+        codes: list[Codes] = []
+        for i in range(columns):
+            typecode, table_size, codes_size = _SNAPSHOT_COLUMN.unpack_from(
+                view, _SNAPSHOT_HEADER.size + i * _SNAPSHOT_COLUMN.size
+            )
+            if offset + _align(table_size) + codes_size > len(view):
+                raise ValueError("Truncated symbols' master snapshot")
+            table: bytes = view[offset : offset + table_size].tobytes()
+            tables.append(table.decode("utf-8").split("\0") if rows else [])
+            offset += _align(table_size)
+            column: memoryview = view[offset : offset + codes_size].cast(
+                typecode.decode()
+            )
+            if swap:
+                swapped: array[int] = array(typecode.decode(), column)
+                swapped.byteswap()
+                codes.append(swapped)
+            else:
+                codes.append(column)
+            offset += _align(codes_size)
+        return cls(tables, codes, (mtime, size) if mtime or size else None)
+
+    def save(self, filename: str) -> None:
+        """
+        Persist the symbols' master into a binary snapshot. The snapshot is
+        written to a temporary file and atomically renamed into place.
+
+        :param `filename`: Path of the snapshot
+        :type `filename`: `str`
+        :return: None
+        """
+        write_atomically(filename, self._write_snapshot)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the symbols' master into a binary snapshot.
+
+        :return: The snapshot
+        :rtype: `bytes`
+        """
+        buffer: BytesIO = BytesIO()
+        self._write_snapshot(buffer)
+        return buffer.getvalue()
+
+    def publish(self, name: str) -> None:
+        """
+        Publish the symbols' master into a named shared memory segment which
+        other processes can :py:meth:`attach` to. An existing segment with
+        the same name is replaced; processes attached to it keep their copy.
+
+        The segment outlives this process and stays until it is replaced or
+        removed with :py:meth:`unlink_shared`. On Windows it is removed once
+        no process has it open.
+
+        :param `name`: Name of the shared memory segment
+        :type `name`: `str`
+        :return: None
+        :raises FileExistsError: If another process published it concurrently
+        """
+        data: bytes = self.to_bytes()
+        self.unlink_shared(name)
+        segment: SharedMemory = SharedMemory(
+            name=name, create=True, size=len(data)
+        )
+        _untrack(segment)
+        _SEGMENTS[name] = segment
+        buf: Union[memoryview, None] = segment.buf
+        if buf is None:
+            raise OSError(f"Shared memory segment {name} is closed")
+        # Write the magic last so that attaching never sees a partial copy
+        magic: int = len(SNAPSHOT_MAGIC)
+        buf[magic : len(data)] = data[magic:]
+        buf[:magic] = data[:magic]
+
+    @classmethod
+    def attach(cls, name: str) -> "SymbolMaster":
+        """
+        Attach read-only to a symbols' master published with
+        :py:meth:`publish`. The codes are used in place from shared memory.
+
+        :param `name`: Name of the shared memory segment
+        :type `name`: `str`
+        :return: The symbols' master
+        :rtype: `SymbolMaster`
+        :raises FileNotFoundError: If no segment with the name exists
+        :raises ValueError: If the segment is not a valid snapshot
+        """
+        segment: SharedMemory = SharedMemory(name=name)
+        _untrack(segment)
+        buf: Union[memoryview, None] = segment.buf
+        if buf is None:
+            raise OSError(f"Shared memory segment {name} is closed")
+        master: SymbolMaster = cls.from_buffer(buf.toreadonly())
+        # The segment stays mapped as long as the master reading from it
+        master._buffer = segment
+        return master
+
+    @staticmethod
+    def unlink_shared(name: str) -> None:
+        """
+        Remove a shared memory segment published with :py:meth:`publish`.
+        Processes attached to it keep their copy.
+
+        :param `name`: Name of the shared memory segment
+        :type `name`: `str`
+        :return: None
+        """
+        previous: Union[SharedMemory, None] = _SEGMENTS.pop(name, None)
+        if previous is not None:
+            previous.close()
+        try:
+            segment: SharedMemory = SharedMemory(name=name)
+        except FileNotFoundError:
+            return
+        segment.close()
+        try:
+            # Unlinking also stops the resource tracker from tracking it
+            segment.unlink()
+        except FileNotFoundError:
+            _untrack(segment)
+
+    def _write_snapshot(self, fp: IO[bytes]) -> None:
+        """
+        Write the binary snapshot of the symbols' master.
+
+        :param `fp`: File object to write to
+        :type `fp`: `IO[bytes]`
+        :return: None
+        """
+        tables: list[bytes] = [
+            "\0".join(table).encode("utf-8") for table in self._tables
+        ]
+        codes: list[memoryview] = [
+            memoryview(column) for column in self._codes
+        ]
+        mtime, size = self.source if self.source else (0, 0)
+        fp.write(
+            _SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC,
+                SNAPSHOT_VERSION,
+                byteorder[0].encode(),
+                len(COLUMNS),
+                len(self),
+                mtime,
+                size,
+            )
+        )
+        for table, column in zip(tables, codes):
+            fp.write(
+                _SNAPSHOT_COLUMN.pack(
+                    column.format.encode(), len(table), column.nbytes
+                )
+            )
+        for table, column in zip(tables, codes):
+            fp.write(table.ljust(_align(len(table)), b"\0"))
+            fp.write(column.tobytes())
+            fp.write(bytes(_align(column.nbytes) - column.nbytes))
+
+    def __len__(self) -> int:
+        return len(self._codes[0])
+
+    def __getitem__(self, row: int) -> SymbolRow:
+        if not -len(self) <= row < len(self):
+            raise IndexError("Symbol row out of range")
+        return SymbolRow(self, row % len(self) if row < 0 else row)
+
+    def __iter__(self) -> Iterator[SymbolRow]:
+        return (SymbolRow(self, row) for row in range(len(self)))
+
+    def value(self, column: str, row: int) -> str:
+        """
+        Get the value of a column for a row.
+
+        :param `column`: Name of the column
+        :param `row`: Position of the row
+        :type `column`: `str`
+        :type `row`: `int`
+        :return: The value
+        :rtype: `str`
+        """
+        i: int = _COLUMN_INDEX[column]
+        return self._tables[i][self._codes[i][row]]
+
+    def column(self, column: str) -> list[str]:
+        """
+        Get all values of a column.
+
+        :param `column`: Name of the column
+        :type `column`: `str`
+        :return: The values of the column in row order
+        :rtype: `list[str]`
+        """
+        i: int = _COLUMN_INDEX[column]
+        table: list[str] = self._tables[i]
+        return [table[code] for code in self._codes[i]]
+
+    def where(self, **criteria: Criterion) -> list[int]:
+        """
+        Find the rows matching all the given criteria.
+
+        A criterion is either a value to compare with, a collection of values
+        to test membership in, or a predicate called with each distinct value
+        of the column.
+
+        .. code-block:: python
+
+            master.where(
+                segment="NFO",
+                symbol={"NIFTY", "BANKNIFTY"},
+                strike=lambda strike: int(strike) >= 19500,
+            )
+
+        :param `criteria`: Criteria keyed by column name
+        :type `criteria`: `str | Iterable[str] | Callable[[str], bool]`
+        :return: Positions of the matching rows
+        :rtype: `list[int]`
+        """
+        rows: Union[Iterable[int], None] = None
+        for column, criterion in criteria.items():
+            if column not in _COLUMN_INDEX:
+                raise KeyError(f"Invalid column: {column}")
+            i: int = _COLUMN_INDEX[column]
+            if isinstance(criterion, str):
+                matches: Callable[[str], bool] = criterion.__eq__
+            elif callable(criterion):
+                matches = criterion
+            else:
+                matches = frozenset(criterion).__contains__
+
+            # Evaluate the criterion once per distinct value of the column
+            wanted: frozenset[int] = frozenset(
+                code
+                for code, value in enumerate(self._tables[i])
+                if matches(value)
+            )
+            codes: Sequence[int] = self._codes[i]
+            if rows is None:
+                rows = [r for r, code in enumerate(codes) if code in wanted]
+            else:
+                rows = [r for r in rows if codes[r] in wanted]
+        return list(range(len(self))) if rows is None else list(rows)
+
+    def rows(self, rows: Iterable[int]) -> list[SymbolRow]:
+        """
+        Get the views of the given rows.
+
+        :param `rows`: Positions of the rows
+        :type `rows`: `Iterable[int]`
+        :return: The views of the rows
+        :rtype: `list[SymbolRow]`
+        """
+        return [SymbolRow(self, row) for row in rows]
+
+    def build_indexes(self) -> None:
+        """
+        Build the hash indexes used by :py:meth:`find` and
+        :py:meth:`find_by_token` ahead of the first lookup.
+
+        :return: None
+        """
+        if self._by_trading_symbol is None:
+            self._by_trading_symbol = self._index("trading_symbol")
+        if self._by_token is None:
+            self._by_token = self._index("token")
+
+    def find(
+        self, exchange: str, trading_symbol: str
+    ) -> Union[SymbolRow, None]:
+        """
+        Find a symbol by its trading symbol.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `trading_symbol`: Trading symbol of the security
+        :type `exchange`: `str`
+        :type `trading_symbol`: `str`
+        :return: The symbol if found, else `None`
+        :rtype: `SymbolRow | None`
+        """
+        if self._by_trading_symbol is None:
+            self.build_indexes()
+        row: Union[int, None] = self._by_trading_symbol.get(  # type: ignore
+            exchange, {}
+        ).get(trading_symbol)
+        return None if row is None else SymbolRow(self, row)
+
+    def find_by_token(
+        self, exchange: str, token: str
+    ) -> Union[SymbolRow, None]:
+        """
+        Find a symbol by its token.
+
+        :param `exchange`: Exchange in which security is listed
+        :param `token`: Token of the security
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :return: The symbol if found, else `None`
+        :rtype: `SymbolRow | None`
+        """
+        if self._by_token is None:
+            self.build_indexes()
+        row: Union[int, None] = self._by_token.get(  # type: ignore
+            exchange, {}
+        ).get(token)
+        return None if row is None else SymbolRow(self, row)
+
+    def search(
+        self,
+        query: str,
+        exchange: Union[str, None] = None,
+        limit: int = 10,
+    ) -> list[SymbolRow]:
+        """
+        Search symbols by a partial trading symbol, ignoring case.
+
+        Trading symbols starting with the query come first in alphabetical
+        order, so an exact match is always on top. If there are fewer than
+        `limit` of them, the list is topped up with fuzzy matches: trading
+        symbols sharing a shorter prefix with the query which are at least
+        60% similar to it, most similar first. Both are served from a sorted
+        array of trading symbols per segment, so the cost depends on `limit`
+        and not on the size of the symbols' master.
+
+        :param `query`: The partial trading symbol
+        :param `exchange`: Exchange to search in. Defaults to all exchanges.
+        :param `limit`: Maximum number of results. Defaults to 10.
+        :type `query`: `str`
+        :type `exchange`: `str | None`
+        :type `limit`: `int`
+        :return: The matching symbols, best first
+        :rtype: `list[SymbolRow]`
+        """
+        query = query.strip().upper()
+        if not query or limit <= 0:
+            return []
+        index: dict[
+            str, tuple[list[str], Sequence[int]]
+        ] = self._symbol_search_index()
+        if exchange:
+            segments: list[tuple[list[str], Sequence[int]]] = (
+                [index[exchange]] if exchange in index else []
+            )
+        else:
+            segments = list(index.values())
+
+        # Prefix matches of every segment merged in alphabetical order
+        matches: list[tuple[str, int]] = _prefix_matches(
+            segments, query, limit
+        )
+        results: list[int] = [row for _, row in sorted(matches)[:limit]]
+
+        # Fuzzy matches among the symbols sharing the longest shorter prefix
+        found: set[int] = set(results)
+        candidates: list[tuple[str, int]] = []
+        for length in range(len(query) - 1, 0, -1):
+            if len(results) + len(candidates) >= limit:
+                break
+            candidates = [
+                (key, row)
+                for key, row in _prefix_matches(
+                    segments, query[:length], limit * _FUZZY_CANDIDATES
+                )
+                if row not in found
+            ]
+        matcher: SequenceMatcher = SequenceMatcher(b=query, autojunk=False)
+        scored: list[tuple[float, str, int]] = []
+        for key, row in candidates:
+            matcher.set_seq1(key)
+            # Candidates share a prefix with the query, so the cheap
+            # order-insensitive similarity is good enough to rank them
+            similarity: float = matcher.quick_ratio()
+            if similarity >= _FUZZY_CUTOFF:
+                scored.append((-similarity, key, row))
+        results.extend(
+            row for _, _, row in nsmallest(limit - len(results), scored)
+        )
+        return self.rows(results)
+
+    def expiries(self, exchange: str, symbol: str) -> list[str]:
+        """
+        Get the expiries of the options on an underlying, nearest first.
+
+        :param `exchange`: Exchange in which the options are listed
+        :param `symbol`: Symbol of the underlying, e.g. NIFTY
+        :type `exchange`: `str`
+        :type `symbol`: `str`
+        :return: The expiries
+        :rtype: `list[str]`
+        """
+        return list(self._option_chain_index().get((exchange, symbol), {}))
+
+    def option_chain(
+        self, exchange: str, symbol: str, expiry: str
+    ) -> list[dict[str, str]]:
+        """
+        Get the option chain of an underlying for an expiry. Each strike has
+        the tokens and trading symbols of its call and put, which are empty
+        if the option is not listed, along with the lot and tick size.
+
+        .. code-block:: python
+
+            [
+                {
+                    "strike": "19500",
+                    "ce_token": "43651",
+                    "ce_trading_symbol": "NIFTY28SEP23C19500",
+                    "pe_token": "43652",
+                    "pe_trading_symbol": "NIFTY28SEP23P19500",
+                    "lot_size": "50",
+                    "tick_size": "5",
+                },
+                ...
+            ]
+
+        :param `exchange`: Exchange in which the options are listed
+        :param `symbol`: Symbol of the underlying, e.g. NIFTY
+        :param `expiry`: Expiry of the options
+        :type `exchange`: `str`
+        :type `symbol`: `str`
+        :type `expiry`: `str`
+        :return: The strikes in ascending order
+        :rtype: `list[dict[str, str]]`
+        """
+        chain: list[dict[str, str]] = (
+            self._option_chain_index()
+            .get((exchange, symbol), {})
+            .get(expiry, [])
+        )
+        return [dict(strike) for strike in chain]
+
+    def _option_chain_index(
+        self,
+    ) -> dict[tuple[str, str], dict[str, list[dict[str, str]]]]:
+        """
+        Build the option chains of all underlyings keyed by segment and
+        symbol, and then by expiry, nearest first.
+
+        :return: The option chains
+        :rtype: `dict[tuple[str, str], dict[str, list[dict[str, str]]]]`
+        """
+        if self._option_chains is not None:
+            return self._option_chains
+
+        strikes: dict[tuple[str, str, str], dict[str, dict[str, str]]] = {}
+        for option in self.rows(self.where(option_type={"CE", "PE"})):
+            key: tuple[str, str, str] = (
+                option["segment"],
+                option["symbol"],
+                option["expiry"],
+            )
+            strike: dict[str, str] = strikes.setdefault(key, {}).setdefault(
+                option["strike"],
+                {
+                    "strike": option["strike"],
+                    "ce_token": "",
+                    "ce_trading_symbol": "",
+                    "pe_token": "",
+                    "pe_trading_symbol": "",
+                    "lot_size": option["lot_size"],
+                    "tick_size": option["tick_size"],
+                },
+            )
+            side: str = option["option_type"].lower()
+            strike[f"{side}_token"] = option["token"]
+            strike[f"{side}_trading_symbol"] = option["trading_symbol"]
+
+        chains: dict[tuple[str, str], dict[str, list[dict[str, str]]]] = {}
+        for segment, symbol, expiry in sorted(
+            strikes, key=lambda key: (key[0], key[1], _expiry_key(key[2]))
+        ):
+            chains.setdefault((segment, symbol), {})[expiry] = sorted(
+                strikes[(segment, symbol, expiry)].values(),
+                key=lambda strike: float(strike["strike"]),
+            )
+        self._option_chains = chains
+        return chains
+
+    def _symbol_search_index(
+        self,
+    ) -> dict[str, tuple[list[str], Sequence[int]]]:
+        """
+        Build the upper-cased trading symbols of every segment in sorted
+        order along with their rows.
+
+        :return: The sorted trading symbols and rows keyed by segment
+        :rtype: `dict[str, tuple[list[str], Sequence[int]]]`
+        """
+        if self._search_index is not None:
+            return self._search_index
+
+        keys: dict[str, list[tuple[str, int]]] = {}
+        for row, (segment, trading_symbol) in enumerate(
+            zip(self.column("segment"), self.column("trading_symbol"))
+        ):
+            keys.setdefault(segment, []).append((trading_symbol.upper(), row))
+        index: dict[str, tuple[list[str], Sequence[int]]] = {}
+        for segment, entries in keys.items():
+            entries.sort()
+            index[segment] = (
+                [key for key, _ in entries],
+                array(_typecode(len(self)), (row for _, row in entries)),
+            )
+        self._search_index = index
+        return index
+
+    def _index(self, column: str) -> dict[str, dict[str, int]]:
+        """
+        Build a hash index of rows keyed by segment and then by the given
+        column. The first occurrence of a key wins.
+
+        :param `column`: Name of the column
+        :type `column`: `str`
+        :return: The index
+        :rtype: `dict[str, dict[str, int]]`
+        """
+        index: dict[str, dict[str, int]] = {
+            segment: {} for segment in self._tables[_COLUMN_INDEX["segment"]]
+        }
+        segments: list[dict[str, int]] = list(index.values())
+        segment_codes: Sequence[int] = self._codes[_COLUMN_INDEX["segment"]]
+        table: list[str] = self._tables[_COLUMN_INDEX[column]]
+        for row, (segment, code) in enumerate(
+            zip(segment_codes, self._codes[_COLUMN_INDEX[column]])
+        ):
+            segments[segment].setdefault(table[code], row)
+        return index
+
+
+def _align(size: int) -> int:
+    """
+    Round a size up to the next multiple of 8 bytes.
+
+    :param `size`: The size
+    :type `size`: `int`
+    :return: The aligned size
+    :rtype: `int`
+    """
+    return (size + 7) & ~7
+
+
+def _prefix_matches(
+    segments: list[tuple[list[str], Sequence[int]]], prefix: str, limit: int
+) -> list[tuple[str, int]]:
+    """
+    Find up to `limit` keys starting with a prefix in each of the sorted
+    segments of the search index.
+
+    :param `segments`: Sorted keys and their rows of each segment
+    :param `prefix`: The prefix
+    :param `limit`: Maximum number of matches per segment
+    :type `segments`: `list[tuple[list[str], Sequence[int]]]`
+    :type `prefix`: `str`
+    :type `limit`: `int`
+    :return: The matching keys and their rows
+    :rtype: `list[tuple[str, int]]`
+    """
+    matches: list[tuple[str, int]] = []
+    for keys, rows in segments:
+        start: int = bisect_left(keys, prefix)
+        for i in range(start, min(start + limit, len(keys))):
+            if not keys[i].startswith(prefix):
+                break
+            matches.append((keys[i], rows[i]))
+    return matches
+
+
+def _expiry_key(expiry: str) -> tuple[datetime, str]:
+    """
+    Sort key ordering expiries in DDMMYYYY format chronologically and any
+    other expiries after them as text.
+
+    :param `expiry`: The expiry
+    :type `expiry`: `str`
+    :return: The sort key
+    :rtype: `tuple[datetime, str]`
+    """
+    try:
+        return (datetime.strptime(expiry, "%d%m%Y"), "")
+    except ValueError:
+        return (datetime.max, expiry)
+
+
+def _untrack(segment: SharedMemory) -> None:
+    """
+    Stop the multiprocessing resource tracker from removing a shared memory
+    segment when this process exits, as other processes may still use it.
+
+    :param `segment`: The shared memory segment
+    :type `segment`: `SharedMemory`
+    :return: None
+    """
+    if os_name != "nt":
+        resource_tracker.unregister(
+            getattr(segment, "_name", segment.name), "shared_memory"
+        )
+
+
+def _typecode(size: int) -> str:
+    """
+    Get the smallest unsigned integer array type that holds the given number
+    of distinct codes.
+
+    :param `size`: Number of distinct codes
+    :type `size`: `int`
+    :return: The array type code
+    :rtype: `str`
+    """
+    for typecode in ("B", "H"):
+        if size <= 1 << (8 * array(typecode).itemsize):
+            return typecode
+    return "I"
@@ -79,10 +79,11 @@ Example:
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from json import dumps, loads
 from logging import Logger, getLogger
 from threading import Thread
-from typing import Any, Union
+from typing import Any, Callable
 
 from autobahn.twisted.websocket import connectWS  # type: ignore
 from autobahn.twisted.websocket import (  # type: ignore
@@ -93,10 +94,25 @@ from autobahn.twisted.websocket import (  # type: ignore
 from twisted.internet.base import BaseConnector
 from twisted.internet.protocol import ReconnectingClientFactory
 from twisted.internet.ssl import optionsForClientTLS  # type: ignore
+from twisted.internet.threads import deferToThread
 from twisted.python.failure import Failure
 from twisted.python.log import PythonLoggingObserver
 
 from integrate import ConnectToIntegrate
+from integrate.depth import DepthBook, DepthBookStore
+from integrate.snapshots import SnapshotStore
+from integrate.symbols import SymbolMaster
+from integrate.ticks import Tick
+
+try:
+    # Faster decoder of the streamed messages, which reads bytes directly
+    from orjson import loads as _decode
+except ImportError:
+
+    def _decode(payload: bytes) -> Any:  # type: ignore
+        # json.loads is slower on bytes than on str
+        return loads(payload.decode('utf-8'))
+
 
 log: Logger = getLogger(__name__)
 observer = PythonLoggingObserver(loggerName=__name__)
@@ -358,8 +374,16 @@ class IntegrateWebSocket:
 
     :param `connect_to_integrate`: The connection object.
     :param `logging`: Enable or disable logging. Defaults to `False`.
+    :param `max_message_size`: Maximum size (bytes) of a subscription message. Longer lists of tokens are split into several messages. Defaults to 8192.
+    :param `typed_ticks`: Pass ticks to `on_tick_update` as :py:class:`Tick` objects with numeric fields and the trading symbol instead of dictionaries of strings. Defaults to `False`.
+    :param `keep_snapshots`: Merge the partial tick and depth updates into the latest full record of each security, read with :py:meth:`latest`. Defaults to `False`.
+    :param `depth_books`: Merge the partial depth updates into a numeric five-level order book of each security, read with :py:meth:`depth_book`. Defaults to `False`.
     :type `connect_to_integrate`: `ConnectToIntegrate`
     :type `logging`: `bool`
+    :type `max_message_size`: `int`
+    :type `typed_ticks`: `bool`
+    :type `keep_snapshots`: `bool`
+    :type `depth_books`: `bool`
 
     Callbacks
     ---------
@@ -388,6 +412,10 @@ class IntegrateWebSocket:
         self,
         connect_to_integrate: ConnectToIntegrate,
         logging: bool = False,
+        max_message_size: int = 8192,
+        typed_ticks: bool = False,
+        keep_snapshots: bool = False,
+        depth_books: bool = False,
     ) -> None:
         # Initialize properties
         self.c2i: ConnectToIntegrate = connect_to_integrate
@@ -402,8 +430,34 @@ class IntegrateWebSocket:
             "wss://trade.definedgesecurities.com/NorenWSTRTP/"
         )
         self._logging: bool = logging
+        self._max_message_size: int = max_message_size
+        self._typed_ticks: bool = typed_ticks
+        self._trading_symbols: dict[tuple[str, str], str | None] = {}
+        # Symbols' master the tokens are validated against, captured off the
+        # reactor thread and replaced only when a refresh finished
+        self._symbol_master: SymbolMaster | None = None
+        self.snapshots: SnapshotStore | None = (
+            SnapshotStore() if keep_snapshots else None
+        )
+        self.depth_books: DepthBookStore | None = (
+            DepthBookStore() if depth_books else None
+        )
         observer.start() if self._logging else None
 
+        # Handlers of the received messages by message type
+        self._message_handlers: dict[str, Callable[[dict[str, Any]], None]] = {
+            "tf": self._on_tick_update,
+            "df": self._on_depth_update,
+            "om": self._on_order_update,
+            "ck": self._on_login_acknowledgement,
+            "tk": self._on_subscription_acknowledgement,
+            "ok": self._on_acknowledgement,
+            "dk": self._on_subscription_acknowledgement,
+            "uk": self._on_acknowledgement,
+            "uok": self._on_acknowledgement,
+            "udk": self._on_acknowledgement,
+        }
+
     def connect(
         self,
         socket_url: str | None = None,
@@ -450,6 +504,10 @@ class IntegrateWebSocket:
         self._socket_url = socket_url if socket_url else self._socket_url
         self._protocol: IntegrateWebSocketClientProtocol | None = None
 
+        # Capture the symbols' master before the reactor starts so that token
+        # validation never touches the master file on the reactor thread
+        self._symbol_master = self.c2i.symbol_master
+
         # Initialize IntegrateWebSocketClientFactory
         self._factory = IntegrateWebSocketClientFactory(
             self._socket_url,
@@ -542,7 +600,8 @@ class IntegrateWebSocket:
         tokens: list[tuple[str, str]] | None = None,
     ) -> None:
         """
-        Subscribe to a list of security tokens.
+        Subscribe to a list of security tokens. Only the tokens which are not
+        subscribed yet are sent to the server.
 
         :param `subscription_type`: The subscription type. Valid values are `TICK`, `ORDER` and `DEPTH`.
         :param `tokens`: List of security tokens to subscribe to. Defaults to `None`.
@@ -568,12 +627,19 @@ class IntegrateWebSocket:
                 subscription_type == self.c2i.SUBSCRIPTION_TYPE_TICK
                 or subscription_type == self.c2i.SUBSCRIPTION_TYPE_DEPTH
             ) and tokens:
-                for token in tokens:
-                    self.subscriptions[subscription_type].add("|".join(token))
-                self._protocol.sendMessage(dumps({"t": t, "k": "#".join(self.subscriptions[subscription_type])}, ensure_ascii=False).encode('utf-8'))  # type: ignore
+                keys: list[str] = [
+                    key
+                    for key in dict.fromkeys(
+                        "|".join(token) for token in tokens
+                    )
+                    if key not in self.subscriptions[subscription_type]
+                ]
+                self._send_tokens(t, keys)
+                # Recorded once sent, so that a failed send is retried
+                self.subscriptions[subscription_type].update(keys)
             else:
-                self.subscriptions[subscription_type].add(self.c2i.actid)
                 self._protocol.sendMessage(dumps({"t": t, "actid": self.c2i.actid}, ensure_ascii=False).encode('utf-8'))  # type: ignore
+                self.subscriptions[subscription_type].add(self.c2i.actid)
         except Exception as e:
             self._on_exception(
                 Exception(
@@ -587,7 +653,8 @@ class IntegrateWebSocket:
         tokens: list[tuple[str, str]] | None = None,
     ) -> None:
         """
-        Unsubscribe the given list of security tokens.
+        Unsubscribe the given list of security tokens. Only the tokens which
+        are subscribed are sent to the server.
 
         :param `unsubscription_type`: The unsubscription type. Valid values are `TICK`, `ORDER` and `DEPTH`.
         :param `tokens`: List of security tokens to unsubscribe from. Defaults to `None`.
@@ -615,11 +682,16 @@ class IntegrateWebSocket:
                 unsubscription_type == self.c2i.SUBSCRIPTION_TYPE_TICK
                 or unsubscription_type == self.c2i.SUBSCRIPTION_TYPE_DEPTH
             ) and tokens:
-                self._protocol.sendMessage(dumps({"t": t, "k": "#".join(tokens)}, ensure_ascii=False).encode('utf-8'))  # type: ignore
-                for token in tokens:
-                    self.subscriptions[unsubscription_type].remove(
-                        "|".join(token)
+                keys: list[str] = [
+                    key
+                    for key in dict.fromkeys(
+                        "|".join(token) for token in tokens
                     )
+                    if key in self.subscriptions[unsubscription_type]
+                ]
+                self._send_tokens(t, keys)
+                self.subscriptions[unsubscription_type].difference_update(keys)
+                self._forget(keys)
             else:
                 self._protocol.sendMessage(dumps({"t": t, "actid": self.c2i.actid}, ensure_ascii=False).encode('utf-8'))  # type: ignore
                 self.subscriptions[unsubscription_type].remove(self.c2i.actid)
@@ -632,21 +704,62 @@ class IntegrateWebSocket:
 
     def resubscribe(self) -> None:
         """
-        Resubscribe to all current subscribed tokens.
+        Resubscribe to all current subscribed tokens, e.g. after reconnecting.
 
         :returns: `None`
         """
         for subscription_type in self.subscriptions.keys():
             if subscription_type == self.c2i.SUBSCRIPTION_TYPE_ORDER:
                 self.subscribe(self.c2i.SUBSCRIPTION_TYPE_ORDER)
-            else:
-                self.subscribe(
-                    subscription_type,
-                    [
-                        tuple(token.split("|"))  # type: ignore
-                        for token in self.subscriptions[subscription_type]
-                    ],
-                )
+            elif self.subscriptions[subscription_type]:
+                # The server has forgotten them, so send all of them again
+                try:
+                    self._send_tokens(
+                        "t"
+                        if subscription_type == self.c2i.SUBSCRIPTION_TYPE_TICK
+                        else "d",
+                        list(self.subscriptions[subscription_type]),
+                    )
+                except Exception as e:
+                    self._on_exception(
+                        Exception(
+                            f"Error resubscribing tokens for {subscription_type}: {e}"
+                        )
+                    )
+
+    def latest(self, exchange: str, token: str) -> Mapping[str, Any] | None:
+        """
+        Get the latest full record of a security, merged from its tick and
+        depth updates. It can be read from any thread and doesn't change
+        with later updates.
+
+        :param `exchange`: The exchange.
+        :param `token`: The token.
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :returns: The read-only record, `None` if nothing was received yet or `keep_snapshots` is disabled.
+        """
+        return (
+            self.snapshots.latest(exchange, token) if self.snapshots else None
+        )
+
+    def depth_book(self, exchange: str, token: str) -> DepthBook | None:
+        """
+        Get the latest five-level order book of a security, merged from its
+        depth updates. It can be read from any thread and doesn't change
+        with later updates.
+
+        :param `exchange`: The exchange.
+        :param `token`: The token.
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :returns: The order book, `None` if nothing was received yet or `depth_books` is disabled.
+        """
+        return (
+            self.depth_books.latest(exchange, token)
+            if self.depth_books
+            else None
+        )
 
     def check_token_validity(self, tokens: list[tuple[str, str]]) -> None:
         """
@@ -662,15 +775,7 @@ class IntegrateWebSocket:
                     ValueError(f"Invalid exchange type: {exchange}")
                 )
 
-            t: Union[str, None] = next(
-                (
-                    i["token"]
-                    for i in self.c2i.symbols
-                    if i["segment"] == exchange and i["token"] == token
-                ),
-                None,
-            )
-            if not t:
+            if not self._symbols().find_by_token(exchange, token):
                 self._on_exception(
                     Exception(
                         f"{token} in {exchange} not found in symbols file"
@@ -830,15 +935,15 @@ class IntegrateWebSocket:
         pass
 
     def on_tick_update(
-        self, iws: IntegrateWebSocket, tick: dict[str, str]
+        self, iws: IntegrateWebSocket, tick: dict[str, str] | Tick
     ) -> None:
         """
         Callback function called when the WebSocket connection receives a tick update.
 
         :param `iws`: The `IntegrateWebSocket` instance.
-        :param `tick`: The tick update.
+        :param `tick`: The tick update, a :py:class:`Tick` if `typed_ticks` is enabled.
         :type `iws`: `IntegrateWebSocket`
-        :type `tick`: `dict`
+        :type `tick`: `dict | Tick`
         :returns: `None`
         """
         pass
@@ -914,6 +1019,8 @@ class IntegrateWebSocket:
         self.login()
         if self._factory and self._factory.is_reconnection:
             self.resubscribe()
+            # The symbols' master file may have changed while disconnected
+            self._refresh_symbols()
         self._factory.is_reconnection = False
         self.on_open(self)
 
@@ -962,39 +1069,220 @@ class IntegrateWebSocket:
         :type `is_binary`: `bool`
         :returns: `None`
         """
-        data: dict[str, Any] = {}
         # Decode payload
         try:
-            data = loads(payload.decode('utf-8'))
+            data: dict[str, Any] = _decode(payload)
         except ValueError as e:
             self._on_exception(e)
+            return
 
         # Handle message
-        if data["t"] == "ck":
-            # Set logged in status
-            self.is_logged_in = True if data["s"] == "OK" else False
-            if not self.is_logged_in:
-                self._on_exception(ValueError("Incorrect login details"))
-            self.on_acknowledgement(self, data)
-            self.on_login(self)
-        elif (
-            data["t"] == "tk"
-            or data["t"] == "ok"
-            or data["t"] == "dk"
-            or data["t"] == "uk"
-            or data["t"] == "uok"
-            or data["t"] == "udk"
-        ):
-            self.on_acknowledgement(self, data)
-        elif data["t"] == "tf":
-            self.on_tick_update(self, data)
-        elif data["t"] == "om":
-            self.on_order_update(self, data)
-        elif data["t"] == "df":
-            self.on_depth_update(self, data)
+        handler: Callable[[dict[str, Any]], None] | None
+        handler = self._message_handlers.get(data.get("t", ""))
+        if handler is not None:
+            handler(data)
         else:
             self._on_exception(KeyError(f"Invalid message: {data}"))
 
+    def _on_tick_update(self, tick: dict[str, Any]) -> None:
+        """
+        Call `on_tick_update` callback when a tick is received, decoding it
+        first if `typed_ticks` is enabled.
+
+        :param `tick`: The tick.
+        :type `tick`: `dict`
+        :returns: `None`
+        """
+        if self.snapshots is not None:
+            self._merge_snapshot(tick)
+
+        if not self._typed_ticks:
+            self.on_tick_update(self, tick)
+            return
+
+        try:
+            typed: Tick = Tick.from_message(
+                tick, self._trading_symbol(tick["e"], tick["tk"])
+            )
+        except (KeyError, ValueError) as e:
+            self._on_exception(e)
+            return
+        self.on_tick_update(self, typed)
+
+    def _trading_symbol(self, exchange: str, token: str) -> str | None:
+        """
+        Find the trading symbol of a token, remembering it for the next ticks.
+
+        :param `exchange`: The exchange.
+        :param `token`: The token.
+        :type `exchange`: `str`
+        :type `token`: `str`
+        :returns: The trading symbol, `None` if it is not in the symbols' master.
+        """
+        key: tuple[str, str] = (exchange, token)
+        try:
+            return self._trading_symbols[key]
+        except KeyError:
+            symbol: Any = self._symbols().find_by_token(exchange, token)
+            trading_symbol: str | None = (
+                symbol["trading_symbol"] if symbol else None
+            )
+            self._trading_symbols[key] = trading_symbol
+            return trading_symbol
+
+    def _symbols(self) -> SymbolMaster:
+        """
+        Get the symbols' master the tokens are validated against. It is
+        captured on the first use if that happens before connecting.
+
+        :returns: The symbols' master.
+        """
+        if self._symbol_master is None:
+            self._symbol_master = self.c2i.symbol_master
+        return self._symbol_master
+
+    def _refresh_symbols(self) -> None:
+        """
+        Rebuild the symbols' master in a thread if its file changed, then
+        swap it in on the reactor thread.
+
+        :returns: `None`
+        """
+        deferToThread(lambda: self.c2i.symbol_master).addCallbacks(
+            self._on_symbols_refreshed,
+            lambda failure: self._on_exception(failure.value),
+        )
+
+    def _on_symbols_refreshed(self, master: SymbolMaster) -> None:
+        """
+        Validate the tokens against the refreshed symbols' master.
+
+        :param `master`: The symbols' master.
+        :type `master`: `SymbolMaster`
+        :returns: `None`
+        """
+        if master is not self._symbol_master:
+            self._symbol_master = master
+            self._trading_symbols.clear()
+
+    def _on_order_update(self, order: dict[str, Any]) -> None:
+        """
+        Call `on_order_update` callback when an order update is received.
+
+        :param `order`: The order update.
+        :type `order`: `dict`
+        :returns: `None`
+        """
+        self.on_order_update(self, order)
+
+    def _on_depth_update(self, depth: dict[str, Any]) -> None:
+        """
+        Call `on_depth_update` callback when a bid-ask depth update is received.
+
+        :param `depth`: The bid-ask depth update.
+        :type `depth`: `dict`
+        :returns: `None`
+        """
+        if self.snapshots is not None:
+            self._merge_snapshot(depth)
+        if self.depth_books is not None and not self._merge_depth_book(depth):
+            return
+        self.on_depth_update(self, depth)
+
+    def _on_acknowledgement(self, ack: dict[str, Any]) -> None:
+        """
+        Call `on_acknowledgement` callback when an acknowledgement is received.
+
+        :param `ack`: The acknowledgement.
+        :type `ack`: `dict`
+        :returns: `None`
+        """
+        self.on_acknowledgement(self, ack)
+
+    def _on_subscription_acknowledgement(self, ack: dict[str, Any]) -> None:
+        """
+        Keep the full record sent with a tick or depth subscription
+        acknowledgement and call `on_acknowledgement` callback.
+
+        :param `ack`: The acknowledgement.
+        :type `ack`: `dict`
+        :returns: `None`
+        """
+        if "tk" in ack:
+            if self.snapshots is not None:
+                self._merge_snapshot(ack)
+            if self.depth_books is not None and ack["t"] == "dk":
+                self._merge_depth_book(ack)
+        self.on_acknowledgement(self, ack)
+
+    def _merge_snapshot(self, update: dict[str, Any]) -> None:
+        """
+        Merge an update into the snapshot of its security. Updates without
+        an exchange or token are skipped.
+
+        :param `update`: The tick or depth update.
+        :type `update`: `dict`
+        :returns: `None`
+        """
+        if "e" in update and "tk" in update:
+            self.snapshots.update(update)  # type: ignore
+
+    def _merge_depth_book(self, update: dict[str, Any]) -> bool:
+        """
+        Merge a depth update into the order book of its security.
+
+        :param `update`: The depth update.
+        :type `update`: `dict`
+        :returns: `False` if the update is malformed, else `True`.
+        """
+        try:
+            self.depth_books.update(update)  # type: ignore
+        except (KeyError, ValueError) as e:
+            self._on_exception(
+                ValueError(f"Invalid depth update {update}: {e}")
+            )
+            return False
+        return True
+
+    def _forget(self, keys: list[str]) -> None:
+        """
+        Forget the snapshots of the tokens subscribed neither to ticks nor
+        to depth anymore, and the order books of those not subscribed to
+        depth anymore.
+
+        :param `keys`: The tokens joined with their exchange, e.g. `NSE|22`.
+        :type `keys`: `list[str]`
+        :returns: `None`
+        """
+        for key in keys:
+            if key in self.subscriptions[self.c2i.SUBSCRIPTION_TYPE_DEPTH]:
+                continue
+            exchange, token = key.split("|")
+            if self.depth_books is not None:
+                self.depth_books.remove(exchange, token)
+            if (
+                self.snapshots is not None
+                and key
+                not in self.subscriptions[self.c2i.SUBSCRIPTION_TYPE_TICK]
+            ):
+                self.snapshots.remove(exchange, token)
+
+    def _on_login_acknowledgement(self, ack: dict[str, Any]) -> None:
+        """
+        Set the logged in status and call `on_acknowledgement` and `on_login`
+        callbacks when the login is acknowledged.
+
+        :param `ack`: The acknowledgement.
+        :type `ack`: `dict`
+        :returns: `None`
+        """
+        # Set logged in status
+        self.is_logged_in = True if ack["s"] == "OK" else False
+        if not self.is_logged_in:
+            self._on_exception(ValueError("Incorrect login details"))
+        self.on_acknowledgement(self, ack)
+        self.on_login(self)
+
     def _on_reconnection(self, retries: int) -> None:
         """
         Call `on_reconnection` callback when connection is retrying to reconnect.
@@ -1035,3 +1323,30 @@ class IntegrateWebSocket:
         :note: `Close Code Number <https://www.iana.org/assignments/websocket/websocket.xml#close-code-number>`_ defines the status codes on connection close
         """
         self._protocol.sendClose(code, reason) if self._protocol else None  # type: ignore
+
+    def _send_tokens(self, t: str, keys: list[str]) -> None:
+        """
+        Send a subscription message for the given tokens, split into several
+        messages of at most `max_message_size` bytes.
+
+        :param `t`: The message type.
+        :param `keys`: The tokens joined with their exchange, e.g. `NSE|22`.
+        :type `t`: `str`
+        :type `keys`: `list[str]`
+        :returns: `None`
+        """
+        # Size of the message without tokens
+        empty: int = len(
+            dumps({"t": t, "k": ""}, ensure_ascii=False).encode('utf-8')
+        )
+        chunk: list[str] = []
+        size: int = empty
+        for key in keys:
+            length: int = len(key.encode('utf-8')) + (1 if chunk else 0)
+            if chunk and size + length > self._max_message_size:
+                self._protocol.sendMessage(dumps({"t": t, "k": "#".join(chunk)}, ensure_ascii=False).encode('utf-8'))  # type: ignore
+                chunk, size, length = [], empty, length - 1
+            chunk.append(key)
+            size += length
+        if chunk:
+            self._protocol.sendMessage(dumps({"t": t, "k": "#".join(chunk)}, ensure_ascii=False).encode('utf-8'))  # type: ignore
@@ -27,9 +27,11 @@
 This module contains functions that help in testing.
 """
 
+from io import BytesIO
 from json import loads
 from os.path import abspath, dirname, join
 from typing import Any
+from zipfile import ZipFile
 
 
 def get_mock_response(filename: str) -> str:
@@ -68,3 +70,16 @@ def compare_keys(filename: str, actual_response: dict[str, Any]) -> bool:
             if not compare_keys(filename, actual_response[key]):
                 return False
     return True
+
+
+def get_mock_master_zip() -> bytes:
+    """
+    Get the mock symbols' master file packed like allmaster.zip.
+
+    :return: Zip archive containing allmaster.csv.
+    :rtype: bytes
+    """
+    buffer: BytesIO = BytesIO()
+    with ZipFile(buffer, "w") as z:
+        z.writestr("allmaster.csv", get_mock_response("allmaster.csv"))
+    return buffer.getvalue()
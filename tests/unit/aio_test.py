@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains unit tests for the asyncio clients.
+"""
+
+from asyncio import CancelledError, Task, create_task, gather, run, sleep
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Union
+
+from pytest import importorskip, raises
+from responses import GET, activate, add
+
+importorskip("aiohttp")
+
+from aiohttp import web  # noqa: E402
+
+from integrate.aio import (  # noqa: E402
+    AsyncConnectToIntegrate,
+    AsyncIntegrateData,
+    AsyncIntegrateOrders,
+)
+from tests.responses_helper import (  # noqa: E402
+    get_mock_master_zip,
+    get_mock_response,
+)
+
+
+def serve(
+    test: Callable[[str, list[str]], Awaitable[None]],
+) -> None:
+    """
+    Run a test against a local server answering like Integrate.
+
+    :param test: Coroutine function taking the server URL and the list of
+        requested paths
+    :return: None
+    """
+    requested: list[str] = []
+
+    async def quotes(request: web.Request) -> web.Response:
+        requested.append(request.path)
+        # Hold the response so concurrent callers overlap
+        await sleep(0.1)
+        return web.Response(
+            text=get_mock_response("quotes.json"),
+            content_type="application/json",
+        )
+
+    async def security_information(request: web.Request) -> web.Response:
+        requested.append(request.path)
+        # The session expires on the first request only
+        return web.Response(
+            text=get_mock_response("security_information.json")
+            if len(requested) > 1
+            else '{"status": "ERROR", "message": "Session Expired"}',
+            content_type="application/json",
+        )
+
+    async def orders(request: web.Request) -> web.Response:
+        requested.append(request.path)
+        return web.Response(
+            text=get_mock_response("orders.json"),
+            content_type="application/json",
+        )
+
+    async def history(request: web.Request) -> web.Response:
+        requested.append(request.path)
+        return web.Response(
+            text=get_mock_response("historical.csv"), content_type="text/csv"
+        )
+
+    async def root(request: web.Request) -> web.Response:
+        # Record the client's address to tell connections apart
+        requested.append(str(request.transport.get_extra_info("peername")))
+        return web.Response()
+
+    async def main() -> None:
+        app: web.Application = web.Application()
+        app.router.add_get("/", root)
+        app.router.add_get("/quotes/{exchange}/{token}", quotes)
+        app.router.add_get(
+            "/securityinfo/{exchange}/{token}", security_information
+        )
+        app.router.add_get("/orders", orders)
+        app.router.add_get("/history/{route:.*}", history)
+        runner: web.AppRunner = web.AppRunner(app)
+        await runner.setup()
+        site: web.TCPSite = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port: int = runner.addresses[0][1]
+        try:
+            await test(f"http://127.0.0.1:{port}/", requested)
+        finally:
+            await runner.cleanup()
+
+    run(main())
+
+
+def connect(
+    url: str, symbols_cache_dir: Union[str, None] = None
+) -> AsyncConnectToIntegrate:
+    """
+    Initialize AsyncConnectToIntegrate object talking to the local server.
+
+    :param url: URL of the local server
+    :param symbols_cache_dir: Directory in which the symbols' master file is
+        cached
+    :return: AsyncConnectToIntegrate object
+    """
+    c2i: AsyncConnectToIntegrate = AsyncConnectToIntegrate(
+        login_url=url,
+        base_url=url,
+        symbols_cache_dir=symbols_cache_dir,
+    )
+    c2i.set_session_keys(
+        uid="unit_test",
+        actid="unit_test",
+        api_session_key="unit_test",
+        ws_session_key="unit_test",
+    )
+    return c2i
+
+
+def add_mock_master() -> None:
+    """
+    Add a mock response for the symbols' master file endpoint, for the tests
+    resolving tokens.
+
+    :return: None
+    """
+    add(
+        method=GET,
+        url="https://app.definedgesecurities.com/public/allmaster.zip",
+        body=get_mock_master_zip(),
+        content_type="application/zip",
+    )
+
+
+def test_fetching_orders_asynchronously() -> None:
+    """
+    Test fetching the order book with AsyncIntegrateOrders.
+
+    :return: None
+    """
+
+    async def test(url: str, requested: list[str]) -> None:
+        async with connect(url) as c2i:
+            orders: dict[str, Any] = await AsyncIntegrateOrders(c2i).orders()
+        assert isinstance(orders, dict)
+        assert "orders" in orders
+        assert requested == ["/orders"]
+
+    serve(test)
+
+
+def test_prewarming_connections_asynchronously() -> None:
+    """
+    Test opening pooled connections ahead of concurrent requests.
+
+    :return: None
+    """
+
+    async def test(url: str, requested: list[str]) -> None:
+        c2i: AsyncConnectToIntegrate = AsyncConnectToIntegrate(
+            login_url=url, base_url=url, pool_size=3
+        )
+        async with c2i:
+            # Assert that no more connections than the pool size are opened
+            await c2i.prewarm(5)
+            assert len(set(requested)) == 3
+            # Assert that the prewarmed connections are reused
+            await c2i.prewarm(3)
+            assert len(requested) == 6
+            assert len(set(requested)) == 3
+
+    serve(test)
+
+
+@activate
+def test_coalescing_quotes_asynchronously(tmp_path: Path) -> None:
+    """
+    Test sharing one request between concurrent tasks asking for a quote.
+
+    :param tmp_path: Temporary directory for the symbols' master file
+    :return: None
+    """
+    add_mock_master()
+
+    async def test(url: str, requested: list[str]) -> None:
+        async with connect(url, str(tmp_path)) as c2i:
+            ic: AsyncIntegrateData = AsyncIntegrateData(c2i)
+            quotes: list[dict[str, Any]] = await gather(
+                *(ic.quotes(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ") for _ in range(4))
+            )
+            bulk: dict[tuple[str, str], dict[str, Any]] = await ic.bulk_quotes(
+                [
+                    (c2i.EXCHANGE_TYPE_NSE, "ACC-EQ"),
+                    (c2i.EXCHANGE_TYPE_NSE, "SBIN-EQ"),
+                ]
+            )
+        assert len(requested) == 3
+        assert all(quote == quotes[0] for quote in quotes)
+        # Every caller gets its own copy
+        assert len({id(quote) for quote in quotes}) == len(quotes)
+        assert "ltp" in quotes[0]
+        assert list(bulk) == [
+            (c2i.EXCHANGE_TYPE_NSE, "ACC-EQ"),
+            (c2i.EXCHANGE_TYPE_NSE, "SBIN-EQ"),
+        ]
+
+    serve(test)
+
+
+@activate
+def test_cancelling_a_coalesced_quote(tmp_path: Path) -> None:
+    """
+    Test that cancelling the task which started a shared request for a quote
+    doesn't cancel the other tasks waiting for it.
+
+    :param tmp_path: Temporary directory for the symbols' master file
+    :return: None
+    """
+    add_mock_master()
+
+    async def test(url: str, requested: list[str]) -> None:
+        async with connect(url, str(tmp_path)) as c2i:
+            ic: AsyncIntegrateData = AsyncIntegrateData(c2i)
+            first: Task[dict[str, Any]] = create_task(
+                ic.quotes(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ")
+            )
+            await sleep(0.02)
+            others: list[Task[dict[str, Any]]] = [
+                create_task(ic.quotes(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ"))
+                for _ in range(3)
+            ]
+            await sleep(0.02)
+            first.cancel()
+            quotes: list[dict[str, Any]] = await gather(*others)
+            with raises(CancelledError):
+                await first
+        assert len(requested) == 1
+        assert all("ltp" in quote for quote in quotes)
+
+    serve(test)
+
+
+@activate
+def test_not_caching_errors_asynchronously(tmp_path: Path) -> None:
+    """
+    Test that errors passed on to the session expired callback aren't cached
+    by AsyncIntegrateData.
+
+    :param tmp_path: Temporary directory for the symbols' master file
+    :return: None
+    """
+    add_mock_master()
+
+    async def test(url: str, requested: list[str]) -> None:
+        expired: list[bool] = []
+        async with connect(url, str(tmp_path)) as c2i:
+            c2i.session_expired_callback = lambda: expired.append(True)
+            ic: AsyncIntegrateData = AsyncIntegrateData(
+                c2i, security_information_ttl=60
+            )
+            sec_info: list[dict[str, Any]] = [
+                await ic.security_information(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ")
+                for _ in range(3)
+            ]
+        assert len(expired) == 1
+        assert sec_info[0]["status"] == "ERROR"
+        # Assert that the error wasn't served from the cache
+        assert all("isin" in info for info in sec_info[1:])
+        assert len(requested) == 2
+
+    serve(test)
+
+
+@activate
+def test_fetching_historical_data_asynchronously(tmp_path: Path) -> None:
+    """
+    Test fetching historical data in windows with AsyncIntegrateData.
+
+    :param tmp_path: Temporary directory for the symbols' master file
+    :return: None
+    """
+    add_mock_master()
+
+    async def test(url: str, requested: list[str]) -> None:
+        async with connect(url, str(tmp_path)) as c2i:
+            ic: AsyncIntegrateData = AsyncIntegrateData(c2i)
+            ic.HISTORY_URL = f"{url}history/"
+            start: datetime = datetime(2023, 6, 1)
+            end: datetime = datetime(2023, 6, 30)
+            bars: list[dict[str, Any]] = [
+                bar
+                async for bar in ic.historical_data(
+                    c2i.EXCHANGE_TYPE_NSE,
+                    "ACC-EQ",
+                    c2i.TIMEFRAME_TYPE_DAY,
+                    start,
+                    end,
+                    window=timedelta(days=10),
+                )
+            ]
+            bulk: list[tuple[str, str, Any]] = [
+                data
+                async for data in ic.bulk_historical_data(
+                    [
+                        (c2i.EXCHANGE_TYPE_NSE, "ACC-EQ"),
+                        (c2i.EXCHANGE_TYPE_NSE, "SBIN-EQ"),
+                    ],
+                    c2i.TIMEFRAME_TYPE_DAY,
+                    start,
+                    end,
+                )
+            ]
+        # One request per window, then one per security
+        assert len(requested) == 5
+        rows: int = len(get_mock_response("historical.csv").splitlines())
+        assert len(bars) == 3 * rows
+        assert bars[0]["datetime"] == datetime(2023, 6, 30, 9, 15)
+        assert {"open", "high", "low", "close", "volume"} <= set(bars[0])
+        assert sorted(symbol for _, symbol, _ in bulk) == ["ACC-EQ", "SBIN-EQ"]
+        assert all(len(data) == rows for _, _, data in bulk)
+
+    serve(test)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains unit tests for TTLCache class.
+"""
+
+from time import sleep
+
+from pytest import raises
+
+from integrate.cache import TTLCache
+
+
+def test_expiring_entries() -> None:
+    """
+    Test that entries expire after their time to live.
+
+    :return: None
+    """
+    cache: TTLCache = TTLCache(ttl=0.05)
+    cache.set("ACC", 1)
+    assert cache.get("ACC") == 1
+    sleep(0.06)
+    assert cache.get("ACC") is None
+    assert cache.get("SBIN", "missing") == "missing"
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 0
+
+    cache.set("ACC", 1)
+    cache.clear()
+    assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+
+    with raises(ValueError):
+        TTLCache(ttl=0)
+
+
+def test_evicting_least_recently_used() -> None:
+    """
+    Test that the least recently used entry is evicted once full.
+
+    :return: None
+    """
+    cache: TTLCache = TTLCache(ttl=60, maxsize=2)
+    cache.set("ACC", 1)
+    cache.set("SBIN", 2)
+    assert cache.get("ACC") == 1
+    cache.set("NIFTY", 3)
+    assert cache.get("SBIN") is None
+    assert cache.get("ACC") == 1
+    assert cache.get("NIFTY") == 3
+    assert len(cache) == 2
@@ -27,22 +27,43 @@
 This module contains functions that configure pytest for unit tests.
 """
 
-from pytest import fixture
+from pathlib import Path
+
+from pytest import TempPathFactory, fixture
 
 from integrate import ConnectToIntegrate, IntegrateData, IntegrateOrders
 from integrate.ws import IntegrateWebSocketClientProtocol
+from tests.responses_helper import get_mock_response
+
+
+@fixture(scope="session")
+def symbols_cache_dir(tmp_path_factory: TempPathFactory) -> str:
+    """
+    Create a directory holding the mock symbols' master file, so that the
+    tests never download it nor touch the one cached in the package.
+
+    :param tmp_path_factory: Pytest temporary directory factory
+    :return: Path of the directory
+    """
+    directory: Path = tmp_path_factory.mktemp("symbols")
+    (directory / "allmaster.csv").write_text(
+        get_mock_response("allmaster.csv")
+    )
+    return str(directory)
 
 
 @fixture(scope="session")
-def c2i() -> ConnectToIntegrate:
+def c2i(symbols_cache_dir: str) -> ConnectToIntegrate:
     """
     Initialize ConnectToIntegrate object.
 
+    :param symbols_cache_dir: Directory of the mock symbols' master file
     :return: ConnectToIntegrate object
     """
     c2i = ConnectToIntegrate(
         login_url="http://signin-defsec-unit-test",
         base_url="http://integrate-defsec-unit-test/",
+        symbols_cache_dir=symbols_cache_dir,
     )
     c2i.set_session_keys(
         uid="unit_test",
@@ -54,16 +75,18 @@ def c2i() -> ConnectToIntegrate:
 
 
 @fixture(scope="session")
-def c2i_with_logging() -> ConnectToIntegrate:
+def c2i_with_logging(symbols_cache_dir: str) -> ConnectToIntegrate:
     """
     Initialize ConnectToIntegrate object with logging.
 
+    :param symbols_cache_dir: Directory of the mock symbols' master file
     :return: ConnectToIntegrate object
     """
     c2i = ConnectToIntegrate(
         login_url="http://signin-defsec-unit-test",
         base_url="http://integrate-defsec-unit-test/",
         logging=True,
+        symbols_cache_dir=symbols_cache_dir,
     )
     c2i.set_session_keys(
         uid="unit_test",
@@ -27,24 +27,32 @@
 This module contains unit tests for ConnectToIntegrate class.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
-from os import remove
-from os.path import abspath, dirname, isfile, join
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.shared_memory import SharedMemory
+from os import getpid
+from pathlib import Path
+from threading import Thread
+from time import sleep
 from urllib.parse import urljoin
 
 from pytest import raises
-from responses import GET, POST, activate, add
+from responses import GET, POST, activate, add, calls
 from responses.matchers import header_matcher, json_params_matcher
 
 from integrate import ConnectToIntegrate
-from tests.responses_helper import get_mock_response
+from integrate.connect import _file_lock
+from integrate.symbols import SymbolMaster, _untrack
+from tests.responses_helper import get_mock_master_zip, get_mock_response
 
 
 @activate
-def test_successful_login() -> None:
+def test_successful_login(tmp_path: Path) -> None:
     """
     Test successful login.
 
+    :param tmp_path: Temporary directory for the symbols' master file
     :return: None
     """
     test_login_url: str = "http://signin-defsec-unit-test"
@@ -103,6 +111,7 @@ def test_successful_login() -> None:
     c2i = ConnectToIntegrate(
         login_url=test_login_url,
         base_url=test_base_url,
+        symbols_cache_dir=str(tmp_path),
     )
     c2i.login(
         api_token=api_token,
@@ -179,12 +188,11 @@ def test_getting_session_keys(c2i: ConnectToIntegrate) -> None:
 
 
 @activate
-def test_symbols(c2i: ConnectToIntegrate) -> None:
+def test_symbols(tmp_path: Path) -> None:
     """
     Test symbols generator.
 
-    :param c2i: Instance of ConnectToIntegrate class
-    :type c2i: ConnectToIntegrate
+    :param tmp_path: Temporary directory
     :return: None
     """
     # Add a passthrough response for the symbols' master file endpoint
@@ -194,12 +202,8 @@ def test_symbols(c2i: ConnectToIntegrate) -> None:
         body="{}",
         passthrough=True,
     )
-    symbol_filename: str = abspath(
-        join(dirname(__file__), "..", "..", "integrate", "allmaster.csv")
-    )
-    # Remove the file if it exists
-    if isfile(symbol_filename):
-        remove(symbol_filename)
+    # Download the file into an empty cache directory
+    c2i = ConnectToIntegrate(symbols_cache_dir=str(tmp_path))
 
     # Generate symbols and assert that the keys are present
     assert "token" in next(c2i.symbols)
@@ -216,3 +220,218 @@ def test_logging(c2i_with_logging: ConnectToIntegrate) -> None:
     """
     # Assert that the base_url is set correctly
     assert c2i_with_logging.base_url == "http://integrate-defsec-unit-test/"
+
+
+@activate
+def test_symbol_lookup(tmp_path: Path) -> None:
+    """
+    Test looking up symbols by trading symbol and token.
+
+    :param tmp_path: Temporary directory
+    :return: None
+    """
+    # Add a mock response for the symbols' master file endpoint
+    add(
+        method=GET,
+        url="https://app.definedgesecurities.com/public/allmaster.zip",
+        body=get_mock_master_zip(),
+        content_type="application/zip",
+    )
+    c2i = ConnectToIntegrate(symbols_cache_dir=str(tmp_path))
+
+    # Assert that lookups by trading symbol and token agree
+    symbol = c2i.get_symbol(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ")
+    assert symbol is not None
+    assert symbol["token"] == "22"
+    assert c2i.get_symbol_by_token(c2i.EXCHANGE_TYPE_NSE, "22") == symbol
+    assert c2i.get_symbol(c2i.EXCHANGE_TYPE_BSE, "ACC-EQ") is None
+    assert c2i.get_symbol_by_token(c2i.EXCHANGE_TYPE_NFO, "22") is None
+
+
+@activate
+def test_refreshing_symbols(tmp_path: Path) -> None:
+    """
+    Test conditional download of the symbols' master file.
+
+    :param tmp_path: Temporary directory
+    :return: None
+    """
+    url: str = "https://app.definedgesecurities.com/public/allmaster.zip"
+    # Add mock responses for a full and a conditional download
+    add(
+        method=GET,
+        url=url,
+        match=[header_matcher({"If-None-Match": '"v1"'})],
+        status=304,
+    )
+    add(
+        method=GET,
+        url=url,
+        body=get_mock_master_zip(),
+        content_type="application/zip",
+        headers={"ETag": '"v1"'},
+    )
+    c2i = ConnectToIntegrate(symbols_cache_dir=str(tmp_path))
+
+    # Assert that the first refresh downloads the file
+    c2i.refresh_symbols()
+    assert len(calls) == 1
+    assert "If-None-Match" not in calls[0].request.headers
+    assert (tmp_path / "allmaster.csv").is_file()
+    assert c2i.get_symbol(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ") is not None
+
+    # Assert that the next refresh is revalidated and not downloaded again
+    c2i.refresh_symbols()
+    assert len(calls) == 2
+    assert calls[1].response.status_code == 304
+    assert c2i.get_symbol(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ") is not None
+
+    # Assert that no partially written files are left behind
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "allmaster.bin",
+        "allmaster.csv",
+        "allmaster.csv.lock",
+        "allmaster.json",
+    ]
+
+    # Assert that a fresh file is used without any request
+    c2i = ConnectToIntegrate(
+        symbols_cache_dir=str(tmp_path), symbols_max_age=3600
+    )
+    c2i.refresh_symbols()
+    assert len(calls) == 2
+
+
+def test_file_lock(tmp_path: Path) -> None:
+    """
+    Test holding the lock shared between threads and processes.
+
+    :param tmp_path: Temporary directory
+    :return: None
+    """
+    filename: str = str(tmp_path / "allmaster.csv.lock")
+    # Assert that a lock file left behind doesn't block
+    Path(filename).touch()
+    with _file_lock(filename):
+        pass
+
+    # Assert that the holders don't overlap
+    held: list[int] = []
+    overlaps: list[int] = []
+
+    def hold() -> None:
+        with _file_lock(filename):
+            held.append(1)
+            overlaps.append(len(held))
+            sleep(0.01)
+            held.pop()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for _ in range(8):
+            executor.submit(hold)
+    assert overlaps == [1] * 8
+
+
+def test_attaching_while_publishing(tmp_path: Path) -> None:
+    """
+    Test attaching to a shared symbols' master that another process has
+    created but not finished writing yet.
+
+    :param tmp_path: Temporary directory
+    :return: None
+    """
+    (tmp_path / "allmaster.csv").write_text(get_mock_response("allmaster.csv"))
+    name: str = f"pyintegrate-test-{getpid()}"
+    c2i = ConnectToIntegrate(
+        symbols_cache_dir=str(tmp_path), symbols_shared_memory=name
+    )
+    master = SymbolMaster.from_csv(str(tmp_path / "allmaster.csv"))
+    master.source = c2i._symbols_file_key()
+    data: bytes = master.to_bytes()
+    # Write everything but the magic, which publishing writes last
+    segment = SharedMemory(name=name, create=True, size=len(data))
+    _untrack(segment)
+    try:
+        segment.buf[8 : len(data)] = data[8:]
+
+        def finish() -> None:
+            sleep(0.06)
+            segment.buf[:8] = data[:8]
+
+        finisher = Thread(target=finish)
+        finisher.start()
+        # Assert that the master is attached once published, not rebuilt
+        c2i.build_symbols_index()
+        finisher.join()
+        assert not (tmp_path / "allmaster.bin").exists()
+        assert c2i.get_symbol(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ") is not None
+    finally:
+        segment.close()
+        SymbolMaster.unlink_shared(name)
+
+    # Assert that a segment which is never finished is built and replaced
+    segment = SharedMemory(name=name, create=True, size=len(data))
+    _untrack(segment)
+    segment.close()
+    c2i = ConnectToIntegrate(
+        symbols_cache_dir=str(tmp_path), symbols_shared_memory=name
+    )
+    try:
+        c2i.build_symbols_index()
+        assert c2i.get_symbol(c2i.EXCHANGE_TYPE_NSE, "ACC-EQ") is not None
+        assert SymbolMaster.attach(name).source == master.source
+    finally:
+        SymbolMaster.unlink_shared(name)
+
+
+def test_prewarming_connections() -> None:
+    """
+    Test opening pooled connections ahead of concurrent requests.
+
+    :return: None
+    """
+    clients: set[tuple[str, int]] = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            clients.add(self.client_address)
+            body: bytes = get_mock_response("quotes.json").encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server: ThreadingHTTPServer = ThreadingHTTPServer(
+        ("127.0.0.1", 0), Handler
+    )
+    Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url: str = f"http://127.0.0.1:{server.server_address[1]}/"
+        c2i = ConnectToIntegrate(login_url=url, base_url=url, pool_size=3)
+        # Assert that no more connections than the pool size are opened
+        c2i.prewarm(5)
+        assert len(clients) == 3
+
+        # Assert that concurrent requests reuse the prewarmed connections
+        with ThreadPoolExecutor(3) as executor:
+            list(
+                executor.map(
+                    lambda _: c2i.send_request(url, "quotes", "GET"),
+                    range(9),
+                )
+            )
+        assert len(clients) == 3
+
+        # Assert that nothing is kept open without keep-alive
+        c2i = ConnectToIntegrate(base_url=url, keep_alive=False)
+        c2i.prewarm(2)
+        assert len(clients) == 3
+    finally:
+        server.shutdown()
+        server.server_close()
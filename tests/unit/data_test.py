@@ -27,16 +27,40 @@
 This module contains unit tests for IntegrateData class.
 """
 
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Barrier
+from time import monotonic, sleep
 from typing import Any, Union
 from urllib.parse import urljoin
 
-from responses import GET, activate, add
+from pytest import MonkeyPatch, importorskip, mark, raises
+from responses import GET, activate, add, add_callback, calls
 
 from integrate import ConnectToIntegrate, IntegrateData
+from integrate.data import RateLimiter, parse_timestamp
+from integrate.symbols import SymbolRow
 from tests.responses_helper import get_mock_response
 
 
+@mark.parametrize("cache", [True, False])
+def test_parsing_timestamps(cache: bool) -> None:
+    """
+    Test parsing timestamps of historical data.
+
+    :param cache: Whether to cache the parsed dates
+    :return: None
+    """
+    for value in ("300620230915", "290220241530", "010119700000"):
+        assert parse_timestamp(value, cache) == datetime.strptime(
+            value, "%d%m%Y%H%M"
+        )
+    for value in ("300620232400", "300620230960", "310620230915", "3006"):
+        with raises(ValueError):
+            parse_timestamp(value, cache)
+
+
 @activate
 def test_fetching_historical_data(
     c2i: ConnectToIntegrate, ic: IntegrateData
@@ -92,6 +116,290 @@ def test_fetching_historical_data(
     assert "volume" in data
 
 
+@activate
+def test_fetching_historical_data_arrays(
+    c2i: ConnectToIntegrate, ic: IntegrateData
+) -> None:
+    """
+    Test fetching historical data for a symbol as arrays.
+
+    :param c2i: ConnectToIntegrate object
+    :param ic: IntegrateData object
+    :return: None
+    """
+    np = importorskip("numpy")
+    exchange: str = c2i.EXCHANGE_TYPE_NSE
+    timeframe: str = c2i.TIMEFRAME_TYPE_DAY
+    trading_symbol: str = "ACC-EQ"
+    start: datetime = datetime.strptime("300620230915", "%d%m%Y%H%M")
+    end: datetime = datetime.strptime("300620231530", "%d%m%Y%H%M")
+    symbol: Union[SymbolRow, None] = c2i.get_symbol(exchange, trading_symbol)
+    assert symbol is not None
+    # Add a mock response for the historical data endpoint
+    add(
+        method=GET,
+        url=urljoin(
+            "https://data.definedgesecurities.com/sds/history/",
+            f"{exchange}/{symbol['token']}/{timeframe}/{start.strftime('%d%m%Y%H%M')}/{end.strftime('%d%m%Y%H%M')}",
+        ),
+        body=get_mock_response("historical.csv"),
+        content_type="text/csv",
+    )
+    # Fetch historical data
+    data: dict[str, Any] = ic.historical_data_arrays(
+        exchange=exchange,
+        trading_symbol=trading_symbol,
+        timeframe=timeframe,
+        start=start,
+        end=end,
+    )
+    # Assert that the columns match the rows of historical_data
+    assert list(data) == ["datetime", "open", "high", "low", "close", "volume"]
+    assert data["datetime"][0] == np.datetime64(start)
+    assert data["close"].tolist() == [1820.2]
+    assert data["volume"].tolist() == [9367]
+
+    with raises(ValueError, match="historical_ticks"):
+        ic.historical_data_arrays(
+            exchange=exchange,
+            trading_symbol=trading_symbol,
+            timeframe=c2i.TIMEFRAME_TYPE_TICK,
+            start=start,
+            end=end,
+        )
+
+
+@activate
+def test_fetching_historical_data_in_windows(
+    c2i: ConnectToIntegrate, ic: IntegrateData
+) -> None:
+    """
+    Test fetching historical data split into windows.
+
+    :param c2i: ConnectToIntegrate object
+    :param ic: IntegrateData object
+    :return: None
+    """
+    exchange: str = c2i.EXCHANGE_TYPE_NSE
+    timeframe: str = c2i.TIMEFRAME_TYPE_MIN
+    trading_symbol: str = "ACC-EQ"
+    symbol: Union[SymbolRow, None] = c2i.get_symbol(exchange, trading_symbol)
+    assert symbol is not None
+    # Add a mock response for each window of a day
+    windows: list[tuple[str, str]] = [
+        ("030720230000", "030720232359"),
+        ("040720230000", "040720232359"),
+        ("050720230000", "050720231530"),
+    ]
+    for window_start, window_end in windows:
+        add(
+            method=GET,
+            url=urljoin(
+                "https://data.definedgesecurities.com/sds/history/",
+                f"{exchange}/{symbol['token']}/{timeframe}/{window_start}/{window_end}",
+            ),
+            body=f"{window_start[:8]}0915,1,2,0.5,1.5,10\n"
+            f"{window_start[:8]}0916,1.5,2,1,1.25,20\n",
+            content_type="text/csv",
+        )
+    query: dict[str, Any] = {
+        "exchange": exchange,
+        "trading_symbol": trading_symbol,
+        "timeframe": timeframe,
+        "start": datetime(2023, 7, 3),
+        "end": datetime(2023, 7, 5, 15, 30),
+        "window": timedelta(days=1),
+        "max_workers": 3,
+    }
+    # Assert that the bars are stitched back in order
+    bars: list[dict[str, Any]] = list(ic.historical_data(**query))
+    assert [bar["datetime"] for bar in bars] == [
+        datetime(2023, 7, day, 9, minute)
+        for day in (3, 4, 5)
+        for minute in (15, 16)
+    ]
+    assert len(calls) == 3
+
+    importorskip("numpy")
+    data: dict[str, Any] = ic.historical_data_arrays(**query)
+    assert data["datetime"].tolist() == [bar["datetime"] for bar in bars]
+    assert data["volume"].tolist() == [10, 20] * 3
+
+    with raises(ValueError):
+        next(ic.historical_data(**{**query, "timeframe": "tick"}))
+
+
+@activate
+def test_fetching_cached_historical_data(
+    c2i: ConnectToIntegrate, tmp_path: Path
+) -> None:
+    """
+    Test fetching historical data through the history cache.
+
+    :param c2i: ConnectToIntegrate object
+    :param tmp_path: Temporary directory
+    :return: None
+    """
+    importorskip("numpy")
+    ic: IntegrateData = IntegrateData(c2i, history_cache_dir=str(tmp_path))
+    exchange: str = c2i.EXCHANGE_TYPE_NSE
+    timeframe: str = c2i.TIMEFRAME_TYPE_DAY
+    trading_symbol: str = "ACC-EQ"
+    start: datetime = datetime.strptime("300620230915", "%d%m%Y%H%M")
+    end: datetime = datetime.strptime("300620231530", "%d%m%Y%H%M")
+    symbol: Union[SymbolRow, None] = c2i.get_symbol(exchange, trading_symbol)
+    assert symbol is not None
+    # Add a mock response for the historical data endpoint
+    add(
+        method=GET,
+        url=urljoin(
+            "https://data.definedgesecurities.com/sds/history/",
+            f"{exchange}/{symbol['token']}/{timeframe}/{start.strftime('%d%m%Y%H%M')}/{end.strftime('%d%m%Y%H%M')}",
+        ),
+        body=get_mock_response("historical.csv"),
+        content_type="text/csv",
+    )
+    query: dict[str, Any] = {
+        "exchange": exchange,
+        "trading_symbol": trading_symbol,
+        "timeframe": timeframe,
+        "start": start,
+        "end": end,
+    }
+    # Assert that the second request is served from the cache
+    bars: list[dict[str, Any]] = list(ic.historical_data(**query))
+    assert list(ic.historical_data(**query)) == bars
+    assert len(calls) == 1
+    assert bars == [
+        {
+            "datetime": start,
+            "open": 1819.95,
+            "high": 1822.95,
+            "low": 1807.9,
+            "close": 1820.2,
+            "volume": 9367,
+        }
+    ]
+
+
+@activate
+def test_fetching_historical_ticks(
+    c2i: ConnectToIntegrate, ic: IntegrateData
+) -> None:
+    """
+    Test fetching tick data for a symbol as a structured array.
+
+    :param c2i: ConnectToIntegrate object
+    :param ic: IntegrateData object
+    :return: None
+    """
+    importorskip("numpy")
+    exchange: str = c2i.EXCHANGE_TYPE_NSE
+    trading_symbol: str = "ACC-EQ"
+    start: datetime = datetime.strptime("300620230915", "%d%m%Y%H%M")
+    end: datetime = datetime.strptime("300620230916", "%d%m%Y%H%M")
+    symbol: Union[SymbolRow, None] = c2i.get_symbol(exchange, trading_symbol)
+    assert symbol is not None
+    # Add a mock response for the tick data endpoint
+    add(
+        method=GET,
+        url=urljoin(
+            "https://data.definedgesecurities.com/sds/history/",
+            f"{exchange}/{symbol['token']}/tick/{start.strftime('%d%m%Y%H%M')}/{end.strftime('%d%m%Y%H%M')}",
+        ),
+        body="1688116500,1819.95,10,0\n1688116501,1820.5,25,0\n",
+        content_type="text/csv",
+    )
+    # Fetch ticks
+    ticks = ic.historical_ticks(
+        exchange=exchange, trading_symbol=trading_symbol, start=start, end=end
+    )
+    # Assert that the fields are typed
+    assert ticks.dtype.names == ("utc", "ltp", "ltq", "oi")
+    assert ticks["utc"].tolist() == [1688116500, 1688116501]
+    assert ticks["ltq"].tolist() == [10, 25]
+
+    # Resample the ticks into minute bars
+    bars: dict[str, Any] = ic.resample(ticks, timedelta(minutes=1), exchange)
+    assert bars["datetime"].tolist() == [datetime(2023, 6, 30, 14, 45)]
+    assert bars["volume"].tolist() == [35]
+
+
+@activate
+def test_fetching_bulk_historical_data(
+    c2i: ConnectToIntegrate, ic: IntegrateData
+) -> None:
+    """
+    Test fetching historical data for many symbols at once.
+
+    :param c2i: ConnectToIntegrate object
+    :param ic: IntegrateData object
+    :return: None
+    """
+    exchange: str = c2i.EXCHANGE_TYPE_NSE
+    timeframe: str = c2i.TIMEFRAME_TYPE_DAY
+    start: datetime = datetime.strptime("300620230915", "%d%m%Y%H%M")
+    end: datetime = datetime.strptime("300620231530", "%d%m%Y%H%M")
+    trading_symbols: list[str] = ["ACC-EQ", "SBIN-EQ"]
+    # Add a mock response for the historical data of each symbol
+    for trading_symbol in trading_symbols:
+        symbol: Union[SymbolRow, None] = c2i.get_symbol(
+            exchange, trading_symbol
+        )
+        assert symbol is not None
+        add(
+            method=GET,
+            url=urljoin(
+                "https://data.definedgesecurities.com/sds/history/",
+                f"{exchange}/{symbol['token']}/{timeframe}/{start.strftime('%d%m%Y%H%M')}/{end.strftime('%d%m%Y%H%M')}",
+            ),
+            body=get_mock_response("historical.csv"),
+            content_type="text/csv",
+        )
+    # Assert that every symbol is downloaded once
+    results: dict[str, Any] = {
+        trading_symbol: bars
+        for _, trading_symbol, bars in ic.bulk_historical_data(
+            [(exchange, trading_symbol) for trading_symbol in trading_symbols],
+            timeframe=timeframe,
+            start=start,
+            end=end,
+            max_workers=2,
+            rate_limit=100,
+        )
+    }
+    assert sorted(results) == trading_symbols
+    assert results["SBIN-EQ"][0]["close"] == 1820.2
+    assert len(calls) == 2
+
+    # Unknown symbols fail before anything is downloaded
+    with raises(Exception, match="Token not found"):
+        next(
+            ic.bulk_historical_data(
+                [(exchange, "ACC-EQ"), (exchange, "UNKNOWN-EQ")],
+                timeframe=timeframe,
+                start=start,
+                end=end,
+            )
+        )
+    assert len(calls) == 2
+
+
+def test_rate_limiter() -> None:
+    """
+    Test spacing out calls with the rate limiter.
+
+    :return: None
+    """
+    limiter: RateLimiter = RateLimiter(50)
+    started: float = monotonic()
+    for _ in range(4):
+        limiter.wait()
+    assert monotonic() - started >= 0.06
+    with raises(ValueError):
+        RateLimiter(0)
+
+
 @activate
 def test_fetching_quotes(c2i: ConnectToIntegrate, ic: IntegrateData) -> None:
     """
@@ -137,6 +445,180 @@ def test_fetching_quotes(c2i: ConnectToIntegrate, ic: IntegrateData) -> None:
     assert "best_ask_qty1" in quote
 
 
+@activate
+def test_fetching_bulk_quotes(
+    c2i: ConnectToIntegrate, ic: IntegrateData
+) -> None:
+    """
+    Test fetching quotes for many symbols at once.
+
+    :param c2i: ConnectToIntegrate object
+    :param ic: IntegrateData object
+    :return: None
+    """
+    exchange: str = c2i.EXCHANGE_TYPE_NSE
+    for trading_symbol in ("ACC-EQ", "SBIN-EQ"):
+        symbol: Union[SymbolRow, None] = c2i.get_symbol(
+            exchange, trading_symbol
+        )
+        assert symbol is not None
+        add(
+            method=GET,
+            url=urljoin(c2i.base_url, f"quotes/{exchange}/{symbol['token']}"),
+            body=get_mock_response("quotes.json"),
+            content_type="application/json",
+        )
+    # Assert that duplicate symbols are fetched once
+    quotes: dict[tuple[str, str], dict[str, Any]] = ic.bulk_quotes(
+        [(exchange, "ACC-EQ"), (exchange, "SBIN-EQ"), (exchange, "ACC-EQ")]
+    )
+    assert sorted(quotes) == [(exchange, "ACC-EQ"), (exchange, "SBIN-EQ")]
+    assert all("ltp" in quote for quote in quotes.values())
+    assert len(calls) == 2
+    assert ic.bulk_quotes([]) == {}
+
+
+@activate
+def test_coalescing_quotes(c2i: ConnectToIntegrate, ic: IntegrateData) -> None:
+    """
+    Test sharing one request between concurrent callers of the same quote.
+
+    :param c2i: ConnectToIntegrate object
+    :param ic: IntegrateData object
+    :return: None
+    """
+    exchange: str = c2i.EXCHANGE_TYPE_NSE
+    symbol: Union[SymbolRow, None] = c2i.get_symbol(exchange, "ACC-EQ")
+    assert symbol is not None
+    callers: int = 4
+    barrier: Barrier = Barrier(callers)
+
+    def respond(request: Any) -> tuple[int, dict[str, str], str]:
+        # Hold the response until every caller has asked for the quote
+        sleep(0.2)
+        return 200, {}, get_mock_response("quotes.json")
+
+    add_callback(
+        method=GET,
+        url=urljoin(c2i.base_url, f"quotes/{exchange}/{symbol['token']}"),
+        callback=respond,
+        content_type="application/json",
+    )
+
+    def fetch() -> dict[str, Any]:
+        barrier.wait()
+        return ic.quotes(exchange=exchange, trading_symbol="ACC-EQ")
+
+    with ThreadPoolExecutor(callers) as executor:
+        quotes: list[dict[str, Any]] = list(
+            executor.map(lambda _: fetch(), range(callers))
+        )
+    assert len(calls) == 1
+    assert all(quote == quotes[0] for quote in quotes)
+    # Every caller gets its own copy
+    assert len({id(quote) for quote in quotes}) == callers
+
+
+@activate
+def test_caching_security_info_and_quotes(c2i: ConnectToIntegrate) -> None:
+    """
+    Test serving security info and quotes from their caches.
+
+    :param c2i: ConnectToIntegrate object
+    :return: None
+    """
+    ic: IntegrateData = IntegrateData(
+        c2i, security_information_ttl=60, quotes_ttl=60
+    )
+    exchange: str = c2i.EXCHANGE_TYPE_NSE
+    symbol: Union[SymbolRow, None] = c2i.get_symbol(exchange, "ACC-EQ")
+    assert symbol is not None
+    for route, filename in (
+        ("securityinfo", "security_information.json"),
+        ("quotes", "quotes.json"),
+    ):
+        add(
+            method=GET,
+            url=urljoin(c2i.base_url, f"{route}/{exchange}/{symbol['token']}"),
+            body=get_mock_response(filename),
+            content_type="application/json",
+        )
+    # Assert that only the first lookups send a request
+    for _ in range(3):
+        sec_info: dict[str, Any] = ic.security_information(
+            exchange=exchange, trading_symbol="ACC-EQ"
+        )
+        quote: dict[str, Any] = ic.quotes(
+            exchange=exchange, trading_symbol="ACC-EQ"
+        )
+        assert "isin" in sec_info
+        assert "ltp" in quote
+        # Changing a response doesn't change the cached one
+        sec_info.clear()
+        quote.clear()
+    assert len(calls) == 2
+    assert ic.security_information_cache is not None
+    assert ic.quotes_cache is not None
+    assert (ic.security_information_cache.hits, ic.quotes_cache.misses) == (
+        2,
+        1,
+    )
+
+
+@activate
+def test_not_caching_errors(
+    c2i: ConnectToIntegrate, monkeypatch: MonkeyPatch
+) -> None:
+    """
+    Test that errors passed on to the session expired callback aren't cached.
+
+    :param c2i: ConnectToIntegrate object
+    :param monkeypatch: Pytest monkeypatch fixture
+    :return: None
+    """
+    expired: list[bool] = []
+    monkeypatch.setattr(
+        c2i, "session_expired_callback", lambda: expired.append(True)
+    )
+    ic: IntegrateData = IntegrateData(
+        c2i, security_information_ttl=60, quotes_ttl=60
+    )
+    exchange: str = c2i.EXCHANGE_TYPE_NSE
+    symbol: Union[SymbolRow, None] = c2i.get_symbol(exchange, "ACC-EQ")
+    assert symbol is not None
+    error: str = '{"status": "ERROR", "message": "Session Expired"}'
+    for route, filename in (
+        ("securityinfo", "security_information.json"),
+        ("quotes", "quotes.json"),
+    ):
+        url: str = urljoin(
+            c2i.base_url, f"{route}/{exchange}/{symbol['token']}"
+        )
+        # The first response is an error, the second one succeeds
+        add(method=GET, url=url, body=error, content_type="application/json")
+        add(
+            method=GET,
+            url=url,
+            body=get_mock_response(filename),
+            content_type="application/json",
+        )
+    # Assert that the errors are returned, but not served from the caches
+    sec_info: dict[str, Any] = ic.security_information(
+        exchange=exchange, trading_symbol="ACC-EQ"
+    )
+    quote: dict[str, Any] = ic.quotes(
+        exchange=exchange, trading_symbol="ACC-EQ"
+    )
+    assert sec_info["status"] == quote["status"] == "ERROR"
+    assert len(expired) == 2
+    for _ in range(2):
+        assert "isin" in ic.security_information(
+            exchange=exchange, trading_symbol="ACC-EQ"
+        )
+        assert "ltp" in ic.quotes(exchange=exchange, trading_symbol="ACC-EQ")
+    assert len(calls) == 4
+
+
 @activate
 def test_fetching_security_info(
     c2i: ConnectToIntegrate, ic: IntegrateData
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains unit tests for DepthBook and DepthBookStore classes.
+"""
+
+from pytest import approx, raises
+
+from integrate.depth import DepthBook, DepthBookStore
+
+
+def test_merging_depth_books() -> None:
+    """
+    Test merging partial depth updates into five-level order books.
+
+    :return: None
+    """
+    store: DepthBookStore = DepthBookStore()
+    assert store.latest("NSE", "22") is None
+
+    first: DepthBook = store.update(
+        {
+            "t": "dk",
+            "e": "NSE",
+            "tk": "22",
+            "bp1": "100.00",
+            "bq1": "300",
+            "bo1": "3",
+            "bp2": "99.95",
+            "bq2": "50",
+            "sp1": "100.10",
+            "sq1": "100",
+            "so1": "1",
+            "tbq": "350",
+            "tsq": "100",
+        }
+    )
+    assert first.bid_prices == (100.0, 99.95, 0.0, 0.0, 0.0)
+    assert first.bid_qtys == (300, 50, 0, 0, 0)
+    assert first.bid_orders == (3, 0, 0, 0, 0)
+    assert first.total_bid_qty == 350
+    assert first.spread == approx(0.1)
+    assert first.mid == approx(100.05)
+    # More quantity on the bid side pulls the price towards the ask
+    assert first.weighted_mid == approx(100.075)
+
+    # Assert that a partial update only changes its levels
+    second: DepthBook = store.update(
+        {"t": "df", "e": "NSE", "tk": "22", "bq2": "75", "sp3": "100.30"}
+    )
+    assert second.bid_qtys == (300, 75, 0, 0, 0)
+    assert second.ask_prices == (100.1, 0.0, 100.3, 0.0, 0.0)
+    assert second.bid_prices is first.bid_prices
+    assert second.weighted_mid == first.weighted_mid
+    assert store.latest("NSE", "22") == second
+
+    # Assert that books already read don't change and can't be changed
+    assert first.bid_qtys[1] == 50
+    with raises(AttributeError):
+        first.mid = 0  # type: ignore
+
+    # Assert that an empty side has no spread or mids
+    third: DepthBook = store.update(
+        {"t": "df", "e": "NSE", "tk": "22", "sp1": "0.00", "sq1": "0"}
+    )
+    assert (third.spread, third.mid, third.weighted_mid) == (None, None, None)
+
+    store.update({"t": "df", "e": "NSE", "tk": "3045", "bp1": "570.10"})
+    assert len(store) == 2
+    store.remove("NSE", "3045")
+    assert store.latest("NSE", "3045") is None
+    store.clear()
+    assert len(store) == 0
+
+    with raises(ValueError):
+        store.update({"t": "df", "e": "NSE", "tk": "22", "bq1": "-"})
+    with raises(KeyError):
+        store.update({"t": "df", "bq1": "10"})
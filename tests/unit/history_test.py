@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains unit tests for parsing historical data into arrays.
+"""
+
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+from pytest import importorskip, raises
+
+np = importorskip("numpy")
+
+from integrate.history import (  # noqa: E402
+    TICK_DTYPE,
+    HistoryCache,
+    bar_rows,
+    parse_bars,
+    parse_ticks,
+    resample_bars,
+    resample_ticks,
+    slice_bars,
+    to_datetime64,
+)
+
+
+def test_parsing_bars() -> None:
+    """
+    Test parsing bars with and without open interest.
+
+    :return: None
+    """
+    bars = parse_bars(
+        b"300620230915,1819.95,1822.95,1807.9,1820.2,9367,120\r\n"
+        b"300620230916,1820.2,1821,1815.05,1816.5,4120,180\r\n"
+    )
+    assert list(bars) == [
+        "datetime",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "oi",
+    ]
+    assert bars["datetime"].dtype == np.dtype("datetime64[m]")
+    assert bars["datetime"][1] == np.datetime64("2023-06-30T09:16")
+    assert bars["close"].tolist() == [1820.2, 1816.5]
+    assert bars["volume"].dtype == np.int64
+    assert bars["oi"].tolist() == [120, 180]
+
+    bars = parse_bars(b"300620230915,1819.95,1822.95,1807.9,1820.2,9367\n")
+    assert "oi" not in bars
+    assert bars["open"].tolist() == [1819.95]
+
+    bars = parse_bars(b"")
+    assert len(bars["datetime"]) == 0
+    assert bars["volume"].dtype == np.int64
+
+    # Bodies of several windows joined with blank lines in between
+    bars = parse_bars(
+        b"300620230915,1819.95,1822.95,1807.9,1820.2,9367\n\n"
+        b"300620230916,1820.2,1821,1815.05,1816.5,4120\n"
+    )
+    assert bars["high"].tolist() == [1822.95, 1821.0]
+    assert bars["volume"].tolist() == [9367, 4120]
+
+    with raises(ValueError):
+        parse_bars(b"300620230915,1819.95\n")
+    with raises(ValueError):
+        parse_bars(b"300620230915,1819.95,1822.95,1807.9,1820.2,n/a\n")
+    with raises(ValueError):
+        parse_bars(b"300620230915,1819.95,1822.95,1807.9,1820.2.5,9367\n")
+
+
+def test_parsing_ticks() -> None:
+    """
+    Test parsing ticks into a structured array.
+
+    :return: None
+    """
+    ticks = parse_ticks(
+        b"1688116500,1819.95,10.0,0\n1688116501,1820.5,25,125.0\n"
+    )
+    assert ticks.dtype == TICK_DTYPE
+    assert ticks.itemsize == 32
+    assert ticks["utc"].tolist() == [1688116500, 1688116501]
+    assert ticks["ltp"].tolist() == [1819.95, 1820.5]
+    assert ticks["ltq"].tolist() == [10, 25]
+    assert ticks["oi"].tolist() == [0, 125]
+    assert len(parse_ticks(b"")) == 0
+    with raises(ValueError):
+        parse_ticks(b"300620230915,1819.95,1822.95,1807.9,1820.2,9367\n")
+
+
+def test_converting_timestamps() -> None:
+    """
+    Test converting DDMMYYYYHHMM numbers to datetime64.
+
+    :return: None
+    """
+    stamps = np.array([10119700000, 290220241530, 311220232359])
+    assert to_datetime64(stamps).tolist() == [
+        np.datetime64("1970-01-01T00:00").item(),
+        np.datetime64("2024-02-29T15:30").item(),
+        np.datetime64("2023-12-31T23:59").item(),
+    ]
+
+
+def test_caching_history(tmp_path: Path) -> None:
+    """
+    Test serving bars from the cache and downloading only what it misses.
+
+    :param tmp_path: Temporary directory
+    :return: None
+    """
+    first: datetime = datetime(2023, 7, 3, 9, 15)
+    stamps = np.arange(
+        np.datetime64(first, "m"), np.datetime64(first, "m") + 30
+    )
+    server = {
+        "datetime": stamps,
+        "open": np.arange(30, dtype=np.float64),
+        "high": np.arange(30, dtype=np.float64) + 1,
+        "low": np.arange(30, dtype=np.float64) - 1,
+        "close": np.arange(30, dtype=np.float64) + 0.5,
+        "volume": np.arange(30, dtype=np.int64) * 10,
+    }
+    fetched: list[tuple[datetime, datetime]] = []
+
+    def fetch(start: datetime, end: datetime) -> dict:
+        fetched.append((start, end))
+        return slice_bars(
+            server, np.datetime64(start, "m"), np.datetime64(end, "m")
+        )
+
+    def bars(start: int, end: int) -> dict:
+        return cache.bars(
+            "NSE",
+            "22",
+            "minute",
+            first + timedelta(minutes=start),
+            first + timedelta(minutes=end),
+            fetch,
+        )
+
+    cache: HistoryCache = HistoryCache(str(tmp_path / "history"))
+    assert bars(10, 19)["close"].tolist() == [i + 0.5 for i in range(10, 20)]
+    assert fetched == [
+        (first + timedelta(minutes=10), first + timedelta(minutes=19))
+    ]
+
+    # Covered ranges are read from disk, also by a new cache object
+    cache = HistoryCache(str(tmp_path / "history"))
+    assert bars(12, 15)["open"].tolist() == [12, 13, 14, 15]
+    assert len(fetched) == 1
+
+    # Only the missing head and tail are downloaded
+    data = bars(5, 24)
+    assert data["datetime"].tolist() == stamps[5:25].tolist()
+    assert data["volume"].tolist() == list(range(50, 250, 10))
+    assert fetched[1:] == [
+        (first + timedelta(minutes=5), first + timedelta(minutes=9)),
+        (first + timedelta(minutes=19), first + timedelta(minutes=24)),
+    ]
+    assert bars(0, 29)["open"].tolist() == list(range(30))
+    assert bars(0, 29)["open"].tolist() == list(range(30))
+    assert len(fetched) == 5
+
+    # Unreadable files are downloaded again
+    filename: str = cache.filename("NSE", "22", "minute")
+    Path(filename).write_bytes(b"garbage")
+    assert len(bars(0, 4)["datetime"]) == 5
+    assert fetched[-1] == (first, first + timedelta(minutes=4))
+    assert sorted(p.name for p in (tmp_path / "history").iterdir()) == [
+        "NSE-22-minute.npz"
+    ]
+
+
+def test_resampling_bars() -> None:
+    """
+    Test resampling minute bars aligned to the session.
+
+    :return: None
+    """
+    stamps = np.arange(
+        np.datetime64("2023-07-03T09:15"), np.datetime64("2023-07-03T15:30")
+    )
+    stamps = np.concatenate([stamps, stamps + np.timedelta64(1, "D")])
+    count: int = len(stamps)
+    bars = {
+        "datetime": stamps,
+        "open": np.arange(count, dtype=np.float64),
+        "high": np.arange(count, dtype=np.float64) + 1,
+        "low": np.arange(count, dtype=np.float64) - 1,
+        "close": np.arange(count, dtype=np.float64) + 0.5,
+        "volume": np.ones(count, dtype=np.int64),
+        "oi": np.arange(count, dtype=np.int64),
+    }
+
+    resampled = resample_bars(bars, timedelta(minutes=75))
+    assert [str(stamp)[11:] for stamp in resampled["datetime"][:5]] == [
+        "09:15",
+        "10:30",
+        "11:45",
+        "13:00",
+        "14:15",
+    ]
+    assert len(resampled["datetime"]) == 10
+    assert resampled["open"][1] == 75
+    assert resampled["high"][1] == 150
+    assert resampled["low"][1] == 74
+    assert resampled["close"][1] == 149.5
+    assert resampled["volume"].tolist() == [75] * 10
+    assert resampled["oi"][1] == 149
+
+    # Sessions opening at 09:00
+    resampled = resample_bars(bars, timedelta(minutes=10), time(9, 0))
+    assert str(resampled["datetime"][0]) == "2023-07-03T09:10"
+    assert resampled["volume"][0] == 5
+
+    resampled = resample_bars(bars, timedelta(weeks=1))
+    assert resampled["datetime"].tolist() == [datetime(2023, 7, 3)]
+    assert resampled["volume"].tolist() == [count]
+
+    with raises(ValueError):
+        resample_bars(bars, timedelta(seconds=90))
+
+
+def test_resampling_ticks() -> None:
+    """
+    Test resampling ticks into bars in Indian Standard Time.
+
+    :return: None
+    """
+    ticks = parse_ticks(
+        b"1688356500,100,1,10\n"
+        b"1688356510,103,2,11\n"
+        b"1688356530,99,3,12\n"
+        b"1688356570,101,4,13\n"
+    )
+    bars = resample_ticks(ticks, timedelta(minutes=1))
+    assert bars["datetime"].dtype == np.dtype("datetime64[m]")
+    assert bars["datetime"].tolist() == [
+        datetime(2023, 7, 3, 9, 25),
+        datetime(2023, 7, 3, 9, 26),
+    ]
+    assert bars["open"].tolist() == [100, 101]
+    assert bars["high"].tolist() == [103, 101]
+    assert bars["low"].tolist() == [99, 101]
+    assert bars["close"].tolist() == [99, 101]
+    assert bars["volume"].tolist() == [6, 4]
+    assert bars["oi"].tolist() == [12, 13]
+
+    bars = resample_ticks(ticks, timedelta(seconds=20))
+    assert bars["datetime"].dtype == np.dtype("datetime64[s]")
+    assert bars["volume"].tolist() == [3, 3, 4]
+
+
+def test_bar_rows() -> None:
+    """
+    Test turning columns of bars into dictionaries.
+
+    :return: None
+    """
+    bars = parse_bars(b"300620230915,1819.95,1822.95,1807.9,1820.2,9367,5\n")
+    assert list(bar_rows(bars)) == [
+        {
+            "datetime": datetime(2023, 6, 30, 9, 15),
+            "open": 1819.95,
+            "high": 1822.95,
+            "low": 1807.9,
+            "close": 1820.2,
+            "volume": 9367,
+            "oi": 5,
+        }
+    ]
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains unit tests for SnapshotStore class.
+"""
+
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Union
+
+from pytest import raises
+
+from integrate.snapshots import SnapshotStore
+
+
+def test_merging_snapshots() -> None:
+    """
+    Test merging partial updates into read-only records.
+
+    :return: None
+    """
+    store: SnapshotStore = SnapshotStore()
+    assert store.latest("NSE", "22") is None
+
+    first: Mapping[str, Any] = store.update(
+        {"t": "tk", "e": "NSE", "tk": "22", "lp": "1820.20", "v": "10"}
+    )
+    store.update({"t": "tf", "e": "NSE", "tk": "22", "lp": "1820.25"})
+    store.update({"t": "df", "e": "NSE", "tk": "22", "bp1": "1820.20"})
+    store.update({"t": "tf", "e": "NSE", "tk": "3045", "lp": "570.10"})
+
+    latest: Union[Mapping[str, Any], None] = store.latest("NSE", "22")
+    assert latest == {
+        "e": "NSE",
+        "tk": "22",
+        "lp": "1820.25",
+        "v": "10",
+        "bp1": "1820.20",
+    }
+    # Assert that records already read don't change and can't be changed
+    assert first["lp"] == "1820.20"
+    with raises(TypeError):
+        latest["lp"] = "0"  # type: ignore
+    assert len(store) == 2
+
+    store.remove("NSE", "3045")
+    assert store.latest("NSE", "3045") is None
+    store.clear()
+    assert len(store) == 0
+
+    with raises(KeyError):
+        store.update({"t": "tf", "lp": "1820.25"})
+
+
+def test_reading_snapshots_while_merging() -> None:
+    """
+    Test that readers see consistent records while updates are merged.
+
+    :return: None
+    """
+    store: SnapshotStore = SnapshotStore()
+    store.update({"e": "NSE", "tk": "22", "lp": "0", "v": "0"})
+
+    def write() -> None:
+        for i in range(20000):
+            store.update({"e": "NSE", "tk": "22", "lp": str(i), "v": str(i)})
+
+    def read() -> bool:
+        for _ in range(20000):
+            snapshot: Union[Mapping[str, Any], None] = store.latest(
+                "NSE", "22"
+            )
+            if snapshot is None or snapshot["lp"] != snapshot["v"]:
+                return False
+        return True
+
+    with ThreadPoolExecutor(3) as executor:
+        writer = executor.submit(write)
+        readers = [executor.submit(read) for _ in range(2)]
+        writer.result()
+        assert all(reader.result() for reader in readers)
+    assert store.latest("NSE", "22")["lp"] == "19999"  # type: ignore
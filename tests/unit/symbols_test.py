@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains unit tests for SymbolMaster class.
+"""
+
+from csv import reader
+from multiprocessing.shared_memory import SharedMemory
+from os import getpid
+from os.path import abspath, dirname, join
+from pathlib import Path
+
+from pytest import fixture, raises
+
+from integrate.symbols import (
+    _SEGMENTS,
+    COLUMNS,
+    SymbolMaster,
+    parse_symbol_line,
+)
+
+MASTER_FILENAME: str = abspath(
+    join(dirname(__file__), "..", "mock_responses", "allmaster.csv")
+)
+
+
+@fixture(scope="module")
+def master() -> SymbolMaster:
+    """
+    Initialize SymbolMaster object from the mock symbols' master file.
+
+    :return: SymbolMaster object
+    """
+    return SymbolMaster.from_csv(MASTER_FILENAME)
+
+
+def test_rows_match_master_file(master: SymbolMaster) -> None:
+    """
+    Test that the rows match the parsed symbols' master file.
+
+    :param master: SymbolMaster object
+    :return: None
+    """
+    with open(MASTER_FILENAME, "r") as fp:
+        expected = [
+            dict(zip(COLUMNS, parse_symbol_line(line))) for line in reader(fp)
+        ]
+    assert len(master) == len(expected)
+    assert [dict(row) for row in master] == expected
+    assert master[-1] == expected[-1]
+    assert master[5]["strike"] == "19500"
+    with raises(IndexError):
+        master[len(master)]
+
+
+def test_find(master: SymbolMaster) -> None:
+    """
+    Test finding symbols by trading symbol and token.
+
+    :param master: SymbolMaster object
+    :return: None
+    """
+    acc = master.find("NSE", "ACC-EQ")
+    assert acc is not None
+    assert acc["token"] == "22"
+    assert master.find_by_token("NSE", "22") == acc
+    assert master.find("BSE", "ACC-EQ") is None
+    assert master.find("XYZ", "ACC-EQ") is None
+    assert master.find_by_token("NFO", "22") is None
+
+
+def test_where(master: SymbolMaster) -> None:
+    """
+    Test filtering rows by criteria.
+
+    :param master: SymbolMaster object
+    :return: None
+    """
+    rows = master.where(segment="NFO", symbol="NIFTY", option_type="CE")
+    assert [master.value("trading_symbol", row) for row in rows] == [
+        "NIFTY28SEP23C19500",
+        "NIFTY28SEP23C19600",
+        "NIFTY28SEP23C19450",
+        "NIFTY05OCT23C19500",
+    ]
+    rows = master.where(
+        symbol={"NIFTY", "BANKNIFTY"},
+        strike=lambda strike: int(strike) >= 19600,
+    )
+    assert {row["token"] for row in master.rows(rows)} == {
+        "43653",
+        "43654",
+        "43700",
+        "43701",
+    }
+    assert master.where() == list(range(len(master)))
+    assert master.where(segment="XYZ") == []
+    with raises(KeyError):
+        master.where(exchange="NSE")
+
+
+def test_column(master: SymbolMaster) -> None:
+    """
+    Test getting all values of a column.
+
+    :param master: SymbolMaster object
+    :return: None
+    """
+    segments = master.column("segment")
+    assert len(segments) == len(master)
+    assert set(segments) == {"NSE", "BSE", "NFO", "MCX"}
+
+
+def test_snapshot(master: SymbolMaster, tmp_path: Path) -> None:
+    """
+    Test saving and loading a binary snapshot.
+
+    :param master: SymbolMaster object
+    :param tmp_path: Temporary directory
+    :return: None
+    """
+    filename: str = str(tmp_path / "allmaster.bin")
+    master.source = (1, 2)
+    master.save(filename)
+    loaded = SymbolMaster.load(filename)
+    assert loaded.source == (1, 2)
+    assert [dict(row) for row in loaded] == [dict(row) for row in master]
+    assert loaded.find("NFO", "NIFTY28SEP23P19500") == master.find(
+        "NFO", "NIFTY28SEP23P19500"
+    )
+
+    # Assert that an empty master survives a round trip
+    SymbolMaster.from_rows([]).save(filename)
+    assert len(SymbolMaster.load(filename)) == 0
+
+
+def test_invalid_snapshot(tmp_path: Path) -> None:
+    """
+    Test loading an invalid binary snapshot.
+
+    :param tmp_path: Temporary directory
+    :return: None
+    """
+    filename: Path = tmp_path / "allmaster.bin"
+    filename.write_bytes(b"NOTASNAPSHOT" * 8)
+    with raises(ValueError):
+        SymbolMaster.load(str(filename))
+
+
+def test_shared_memory(master: SymbolMaster) -> None:
+    """
+    Test publishing to and attaching from shared memory.
+
+    :param master: SymbolMaster object
+    :return: None
+    """
+    name: str = f"pyintegrate-test-{getpid()}"
+    master.source = (3, 4)
+    master.publish(name)
+    try:
+        attached = SymbolMaster.attach(name)
+        assert attached.source == (3, 4)
+        assert [dict(row) for row in attached] == [dict(row) for row in master]
+        assert attached.find_by_token("MCX", "253461") is not None
+
+        # Assert that publishing again replaces and closes the segment
+        published: SharedMemory = _SEGMENTS[name]
+        master.source = (5, 6)
+        master.publish(name)
+        assert SymbolMaster.attach(name).source == (5, 6)
+        assert attached.source == (3, 4)
+        assert published.buf is None
+        assert _SEGMENTS[name] is not published
+    finally:
+        SymbolMaster.unlink_shared(name)
+    assert name not in _SEGMENTS
+    with raises(FileNotFoundError):
+        SymbolMaster.attach(name)
+
+
+def test_option_chain(master: SymbolMaster) -> None:
+    """
+    Test building option chains.
+
+    :param master: SymbolMaster object
+    :return: None
+    """
+    assert master.expiries("NFO", "NIFTY") == ["28092023", "05102023"]
+    assert master.expiries("NSE", "ACC") == []
+
+    chain = master.option_chain("NFO", "NIFTY", "28092023")
+    assert [strike["strike"] for strike in chain] == [
+        "19450",
+        "19500",
+        "19600",
+    ]
+    assert chain[0]["ce_token"] == "43655"
+    assert chain[0]["pe_token"] == ""
+    assert chain[1] == {
+        "strike": "19500",
+        "ce_token": "43651",
+        "ce_trading_symbol": "NIFTY28SEP23C19500",
+        "pe_token": "43652",
+        "pe_trading_symbol": "NIFTY28SEP23P19500",
+        "lot_size": "50",
+        "tick_size": "5",
+    }
+    banknifty = master.option_chain("NFO", "BANKNIFTY", "28092023")
+    assert banknifty[0]["lot_size"] == "15"
+    assert master.option_chain("NFO", "NIFTY", "01012000") == []
+
+    # Assert that the returned chain is a copy
+    chain[1]["ce_token"] = ""
+    assert master.option_chain("NFO", "NIFTY", "28092023")[1]["ce_token"]
+
+
+def test_search(master: SymbolMaster) -> None:
+    """
+    Test prefix and fuzzy search over trading symbols.
+
+    :param master: SymbolMaster object
+    :return: None
+    """
+
+    def search(*args, **kwargs) -> list[str]:  # type: ignore
+        return [
+            row["trading_symbol"] for row in master.search(*args, **kwargs)
+        ]
+
+    # Assert that prefix matches come first in alphabetical order
+    assert search("nifty28sep23c", limit=3) == [
+        "NIFTY28SEP23C19450",
+        "NIFTY28SEP23C19500",
+        "NIFTY28SEP23C19600",
+    ]
+    assert search("ACC") == ["ACC", "ACC-EQ"]
+    assert search("ACC", exchange="NSE") == ["ACC-EQ"]
+    assert search("ACC", exchange="XYZ") == []
+
+    # Assert that fuzzy matches top up the results
+    assert search("NIFTY28SEP23C19500", limit=2) == [
+        "NIFTY28SEP23C19500",
+        "NIFTY28SEP23C19450",
+    ]
+    assert search("SBNI-EQ") == ["SBIN-EQ"]
+    assert search("ZZZ") == []
+    assert search("") == []
+    assert search("ACC", limit=0) == []
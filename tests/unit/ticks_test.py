@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+# MIT License                                                                 #
+###############################################################################
+# Copyright (c) 2023 Definedge Securities Broking Pvt. Ltd.                   #
+###############################################################################
+# Permission is hereby granted, free of charge, to any person obtaining a     #
+# copy of this software and associated documentation files (the "Software"),  #
+# to deal in the Software without restriction, including without limitation   #
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,    #
+# and/or sell copies of the Software, and to permit persons to whom the       #
+# Software is furnished to do so, subject to the following conditions:        #
+#                                                                             #
+# The above copyright notice and this permission notice shall be included in  #
+# all copies or substantial portions of the Software.                         #
+#                                                                             #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR  #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,    #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER      #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING     #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER         #
+# DEALINGS IN THE SOFTWARE.                                                   #
+###############################################################################
+
+"""
+This module contains unit tests for Tick class.
+"""
+
+from pytest import raises
+
+from integrate.ticks import Tick
+
+
+def test_decoding_ticks() -> None:
+    """
+    Test decoding the numeric fields of a tick message.
+
+    :return: None
+    """
+    tick: Tick = Tick.from_message(
+        {
+            "t": "tf",
+            "e": "NSE",
+            "tk": "22",
+            "lp": "1820.20",
+            "pc": "-0.25",
+            "v": "9367",
+            "ltq": "5",
+            "ltt": "15:29:59",
+            "bp1": "1820.15",
+            "bq1": "120",
+            "ft": "1688117999",
+        },
+        "ACC-EQ",
+    )
+    assert tick.exchange == "NSE"
+    assert tick.token == "22"
+    assert tick.trading_symbol == "ACC-EQ"
+    assert tick.ltp == 1820.2
+    assert tick.change_percent == -0.25
+    assert tick.volume == 9367
+    assert tick.ltq == 5
+    assert tick.ltt == "15:29:59"
+    assert tick.bid_price == 1820.15
+    assert tick.bid_qty == 120
+    assert tick.feed_time == 1688117999
+    # Assert that the fields which weren't streamed are None
+    assert tick.ask_price is None
+    assert tick.oi is None
+    assert tick == Tick(
+        "NSE",
+        "22",
+        "ACC-EQ",
+        ltp=1820.2,
+        change_percent=-0.25,
+        volume=9367,
+        ltq=5,
+        ltt="15:29:59",
+        bid_price=1820.15,
+        bid_qty=120,
+        feed_time=1688117999,
+    )
+    assert repr(Tick("NSE", "22", ltp=1820.2)) == (
+        "Tick(exchange='NSE', token='22', ltp=1820.2)"
+    )
+
+    # Assert that ticks don't carry a __dict__
+    with raises(AttributeError):
+        tick.unknown = 1  # type: ignore
+
+    with raises(ValueError):
+        Tick.from_message({"e": "NSE", "tk": "22", "v": "many"})
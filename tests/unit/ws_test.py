@@ -29,12 +29,22 @@ This module contains unit tests for IntegrateWebSocketClientProtocol class.
 
 from base64 import b64encode
 from hashlib import sha1
+from json import loads
+from pathlib import Path
+from typing import Any, Union
 from unittest.mock import Mock
 
 from autobahn.websocket.protocol import WebSocketProtocol  # type: ignore
 from autobahn.websocket.types import ConnectingRequest  # type: ignore
+from pytest import MonkeyPatch
+from responses import GET, activate, add
 
+from integrate import ConnectToIntegrate, IntegrateWebSocket
+from integrate.depth import DepthBook
+from integrate.symbols import SymbolMaster
+from integrate.ticks import Tick
 from integrate.ws import IntegrateWebSocketClientProtocol
+from tests.responses_helper import get_mock_master_zip
 
 
 def tearDown(iwsproto: IntegrateWebSocketClientProtocol) -> None:
@@ -100,3 +110,319 @@ def test_auto_ping(iwsproto: IntegrateWebSocketClientProtocol) -> None:
 
     # Assert that the auto ping is set
     assert iwsproto.autoPingPendingCall is not None  # type: ignore
+
+
+@activate
+def test_check_token_validity(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    """
+    Test validating tokens against the symbols' master file.
+
+    :param tmp_path: Temporary directory
+    :param monkeypatch: MonkeyPatch fixture
+    :return: None
+    """
+    # Add a mock response for the symbols' master file endpoint
+    add(
+        method=GET,
+        url="https://app.definedgesecurities.com/public/allmaster.zip",
+        body=get_mock_master_zip(),
+        content_type="application/zip",
+    )
+    c2i = ConnectToIntegrate(symbols_cache_dir=str(tmp_path))
+
+    iws = IntegrateWebSocket(c2i)
+    errors: list[Exception] = []
+    iws.on_exception = lambda iws, e: errors.append(e)  # type: ignore
+
+    # Assert that only unknown tokens raise an exception
+    iws.check_token_validity(
+        [(c2i.EXCHANGE_TYPE_NSE, "22"), (c2i.EXCHANGE_TYPE_NFO, "43651")]
+    )
+    assert not errors
+    iws.check_token_validity(
+        [(c2i.EXCHANGE_TYPE_NSE, "43651"), (c2i.EXCHANGE_TYPE_NFO, "22")]
+    )
+    assert len(errors) == 2
+
+    # Assert that the captured master is used without checking the file
+    def build_symbols_index() -> None:
+        raise AssertionError("Symbols' master file checked")
+
+    monkeypatch.setattr(c2i, "build_symbols_index", build_symbols_index)
+    iws.check_token_validity([(c2i.EXCHANGE_TYPE_NSE, "22")])
+    assert iws._trading_symbol(c2i.EXCHANGE_TYPE_NSE, "22") == "ACC-EQ"
+    assert len(errors) == 2
+
+    # Assert that a refreshed master replaces it along with the symbols
+    iws._on_symbols_refreshed(SymbolMaster.from_rows([]))
+    assert iws._trading_symbol(c2i.EXCHANGE_TYPE_NSE, "22") is None
+    iws.check_token_validity([(c2i.EXCHANGE_TYPE_NSE, "22")])
+    assert len(errors) == 3
+
+
+def test_delta_subscriptions(c2i: ConnectToIntegrate) -> None:
+    """
+    Test sending only the tokens whose subscription changes.
+
+    :param c2i: ConnectToIntegrate object
+    :type c2i: ConnectToIntegrate
+    :return: None
+    """
+    iws = IntegrateWebSocket(c2i, max_message_size=50)
+    iws._protocol = Mock()  # type: ignore
+    errors: list[Exception] = []
+    iws.on_exception = lambda iws, e: errors.append(e)  # type: ignore
+
+    def sent() -> list[dict[str, str]]:
+        messages: list[dict[str, str]] = [
+            loads(call.args[0]) for call in iws._protocol.sendMessage.call_args_list  # type: ignore
+        ]
+        iws._protocol.sendMessage.reset_mock()  # type: ignore
+        return messages
+
+    tick: str = c2i.SUBSCRIPTION_TYPE_TICK
+    nse: str = c2i.EXCHANGE_TYPE_NSE
+    nfo: str = c2i.EXCHANGE_TYPE_NFO
+    iws.subscribe(tick, [(nse, "22"), (nse, "3045"), (nse, "22")])
+    assert sent() == [{"t": "t", "k": "NSE|22#NSE|3045"}]
+
+    # Assert that only new tokens are sent, split to fit in a message
+    iws.subscribe(
+        tick,
+        [(nse, "22")] + [(nfo, str(token)) for token in range(43650, 43655)],
+    )
+    assert sent() == [
+        {"t": "t", "k": "NFO|43650#NFO|43651#NFO|43652"},
+        {"t": "t", "k": "NFO|43653#NFO|43654"},
+    ]
+    iws.subscribe(tick, [(nse, "3045")])
+    assert sent() == []
+
+    # Assert that only subscribed tokens are unsubscribed
+    iws.unsubscribe(tick, [(nse, "22"), (nse, "26000")])
+    assert sent() == [{"t": "u", "k": "NSE|22"}]
+    assert "NSE|22" not in iws.subscriptions[tick]
+
+    # Assert that all tokens are sent again on resubscription
+    iws.resubscribe()
+    resent: list[dict[str, str]] = [
+        message for message in sent() if message["t"] == "t" and "k" in message
+    ]
+    assert sorted(
+        key for message in resent for key in message["k"].split("#")
+    ) == sorted(iws.subscriptions[tick])
+    assert len(iws.subscriptions[tick]) == 6
+    assert not errors
+
+
+def test_subscribing_before_connecting(c2i: ConnectToIntegrate) -> None:
+    """
+    Test that tokens which couldn't be sent are sent on the next subscribe.
+
+    :param c2i: ConnectToIntegrate object
+    :type c2i: ConnectToIntegrate
+    :return: None
+    """
+    iws = IntegrateWebSocket(c2i)
+    errors: list[Exception] = []
+    iws.on_exception = lambda iws, e: errors.append(e)  # type: ignore
+    tick: str = c2i.SUBSCRIPTION_TYPE_TICK
+    tokens: list[tuple[str, str]] = [(c2i.EXCHANGE_TYPE_NSE, "22")]
+
+    # Assert that nothing is recorded while not connected
+    iws.subscribe(tick, tokens)
+    assert len(errors) == 1
+    assert not iws.subscriptions[tick]
+
+    iws._protocol = Mock()  # type: ignore
+    iws.subscribe(tick, tokens)
+    iws._protocol.sendMessage.assert_called_once()  # type: ignore
+    assert loads(iws._protocol.sendMessage.call_args.args[0]) == {  # type: ignore
+        "t": "t",
+        "k": "NSE|22",
+    }
+    assert iws.subscriptions[tick] == {"NSE|22"}
+
+    # Assert that a failed send is retried too
+    iws._protocol.sendMessage.side_effect = OSError("Broken pipe")  # type: ignore
+    iws.subscribe(tick, [(c2i.EXCHANGE_TYPE_NSE, "3045")])
+    assert len(errors) == 2
+    assert iws.subscriptions[tick] == {"NSE|22"}
+
+
+def test_dispatching_messages(c2i: ConnectToIntegrate) -> None:
+    """
+    Test handing received messages to the callbacks of their type.
+
+    :param c2i: ConnectToIntegrate object
+    :type c2i: ConnectToIntegrate
+    :return: None
+    """
+    iws = IntegrateWebSocket(c2i)
+    received: list[tuple[str, dict[str, str]]] = []
+    errors: list[Exception] = []
+    iws.on_tick_update = lambda iws, m: received.append(("tick", m))  # type: ignore
+    iws.on_order_update = lambda iws, m: received.append(("order", m))  # type: ignore
+    iws.on_depth_update = lambda iws, m: received.append(("depth", m))  # type: ignore
+    iws.on_acknowledgement = lambda iws, m: received.append(("ack", m))  # type: ignore
+    iws.on_login = lambda iws: received.append(("login", {}))  # type: ignore
+    iws.on_exception = lambda iws, e: errors.append(e)  # type: ignore
+
+    for payload in (
+        b'{"t": "ck", "s": "OK"}',
+        b'{"t": "tk", "e": "NSE", "tk": "22"}',
+        b'{"t": "tf", "e": "NSE", "tk": "22", "lp": "1820.20"}',
+        b'{"t": "om", "norenordno": "1"}',
+        b'{"t": "df", "e": "NSE", "tk": "22", "bp1": "1820.15"}',
+        b'{"t": "udk", "e": "NSE", "tk": "22"}',
+    ):
+        iws._on_message(payload, False)
+    assert [kind for kind, _ in received] == [
+        "ack",
+        "login",
+        "ack",
+        "tick",
+        "order",
+        "depth",
+        "ack",
+    ]
+    assert received[3][1]["lp"] == "1820.20"
+    assert iws.is_logged_in
+    assert not errors
+
+    # Assert that malformed and unknown messages are reported
+    iws._on_message(b'{"t": "tf"', False)
+    iws._on_message(b'{"t": "xx"}', False)
+    assert isinstance(errors[0], ValueError)
+    assert isinstance(errors[1], KeyError)
+    assert len(received) == 7
+
+
+def test_typed_ticks(c2i: ConnectToIntegrate) -> None:
+    """
+    Test passing decoded ticks with their trading symbol to the callback.
+
+    :param c2i: ConnectToIntegrate object
+    :type c2i: ConnectToIntegrate
+    :return: None
+    """
+    iws = IntegrateWebSocket(c2i, typed_ticks=True)
+    ticks: list[Tick] = []
+    errors: list[Exception] = []
+    iws.on_tick_update = lambda iws, tick: ticks.append(tick)  # type: ignore
+    iws.on_exception = lambda iws, e: errors.append(e)  # type: ignore
+
+    iws._on_message(
+        b'{"t": "tf", "e": "NSE", "tk": "22", "lp": "1820.20"}', False
+    )
+    iws._on_message(b'{"t": "tf", "e": "NSE", "tk": "22", "v": "9367"}', False)
+    iws._on_message(b'{"t": "tf", "e": "NSE", "tk": "1", "lp": "1.5"}', False)
+    assert ticks == [
+        Tick("NSE", "22", "ACC-EQ", ltp=1820.2),
+        Tick("NSE", "22", "ACC-EQ", volume=9367),
+        Tick("NSE", "1", None, ltp=1.5),
+    ]
+
+    # Assert that malformed ticks are reported
+    iws._on_message(b'{"t": "tf", "e": "NSE", "tk": "22", "lp": "-"}', False)
+    assert len(ticks) == 3
+    assert isinstance(errors[0], ValueError)
+
+
+def test_latest_snapshots(c2i: ConnectToIntegrate) -> None:
+    """
+    Test keeping the latest record of each subscribed security.
+
+    :param c2i: ConnectToIntegrate object
+    :type c2i: ConnectToIntegrate
+    :return: None
+    """
+    iws = IntegrateWebSocket(c2i, keep_snapshots=True)
+    iws._protocol = Mock()  # type: ignore
+    errors: list[Exception] = []
+    iws.on_exception = lambda iws, e: errors.append(e)  # type: ignore
+    latest: list[Any] = []
+    iws.on_tick_update = lambda iws, tick: latest.append(  # type: ignore
+        iws.latest(tick["e"], tick["tk"])
+    )
+    tick: str = c2i.SUBSCRIPTION_TYPE_TICK
+    depth: str = c2i.SUBSCRIPTION_TYPE_DEPTH
+    nse: str = c2i.EXCHANGE_TYPE_NSE
+
+    iws.subscribe(tick, [(nse, "22")])
+    iws.subscribe(depth, [(nse, "22")])
+    for payload in (
+        b'{"t": "tk", "e": "NSE", "tk": "22", "lp": "1820.20", "v": "10"}',
+        b'{"t": "dk", "e": "NSE", "tk": "22", "bp1": "1820.15"}',
+        b'{"t": "df", "e": "NSE", "tk": "22", "bp1": "1820.20"}',
+        b'{"t": "tf", "e": "NSE", "tk": "22", "lp": "1820.25"}',
+    ):
+        iws._on_message(payload, False)
+    expected: dict[str, str] = {
+        "e": "NSE",
+        "tk": "22",
+        "lp": "1820.25",
+        "v": "10",
+        "bp1": "1820.20",
+    }
+    # Assert that the callback already reads the merged record
+    assert latest == [expected]
+    assert iws.latest(nse, "22") == expected
+
+    # Assert that the record is kept until both subscriptions are gone
+    iws.unsubscribe(tick, [(nse, "22")])
+    assert iws.latest(nse, "22") == expected
+    iws.unsubscribe(depth, [(nse, "22")])
+    assert iws.latest(nse, "22") is None
+
+    # Assert that updates without an exchange or token are passed on as is
+    iws.on_tick_update = lambda iws, tick: latest.append(tick)  # type: ignore
+    iws._on_message(b'{"t": "tf", "lp": "1820.30"}', False)
+    assert latest[-1] == {"t": "tf", "lp": "1820.30"}
+    assert not errors
+
+    # Assert that nothing is kept by default
+    iws = IntegrateWebSocket(c2i)
+    iws._on_message(b'{"t": "tf", "e": "NSE", "tk": "22", "lp": "1"}', False)
+    assert iws.latest(nse, "22") is None
+
+
+def test_depth_books(c2i: ConnectToIntegrate) -> None:
+    """
+    Test keeping the order book of each security subscribed to depth.
+
+    :param c2i: ConnectToIntegrate object
+    :type c2i: ConnectToIntegrate
+    :return: None
+    """
+    iws = IntegrateWebSocket(c2i, depth_books=True)
+    iws._protocol = Mock()  # type: ignore
+    errors: list[Exception] = []
+    iws.on_exception = lambda iws, e: errors.append(e)  # type: ignore
+    depth: str = c2i.SUBSCRIPTION_TYPE_DEPTH
+    nse: str = c2i.EXCHANGE_TYPE_NSE
+
+    iws.subscribe(depth, [(nse, "22")])
+    for payload in (
+        b'{"t": "dk", "e": "NSE", "tk": "22", "bp1": "100", "bq1": "10"}',
+        b'{"t": "df", "e": "NSE", "tk": "22", "sp1": "101", "sq1": "10"}',
+        b'{"t": "tf", "e": "NSE", "tk": "22", "lp": "100.50"}',
+    ):
+        iws._on_message(payload, False)
+    book: Union[DepthBook, None] = iws.depth_book(nse, "22")
+    assert book is not None
+    assert book.bid_prices[0] == 100.0
+    assert book.ask_prices[0] == 101.0
+    assert book.mid == 100.5
+    assert not errors
+
+    # Assert that malformed updates are reported and skipped
+    iws._on_message(b'{"t": "df", "e": "NSE", "tk": "22", "sq1": "x"}', False)
+    assert isinstance(errors[0], ValueError)
+    assert iws.depth_book(nse, "22") is book
+
+    iws.unsubscribe(depth, [(nse, "22")])
+    assert iws.depth_book(nse, "22") is None
+    assert IntegrateWebSocket(c2i).depth_book(nse, "22") is None